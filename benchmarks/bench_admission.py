@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Goodput of RateLimitedRequestQueue under overload, with and without admission control.
+
+An upstream that serves ``--capacity`` requests per second receives
+``--overload`` times that for ``--seconds``. Callers give up after
+``--timeout`` seconds, as HTTP clients do. Goodput counts requests that
+completed within that timeout. With admission control, low-priority requests
+(``--low-share`` of traffic) are shed once the expected wait passes
+``--slo``; high-priority work is always admitted.
+
+    python benchmarks/bench_admission.py --capacity 200 --overload 2 --seconds 5
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from infra.queue import AdmissionController, LoadShed, RateLimitedRequestQueue, RequestOutcome  # noqa: E402
+
+
+async def run(args: argparse.Namespace, admission: bool) -> dict:
+    workers = 8
+    service_seconds = workers / args.capacity
+    controller = AdmissionController(args.slo) if admission else None
+    queue = RateLimitedRequestQueue(max_workers=workers, per_host_limit=workers, admission=controller)
+    await queue.start()
+    upstream_calls = 0
+
+    async def call_upstream() -> RequestOutcome:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(service_seconds)
+        return RequestOutcome(200)
+
+    stats = {"ok": 0, "timeout": 0, "shed": 0, "latency_high": [], "latency_low": []}
+
+    async def caller(priority: int) -> None:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(queue.enqueue("upstream", call_upstream, priority=priority), args.timeout)
+        except LoadShed:
+            stats["shed"] += 1
+            return
+        except asyncio.TimeoutError:
+            stats["timeout"] += 1
+            return
+        stats["ok"] += 1
+        stats["latency_high" if priority == 0 else "latency_low"].append(time.monotonic() - started)
+
+    rng = random.Random(3)
+    rate = args.capacity * args.overload
+    callers = []
+    started = time.monotonic()
+    sent = 0
+    while time.monotonic() - started < args.seconds:
+        due = int((time.monotonic() - started) * rate)
+        for _ in range(due - sent):
+            priority = 1 if rng.random() < args.low_share else 0
+            callers.append(asyncio.create_task(caller(priority)))
+        sent = max(sent, due)
+        await asyncio.sleep(0.005)
+    await asyncio.gather(*callers)
+    elapsed = time.monotonic() - started
+    await queue.close()
+    stats.update(sent=sent, elapsed=elapsed, upstream_calls=upstream_calls)
+    return stats
+
+
+def p99(values: list) -> float:
+    return statistics.quantiles(values, n=100)[98] if len(values) >= 2 else float("nan")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capacity", type=float, default=200.0, help="upstream requests/second")
+    parser.add_argument("--overload", type=float, default=2.0, help="offered load as a multiple of capacity")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=1.0, help="caller timeout, seconds")
+    parser.add_argument("--slo", type=float, default=0.5, help="admission SLO on expected wait, seconds")
+    parser.add_argument("--low-share", type=float, default=0.7, help="share of low-priority requests")
+    args = parser.parse_args()
+
+    print(f"{'admission':<10} {'sent':>6} {'ok':>6} {'timeout':>8} {'shed':>6} {'upstream':>9} "
+          f"{'goodput/s':>10} {'p99 high':>9} {'p99 low':>8}")
+    for admission in (False, True):
+        stats = asyncio.run(run(args, admission))
+        print(f"{'on' if admission else 'off':<10} {stats['sent']:>6} {stats['ok']:>6} {stats['timeout']:>8} "
+              f"{stats['shed']:>6} {stats['upstream_calls']:>9} {stats['ok'] / stats['elapsed']:>10.1f} "
+              f"{p99(stats['latency_high']):>8.2f}s {p99(stats['latency_low']):>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Outbound calls and memory of AlertPipeline during an alert storm.
+
+A storm of ``--alerts`` envelopes over ``--correlations`` workflow runs arrives
+in bursts. Without the pipeline each envelope is one call per routed channel;
+with it each route gets at most one summary per flush interval. Traced memory
+is sampled as the storm progresses to show it stays flat once the dedup index
+is full.
+
+    python benchmarks/bench_alert_storm.py --alerts 50000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from infra.alerting import AlertPipeline  # noqa: E402
+from infra.queue import RateLimitedRequestQueue, RequestOutcome  # noqa: E402
+
+CHANNELS = (("teams",), ("teams", "webhook"), ("teams", "email"), ("dataverse",))
+AUDIENCES = ("oncall", "ops", "data-science")
+
+
+def envelope(rng: random.Random, index: int, correlations: int) -> dict:
+    correlation = rng.randrange(correlations)
+    return {
+        "alertId": f"alert-{index}",
+        "source": "A02-orchestrator",
+        "severity": rng.choice(("Sev0", "Sev1", "Sev2", "Sev3")),
+        "category": rng.choice(("reliability", "data-quality")),
+        "summary": f"Workflow run {correlation} failed",
+        "details": "Retries exhausted calling downstream connector.",
+        "correlationId": f"run-{correlation:06d}",
+        "routing": {"channels": list(rng.choice(CHANNELS)), "audience": rng.choice(AUDIENCES)},
+    }
+
+
+async def storm(args: argparse.Namespace) -> None:
+    calls = {"count": 0}
+
+    async def send(summary):
+        calls["count"] += 1
+        await asyncio.sleep(args.send_ms / 1000)
+        return RequestOutcome(status_code=200)
+
+    queue = RateLimitedRequestQueue(max_workers=8, per_host_limit=2)
+    await queue.start()
+    pipeline = AlertPipeline(
+        queue,
+        send,
+        flush_interval_seconds=args.flush_ms / 1000,
+        max_tracked_alerts=args.max_tracked,
+        channels=["teams", "email", "webhook"],
+    )
+    await pipeline.start()
+
+    rng = random.Random(7)
+    naive_calls = 0
+    checkpoints = {args.alerts * step // 5 for step in range(1, 6)}
+    tracemalloc.start()
+    started = time.perf_counter()
+    for index in range(1, args.alerts + 1):
+        alert = envelope(rng, index, args.correlations)
+        naive_calls += sum(channel != "dataverse" for channel in alert["routing"]["channels"])
+        pipeline.submit(alert)
+        if index % args.burst == 0:
+            await asyncio.sleep(args.burst_gap_ms / 1000)
+        if index in checkpoints:
+            current, _ = tracemalloc.get_traced_memory()
+            print(f"after {index:>7} alerts: tracked={pipeline.tracked_alerts:>6} traced={current / 1e6:6.2f} MB")
+    await pipeline.close()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await queue.close()
+
+    metrics = pipeline.metrics
+    flushes = elapsed / (args.flush_ms / 1000)
+    print(f"storm: {args.alerts} alerts in {elapsed:.2f}s, peak traced {peak / 1e6:.2f} MB")
+    print(f"deduplicated: {metrics.deduplicated}  dropped (no outbound channel): {metrics.dropped}")
+    print(f"outbound calls: naive={naive_calls}  pipeline={calls['count']}  (bound ~ routes x {flushes:.0f} flushes)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alerts", type=int, default=50_000)
+    parser.add_argument("--correlations", type=int, default=5_000)
+    parser.add_argument("--max-tracked", type=int, default=10_000)
+    parser.add_argument("--burst", type=int, default=500)
+    parser.add_argument("--burst-gap-ms", type=float, default=10.0)
+    parser.add_argument("--flush-ms", type=float, default=250.0)
+    parser.add_argument("--send-ms", type=float, default=20.0)
+    asyncio.run(storm(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
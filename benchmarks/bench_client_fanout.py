@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Throughput of bulk repository fetches: serial loop, ``GitHubApiClient.map`` and the async queue.
+
+A local keep-alive server answers each ``GET /repos/{owner}/{repo}`` after
+``--latency-ms``. The same ``--requests`` fetches are issued by a plain loop, by
+``client.map`` over ``--workers`` threads, and through ``RequestQueue`` with
+per-host concurrency ``--workers`` (each call run with ``asyncio.to_thread``).
+
+    python benchmarks/bench_client_fanout.py --requests 400 --workers 16 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from github_client import GitHubApiClient  # noqa: E402
+from infra.queue.request_queue import RequestQueue  # noqa: E402
+
+
+def make_handler(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+        connections = 0
+
+        def setup(self):
+            super().setup()
+            type(self).connections += 1
+
+        def do_GET(self):
+            time.sleep(latency)
+            _, _, owner, repo = self.path.split("/")
+            body = json.dumps({"full_name": f"{owner}/{repo}", "private": False}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serial(client: GitHubApiClient, pairs, workers: int) -> int:
+    return sum(1 for owner, repo in pairs if client.get_repository(owner, repo))
+
+
+def mapped(client: GitHubApiClient, pairs, workers: int) -> int:
+    return sum(1 for _ in client.get_repositories(pairs, max_workers=workers))
+
+
+def queued(client: GitHubApiClient, pairs, workers: int) -> int:
+    async def run() -> int:
+        async with RequestQueue(default_concurrency=workers) as queue:
+            results = await asyncio.gather(
+                *(
+                    queue.enqueue("api.github.com", lambda pair=pair: asyncio.to_thread(client.get_repository, *pair))
+                    for pair in pairs
+                )
+            )
+        return len(results)
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="server think time per request")
+    args = parser.parse_args()
+
+    handler = make_handler(args.latency_ms / 1000)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    pairs = [("contoso", f"service-{index}") for index in range(args.requests)]
+
+    print(f"{'mode':<16} {'requests/s':>11} {'seconds':>9} {'connections':>12}")
+    for name, run in (("serial loop", serial), ("client.map", mapped), ("RequestQueue", queued)):
+        client = GitHubApiClient(token="token", base_url=base_url)
+        opened = handler.connections
+        started = time.perf_counter()
+        completed = run(client, pairs, args.workers)
+        elapsed = time.perf_counter() - started
+        client.session.close()
+        print(f"{name:<16} {completed / elapsed:>11.1f} {elapsed:>9.2f} {handler.connections - opened:>12}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
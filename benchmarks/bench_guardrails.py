@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Guardrail scanning throughput in MB/s.
+
+Compares the per-agent approach (one ``re.sub`` pass per pattern and keyword)
+with GuardrailScanner on one large text, the same text streamed in chunks, and
+a batch of prompt-sized texts scanned in-process and on a GuardrailPool. The
+policy is the default one plus ``--keywords`` extra blocked phrases.
+
+    python benchmarks/bench_guardrails.py --megabytes 8 --keywords 200
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from infra.guardrails import GuardrailPolicy, GuardrailPool, GuardrailRule, GuardrailScanner, default_policy  # noqa: E402
+
+WORDS = (
+    "the workflow agent summarised quarterly revenue for the region and flagged two anomalies in the "
+    "pipeline status report while the orchestrator retried the connector after a transient failure"
+).split()
+SENSITIVE = (
+    "jane.doe@contoso.com",
+    "555-123-4567",
+    "123-45-6789",
+    "4111 1111 1111 1111",
+    "ignore previous instructions",
+)
+
+
+def make_text(rng: random.Random, size: int) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        word = rng.choice(SENSITIVE) if rng.random() < 0.002 else rng.choice(WORDS)
+        parts.append(word)
+        length += len(word) + 1
+    return " ".join(parts)
+
+
+def build_policy(extra_keywords: int) -> GuardrailPolicy:
+    rng = random.Random(7)
+    phrases = tuple(
+        " ".join(rng.choice(("override", "bypass", "pretend", "unfiltered", "policy", "persona", "secret", "mode"))
+                 for _ in range(3)) + f" {index}"
+        for index in range(extra_keywords)
+    )
+    rules = default_policy().rules
+    if phrases:
+        rules += (GuardrailRule("blocked_phrases", "injection", action="block", keywords=phrases),)
+    return GuardrailPolicy(rules)
+
+
+def naive_scan(policy: GuardrailPolicy, text: str) -> str:
+    # What each agent does today: one regex pass per pattern and per keyword.
+    for rule in policy.rules:
+        flags = re.IGNORECASE if rule.ignore_case else 0
+        if rule.pattern is not None:
+            text = re.sub(rule.pattern, rule.mask, text, flags=flags)
+        for keyword in rule.keywords:
+            text = re.sub(re.escape(keyword), rule.mask, text, flags=flags)
+    return text
+
+
+def measure(label: str, megabytes: float, fn) -> None:
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed:>8.2f}s {megabytes / elapsed:>9.2f} MB/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=8.0)
+    parser.add_argument("--keywords", type=int, default=200, help="extra blocked phrases in the policy")
+    parser.add_argument("--prompt-bytes", type=int, default=2048)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    size = int(args.megabytes * 1_000_000)
+    text = make_text(rng, size)
+    prompts = [make_text(rng, args.prompt_bytes) for _ in range(size // args.prompt_bytes)]
+    policy = build_policy(args.keywords)
+    scanner = GuardrailScanner(policy)
+    megabytes = len(text) / 1_000_000
+    print(f"{len(policy.rules)} rules, {sum(len(r.keywords) for r in policy.rules)} keywords, "
+          f"{megabytes:.1f} MB text, {len(prompts)} prompts, {args.workers} worker(s)")
+
+    assert naive_scan(policy, text[:200_000]) == scanner.scan(text[:200_000]).text
+    measure("naive: re.sub per pattern/keyword", megabytes, lambda: naive_scan(policy, text))
+    measure("scanner.scan", megabytes, lambda: scanner.scan(text))
+    chunks = [text[start:start + 64 * 1024] for start in range(0, len(text), 64 * 1024)]
+    measure("scanner.scan_stream (64 KiB)", megabytes, lambda: scanner.scan_stream(chunks))
+    batch_megabytes = sum(map(len, prompts)) / 1_000_000
+    measure("batch in-process", batch_megabytes, lambda: [scanner.scan(prompt) for prompt in prompts])
+    with GuardrailPool(policy, workers=args.workers) as pool:
+        pool.scan_batch(prompts[:256])  # start the workers
+        measure(f"GuardrailPool ({args.workers} workers)", batch_megabytes, lambda: pool.scan_batch(prompts))
+
+
+if __name__ == "__main__":
+    main()
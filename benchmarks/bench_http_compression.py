@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Wire bytes and transfer time of Session with and without content coding.
+
+A local server streams a JSON list page (``--items`` repositories) and accepts a
+bulk POST body, both throttled to ``--bandwidth-kbps`` to model constrained
+egress. Each mode is timed over ``--rounds`` requests.
+
+    python benchmarks/bench_http_compression.py --items 100 --bandwidth-kbps 2048
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from github_client.http import Session  # noqa: E402
+
+
+def repository(index: int) -> dict:
+    return {
+        "id": index,
+        "name": f"service-{index}",
+        "full_name": f"contoso/service-{index}",
+        "private": index % 3 == 0,
+        "owner": {"login": "contoso", "id": 42, "type": "Organization"},
+        "description": f"Agent service {index} for the enterprise workflow platform",
+        "html_url": f"https://github.com/contoso/service-{index}",
+        "default_branch": "main",
+        "topics": ["agents", "workflow", "automation"],
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-06-01T12:00:00Z",
+    }
+
+
+def make_handler(page: bytes, bytes_per_second: float):
+    gzipped = gzip.compress(page)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            compress = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = gzipped if compress else page
+            self.send_response(200)
+            if compress:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            for start in range(0, len(body), 16 * 1024):
+                chunk = body[start:start + 16 * 1024]
+                self.wfile.write(chunk)
+                time.sleep(len(chunk) / bytes_per_second)
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(len(body) / bytes_per_second)
+            if self.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            json.loads(body)
+            self.send_response(201)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def run(session: Session, method: str, url: str, rounds: int, payload=None):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        response = session.request(method=method, url=url, json=payload)
+    elapsed = (time.perf_counter() - started) / rounds
+    wire = response.received_bytes if method == "GET" else response.request_bytes
+    decoded = len(response.content) if method == "GET" else response.request_raw_bytes
+    return wire, decoded, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="repositories per list page")
+    parser.add_argument("--bandwidth-kbps", type=float, default=2048.0, help="simulated link, KiB/s")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    items = [repository(index) for index in range(args.items)]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(json.dumps(items).encode(), args.bandwidth_kbps * 1024))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/repos"
+
+    cases = [
+        ("GET list page, identity", Session(accept_encoding=None), "GET", None),
+        ("GET list page, gzip", Session(), "GET", None),
+        ("POST bulk body, identity", Session(), "POST", {"items": items * 5}),
+        ("POST bulk body, gzip", Session(compress_request_min_bytes=1024), "POST", {"items": items * 5}),
+    ]
+    print(f"{'case':<26} {'wire bytes':>12} {'decoded':>12} {'ms/request':>11}")
+    for name, session, method, payload in cases:
+        wire, decoded, elapsed = run(session, method, url, args.rounds, payload)
+        print(f"{name:<26} {wire:>12,} {decoded:>12,} {elapsed * 1000:>11.1f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
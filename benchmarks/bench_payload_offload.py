@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Memory of a fan-out workflow with and without the payload offload store.
+
+``--steps`` requests go through RateLimitedRequestQueue, and each returns a
+distinct payload of ``--sizes`` bytes. Every outcome is held until the fan-in
+step has read them all, as a workflow holds its step results. Peak traced
+Python memory is reported per payload size. With offloading it should track the
+number of payloads, not their size. Blob contents live in memory-mapped files
+(page cache), not on the Python heap.
+
+    python benchmarks/bench_payload_offload.py --steps 200 --sizes 65536 1048576
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from infra.payloads import PayloadStore  # noqa: E402
+from infra.queue import RateLimitedRequestQueue, RequestOutcome  # noqa: E402
+
+
+async def fan_out(steps: int, size: int, store) -> int:
+    queue = RateLimitedRequestQueue(max_workers=8, per_host_limit=8, payload_store=store)
+    await queue.start()
+
+    def step(index: int):
+        async def call() -> RequestOutcome:
+            # A fresh body per step, as if decoded from the response.
+            return RequestOutcome(200, payload=index.to_bytes(4, "big") * (size // 4))
+        return call
+
+    outcomes = await asyncio.gather(*(queue.enqueue(f"shard-{index % 8}", step(index)) for index in range(steps)))
+    await queue.close()
+    # Fan-in: read every result while all of them are still held.
+    total = 0
+    for outcome in outcomes:
+        payload = outcome.payload
+        if store is None:
+            total += payload[0]
+        else:
+            with payload.view() as view:
+                total += view[0]
+    for outcome in outcomes:
+        if store is not None:
+            outcome.payload.release()
+    return total
+
+
+def measure(steps: int, size: int, store) -> tuple:
+    tracemalloc.start()
+    started = time.perf_counter()
+    asyncio.run(fan_out(steps, size, store))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64 * 1024, 1024 * 1024])
+    parser.add_argument("--threshold", type=int, default=16 * 1024)
+    args = parser.parse_args()
+
+    print(f"{'payload':>10} {'mode':<10} {'peak MiB':>9} {'KiB/step':>9} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as root:
+        for size in args.sizes:
+            for label in ("in-memory", "offload"):
+                store = PayloadStore(root, threshold_bytes=args.threshold) if label == "offload" else None
+                peak, elapsed = measure(args.steps, size, store)
+                print(f"{size:>10} {label:<10} {peak / 2**20:>9.1f} {peak / args.steps / 1024:>9.1f} {elapsed:>8.2f}")
+                if store is not None:
+                    store.collect()
+        print(f"blobs left after collect: {sum(len(files) for _, _, files in os.walk(root))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Memory cost of queued and retrying requests in both queue engines.
+
+Reports, per request:
+
+* bytes while queued (workers not yet started), split into everything traced and
+  the part allocated by ``infra/queue`` itself (the caller's enqueue task and
+  coroutine make up most of the rest);
+* live allocations (tracemalloc blocks) and bytes while every request is parked
+  in rate-limit backoff waiting for its retry;
+* peak traced bytes while a burst runs to completion.
+
+    python benchmarks/bench_queue_memory.py --requests 100000
+"""
+
+import argparse
+import asyncio
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from infra.queue import RateLimitedRequestQueue, RequestOutcome  # noqa: E402
+from infra.queue.request_queue import FakeResponse, RequestQueue  # noqa: E402
+
+QUEUE_DIR = str(Path(__file__).resolve().parents[1] / "infra" / "queue")
+OK = RequestOutcome(status_code=200)
+OK_RESPONSE = FakeResponse(status=200)
+
+
+def _traced(snapshot: tracemalloc.Snapshot):
+    stats = snapshot.statistics("filename")
+    total = sum(stat.size for stat in stats), sum(stat.count for stat in stats)
+    own = sum(stat.size for stat in stats if stat.traceback[0].filename.startswith(QUEUE_DIR))
+    return total, own
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def once_rate_limited(seen: set, index: int, limited, ok):
+    async def call():
+        if index in seen:
+            return ok
+        seen.add(index)
+        return limited
+
+    return call
+
+
+async def measure(make_queue, start, limited, ok, requests: int):
+    # Queued: 64 hosts, nothing dispatched yet.
+    queue = make_queue()
+    functions = [once_rate_limited({-1}, -1, limited, ok) for _ in range(requests)]
+    tracemalloc.start()
+    base = _snapshot()
+    callers = [asyncio.ensure_future(queue.enqueue(f"host-{i % 64}", functions[i])) for i in range(requests)]
+    await asyncio.sleep(0)
+    queued = _snapshot()
+    tracemalloc.stop()
+    await start(queue)
+    await asyncio.gather(*callers)
+    await queue.close()
+    del callers
+
+    # In backoff: one request per (already tracked) host, each rate limited once.
+    queue = make_queue()
+    await start(queue)
+    hosts = [f"tenant-{i}" for i in range(requests)]
+    warm = once_rate_limited({-1}, -1, limited, ok)
+    await asyncio.gather(*(queue.enqueue(host, warm) for host in hosts))
+    seen: set = set()
+    functions = [once_rate_limited(seen, i, limited, ok) for i in range(requests)]
+    tracemalloc.start()
+    retry_base = _snapshot()
+    callers = [asyncio.ensure_future(queue.enqueue(hosts[i], functions[i])) for i in range(requests)]
+    while len(seen) < requests:
+        await asyncio.sleep(0.01)
+    parked = _snapshot()
+    tracemalloc.reset_peak()
+    await asyncio.gather(*callers)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await queue.close()
+    return base, queued, retry_base, parked, peak
+
+
+async def rate_limited_engine(requests: int):
+    async def start(queue):
+        await queue.start()
+
+    def make_queue():
+        return RateLimitedRequestQueue(
+            max_workers=64, per_host_limit=1, max_hosts=requests * 2, base_backoff_seconds=0.5, jitter_ratio=0.0
+        )
+
+    limited = RequestOutcome(status_code=429, headers={"retry-after": "2"})
+    return await measure(make_queue, start, limited, OK, requests)
+
+
+async def request_engine(requests: int):
+    async def start(queue):
+        pass  # RequestQueue starts per-host workers on first enqueue
+
+    def make_queue():
+        return RequestQueue(base_backoff=0.5, max_backoff=2.0, jitter=0.0, max_hosts=requests * 2)
+
+    limited = FakeResponse(status=429, headers={"Retry-After": "2"})
+    return await measure(make_queue, start, limited, OK_RESPONSE, requests)
+
+
+def report(name: str, requests: int, result) -> None:
+    base, queued, retry_base, parked, peak = result
+    (base_bytes, base_blocks), base_own = _traced(base)
+    (queued_bytes, _), queued_own = _traced(queued)
+    (retry_bytes, retry_blocks), _ = _traced(retry_base)
+    (parked_bytes, parked_blocks), parked_own = _traced(parked)
+    print(f"{name}")
+    print(f"  queued:        {(queued_bytes - base_bytes) / requests:8.0f} B/request"
+          f" ({(queued_own - base_own) / requests:.0f} B allocated in infra/queue)")
+    print(f"  in backoff:    {(parked_bytes - retry_bytes) / requests:8.0f} B/request"
+          f"  {(parked_blocks - retry_blocks) / requests:6.1f} live allocations/request")
+    print(f"  peak to done:  {(peak - retry_bytes) / requests:8.0f} B/request")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+    print(f"requests={args.requests}")
+    started = time.perf_counter()
+    report("RateLimitedRequestQueue", args.requests, asyncio.run(rate_limited_engine(args.requests)))
+    report("RequestQueue", args.requests, asyncio.run(request_engine(args.requests)))
+    print(f"elapsed {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Wall time of a wide runbook executed serially (schemaVersion 1.0) versus as a DAG.
+
+The runbook is one root step, ``--steps - 2`` independent steps and a sink that
+waits for all of them. Each step sleeps ``--step-ms`` to stand in for a Graph or
+GitHub API call.
+
+    python benchmarks/bench_runbook_dag.py --steps 200 --step-ms 10
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from infra.runbook import RunbookExecutor  # noqa: E402
+
+
+def wide_runbook(steps: int, as_dag: bool) -> dict:
+    middle = [f"step-{index}" for index in range(steps - 2)]
+    definitions = [{"id": "root", "name": "root", "action": "noop"}]
+    definitions += [{"id": step_id, "name": step_id, "action": "noop"} for step_id in middle]
+    definitions.append({"id": "sink", "name": "sink", "action": "noop"})
+    if as_dag:
+        definitions[0]["dependsOn"] = []
+        for definition in definitions[1:-1]:
+            definition["dependsOn"] = ["root"]
+        definitions[-1]["dependsOn"] = middle
+    return {
+        "schemaVersion": "1.1" if as_dag else "1.0",
+        "runbookId": "bench-wide",
+        "scopes": ["Directory.ReadWrite.All"],
+        "steps": definitions,
+    }
+
+
+async def run(runbook: dict, step_seconds: float, concurrency: int, scope_limit: int) -> float:
+    async def run_step(step):
+        await asyncio.sleep(step_seconds)
+
+    executor = RunbookExecutor(
+        run_step, max_concurrency=concurrency, scope_limits={"Directory.ReadWrite.All": scope_limit}
+    )
+    start = time.perf_counter()
+    result = await executor.run(runbook)
+    elapsed = time.perf_counter() - start
+    assert result.status == "Completed"
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--step-ms", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--scope-limit", type=int, default=32)
+    args = parser.parse_args()
+
+    step_seconds = args.step_ms / 1000
+    serial = asyncio.run(run(wide_runbook(args.steps, False), step_seconds, args.concurrency, args.scope_limit))
+    dag = asyncio.run(run(wide_runbook(args.steps, True), step_seconds, args.concurrency, args.scope_limit))
+    print(f"steps={args.steps} step_ms={args.step_ms} concurrency={args.concurrency} scope_limit={args.scope_limit}")
+    print(f"{'mode':<10}{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':<10}{serial:>10.3f}{1.0:>10.2f}")
+    print(f"{'dag':<10}{dag:>10.3f}{serial / dag:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Throughput of ShardedRequestQueue from 1 to N shards versus a single event loop.
+
+The handler decodes a ~64 KB JSON listing per request, standing in for the
+response decoding and callback work that pins a single-loop queue to one core.
+
+    python benchmarks/bench_sharded_queue.py --requests 4000 --max-shards 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from infra.queue import RateLimitedRequestQueue, RequestOutcome  # noqa: E402
+from infra.queue.sharded import ShardedRequestQueue  # noqa: E402
+
+BODY = json.dumps([{"id": index, "name": f"repo-{index}", "topics": ["a", "b", "c"]} for index in range(1200)])
+QUEUE_OPTIONS = {"max_workers": 64, "per_host_limit": 4}
+
+
+async def decode_listing(host: str, payload: object) -> RequestOutcome:
+    items = json.loads(BODY)
+    return RequestOutcome(status_code=200, headers={}, payload=len(items))
+
+
+async def run_single_loop(requests: int, hosts: int) -> float:
+    queue = RateLimitedRequestQueue(**QUEUE_OPTIONS)
+    await queue.start()
+    start = time.perf_counter()
+    hosts_by_request = [f"tenant-{index % hosts}" for index in range(requests)]
+    await asyncio.gather(*(queue.enqueue(host, lambda h=host: decode_listing(h, None)) for host in hosts_by_request))
+    elapsed = time.perf_counter() - start
+    await queue.close()
+    return elapsed
+
+
+async def run_sharded(requests: int, hosts: int, shards: int) -> float:
+    queue = ShardedRequestQueue(decode_listing, shards=shards, queue_options=QUEUE_OPTIONS)
+    await queue.start()
+    await asyncio.gather(*(queue.enqueue(f"tenant-{index}") for index in range(hosts)))  # warm up shards
+    start = time.perf_counter()
+    await asyncio.gather(*(queue.enqueue(f"tenant-{index % hosts}") for index in range(requests)))
+    elapsed = time.perf_counter() - start
+    await queue.close()
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--hosts", type=int, default=256)
+    parser.add_argument("--max-shards", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} requests={args.requests} hosts={args.hosts}")
+    baseline = asyncio.run(run_single_loop(args.requests, args.hosts))
+    print(f"{'mode':<16}{'req/s':>12}{'speedup':>10}")
+    print(f"{'single-loop':<16}{args.requests / baseline:>12.0f}{1.0:>10.2f}")
+    shards = 1
+    while shards <= args.max_shards:
+        elapsed = asyncio.run(run_sharded(args.requests, args.hosts, shards))
+        print(f"{f'sharded x{shards}':<16}{args.requests / elapsed:>12.0f}{baseline / elapsed:>10.2f}")
+        shards *= 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""Replay recorded GitHub API traffic through the client and both queue engines.
+
+    # capture a workload against the real API
+    python benchmarks/replay_driver.py record --token $GITHUB_TOKEN --org contoso -o workload.ghrec
+    # or generate a production-shaped one offline
+    python benchmarks/replay_driver.py synthesize -o workload.ghrec
+    # replay it; keep the report and compare the next commit against it
+    python benchmarks/replay_driver.py run workload.ghrec --output before.json
+    python benchmarks/replay_driver.py run workload.ghrec --baseline before.json
+
+``run`` sends every recorded request through three engines:
+- ``GitHubApiClient`` over a ReplaySession (serial, as sync tooling calls it);
+- ``RateLimitedRequestQueue``;
+- ``RequestQueue``.
+Responses take their recorded latency times ``--latency-scale``. Each engine
+reports throughput and p50/p95/p99 latency. With ``--baseline``, each metric
+is also shown as a percentage change from an earlier report.
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from github_client import GitHubApiClient  # noqa: E402
+from github_client.recording import (  # noqa: E402
+    MAGIC,
+    RecordedExchange,
+    RecordingSession,
+    ReplaySession,
+    read_exchanges,
+    replay_response,
+    write_exchanges,
+)
+from infra.queue import RateLimitedRequestQueue, RequestOutcome  # noqa: E402
+from infra.queue.request_queue import FakeResponse, RequestQueue  # noqa: E402
+
+BASE_URL = "https://api.github.com"
+
+
+def summarize(latencies: List[float], seconds: float) -> Dict[str, float]:
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": len(latencies),
+        "seconds": seconds,
+        "throughput": len(latencies) / seconds if seconds else 0.0,
+        "p50": cuts[49],
+        "p95": cuts[94],
+        "p99": cuts[98],
+    }
+
+
+def run_client(exchanges: List[RecordedExchange], scale: float) -> Dict[str, float]:
+    session = ReplaySession(exchanges, latency_scale=scale)
+    client = GitHubApiClient(token="replay", base_url=BASE_URL, session=session, max_retries=0)
+    latencies = []
+    started = time.perf_counter()
+    for exchange in exchanges:
+        path = exchange.url[len(BASE_URL):]
+        begun = time.perf_counter()
+        try:
+            client._request(
+                exchange.method, path, params=exchange.params or None, json_body=exchange.json_body, operation="replay"
+            )
+        except Exception:  # noqa: BLE001 - recorded errors are part of the workload
+            pass
+        latencies.append(time.perf_counter() - begun)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run_queue(engine: str, exchanges: List[RecordedExchange], scale: float, concurrency: int) -> Dict[str, float]:
+    if engine == "rate_limited_queue":
+        queue = RateLimitedRequestQueue(max_workers=concurrency * 4, per_host_limit=concurrency)
+        await queue.start()
+    else:
+        queue = RequestQueue(default_concurrency=concurrency)
+
+    def call(exchange: RecordedExchange):
+        async def request():
+            await asyncio.sleep(exchange.elapsed_seconds * scale)
+            response = replay_response(exchange)
+            payload = response.json() if response.content else None
+            if engine == "rate_limited_queue":
+                return RequestOutcome(response.status_code, response.headers, payload)
+            return FakeResponse(response.status_code, response.headers, payload)
+        return request
+
+    async def timed(exchange: RecordedExchange) -> float:
+        begun = time.perf_counter()
+        try:
+            await queue.enqueue(urlsplit(exchange.url).netloc, call(exchange))
+        except Exception:  # noqa: BLE001 - e.g. rate limited past max attempts
+            pass
+        return time.perf_counter() - begun
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(exchange) for exchange in exchanges))
+    seconds = time.perf_counter() - started
+    await queue.close()
+    return summarize(list(latencies), seconds)
+
+
+def command_run(args: argparse.Namespace) -> None:
+    exchanges = list(read_exchanges(args.recording))
+    report = {
+        "recording": args.recording,
+        "latency_scale": args.latency_scale,
+        "engines": {
+            "github_api_client": run_client(exchanges, args.latency_scale),
+            "rate_limited_queue": asyncio.run(
+                run_queue("rate_limited_queue", exchanges, args.latency_scale, args.concurrency)
+            ),
+            "request_queue": asyncio.run(run_queue("request_queue", exchanges, args.latency_scale, args.concurrency)),
+        },
+    }
+    baseline = json.loads(Path(args.baseline).read_text())["engines"] if args.baseline else {}
+    print(f"{len(exchanges)} exchanges, latency x{args.latency_scale}")
+    print(f"{'engine':<20} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for engine, stats in report["engines"].items():
+        row = f"{engine:<20} {stats['throughput']:>9.1f} " + " ".join(
+            f"{stats[q] * 1000:>8.1f}" for q in ("p50", "p95", "p99")
+        )
+        print(row)
+        if engine in baseline:
+            before = baseline[engine]
+            deltas = [
+                (stats[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+                for metric in ("throughput", "p50", "p95", "p99")
+            ]
+            print(f"{'  vs baseline':<20} " + " ".join(f"{delta:>+8.1f}%" for delta in deltas))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+def command_synthesize(args: argparse.Namespace) -> None:
+    """Org listing pages plus per-repository reads, with long-tailed latency."""
+    rng = random.Random(args.seed)
+    exchanges = []
+
+    def latency() -> float:
+        return min(2.0, rng.lognormvariate(-3.2, 0.6))
+
+    repos = [f"service-{index}" for index in range(args.repos)]
+    for page_number, start in enumerate(range(0, len(repos) + 1, 100), 1):
+        page = [
+            {"id": index, "name": name, "full_name": f"{args.org}/{name}", "private": False,
+             "owner": {"login": args.org, "id": 1}, "description": f"Service {index} for the agent platform",
+             "topics": ["agents", "workflow"], "default_branch": "main"}
+            for index, name in enumerate(repos[start:start + 100], start)
+        ]
+        exchanges.append(RecordedExchange(
+            "GET", f"{BASE_URL}/orgs/{args.org}/repos", 200, "OK",
+            {"Content-Type": "application/json", "Content-Encoding": "gzip", "X-RateLimit-Remaining": "4000"},
+            latency() * 3, params={"per_page": 100, "page": page_number}, body_encoding="gzip",
+            body=gzip.compress(json.dumps(page).encode(), mtime=0),
+        ))
+    for index, name in enumerate(repos):
+        missing = rng.random() < 0.02
+        body = {"message": "Not Found"} if missing else {
+            "id": index, "name": name, "full_name": f"{args.org}/{name}", "private": False,
+            "owner": {"login": args.org, "id": 1},
+        }
+        exchanges.append(RecordedExchange(
+            "GET", f"{BASE_URL}/repos/{args.org}/{name}", 404 if missing else 200, "Not Found" if missing else "OK",
+            {"Content-Type": "application/json", "X-RateLimit-Remaining": "4000"}, latency(),
+            body=json.dumps(body).encode(),
+        ))
+    with gzip.open(args.output, "wb") as stream:
+        stream.write(MAGIC)
+        write_exchanges(stream, exchanges)
+    print(f"wrote {len(exchanges)} exchanges to {args.output}")
+
+
+def command_record(args: argparse.Namespace) -> None:
+    with RecordingSession(args.output) as session:
+        client = GitHubApiClient(token=args.token, session=session)
+        names = [repo["name"] for _, repo in zip(range(args.repos), client.paginate(f"/orgs/{args.org}/repos"))]
+        for name in names:
+            client.get_repository(args.org, name)
+    print(f"recorded {session.recorded} exchanges to {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="replay a recording and report per-engine throughput and latency")
+    run.add_argument("recording")
+    run.add_argument("--latency-scale", type=float, default=1.0)
+    run.add_argument("--concurrency", type=int, default=8, help="per-host concurrency for the queue engines")
+    run.add_argument("--output", help="write the report as JSON")
+    run.add_argument("--baseline", help="earlier JSON report to compare against")
+    run.set_defaults(handler=command_run)
+
+    synthesize = commands.add_parser("synthesize", help="write a production-shaped recording without network")
+    synthesize.add_argument("-o", "--output", required=True)
+    synthesize.add_argument("--org", default="contoso")
+    synthesize.add_argument("--repos", type=int, default=500)
+    synthesize.add_argument("--seed", type=int, default=11)
+    synthesize.set_defaults(handler=command_synthesize)
+
+    record = commands.add_parser("record", help="record a listing and repository reads against the live API")
+    record.add_argument("-o", "--output", required=True)
+    record.add_argument("--token", required=True)
+    record.add_argument("--org", required=True)
+    record.add_argument("--repos", type=int, default=200)
+    record.set_defaults(handler=command_record)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Alert deduplication and coalescing."""
+
+from .pipeline import (
+    AlertDeduplicator,
+    AlertPipeline,
+    AlertPipelineMetrics,
+    AlertSummary,
+    TrackedAlert,
+    dedup_key,
+)
+
+__all__ = [
+    "AlertDeduplicator",
+    "AlertPipeline",
+    "AlertPipelineMetrics",
+    "AlertSummary",
+    "TrackedAlert",
+    "dedup_key",
+]
@@ -0,0 +1,347 @@
+"""In-process alert deduplication and per-route coalescing (docs/alerting.md).
+
+Envelopes sharing ``correlationId + category + severity`` within the dedup
+window update one tracked alert instead of creating a new one. Every flush
+interval each route ``(channel, audience)`` with activity gets one summary,
+sent through :class:`~infra.queue.RateLimitedRequestQueue` under the host key
+``alerts:<channel>`` so channel throttling backs off that channel only. Each
+route has at most one summary in flight; while it is, new activity for the
+route keeps coalescing. ``security`` alerts skip suppression (rule 3): they are
+neither deduplicated nor coalesced, and each is sent on its own.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from infra.queue import RateLimitedRequestQueue, RequestOutcome
+
+SEVERITIES = ("Sev0", "Sev1", "Sev2", "Sev3")
+UNSUPPRESSED_CATEGORIES = frozenset({"security"})
+DEFAULT_DEDUP_WINDOW_MINUTES = 10
+
+DedupKey = Tuple[str, str, str]
+Route = Tuple[str, str]
+
+
+def dedup_key(envelope: Mapping[str, Any]) -> DedupKey:
+    return (envelope.get("correlationId") or "", envelope.get("category") or "", envelope.get("severity") or "")
+
+
+def _severity_rank(severity: str) -> int:
+    return SEVERITIES.index(severity) if severity in SEVERITIES else len(SEVERITIES)
+
+
+@dataclass
+class TrackedAlert:
+    """One deduplicated alert; ``envelope`` is the most recent occurrence."""
+
+    key: DedupKey
+    alert_id: str
+    envelope: Mapping[str, Any]
+    first_seen: float
+    last_seen: float
+    occurrences: int = 1
+
+
+class AlertDeduplicator:
+    """Time-windowed hash index of alerts by dedup key.
+
+    An alert stays open while occurrences keep arriving within ``window_seconds`` of
+    the previous one. At most ``max_tracked`` alerts are kept; beyond that the alert
+    updated least recently is forgotten early, so memory stays bounded in a storm of
+    distinct keys.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float,
+        *,
+        max_tracked: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        if max_tracked <= 0:
+            raise ValueError("max_tracked must be positive")
+        self._window = window_seconds
+        self._max_tracked = max_tracked
+        self._clock = clock
+        # Ordered by last update, so expiry only ever inspects the front.
+        self._alerts: "OrderedDict[DedupKey, TrackedAlert]" = OrderedDict()
+        self.evicted = 0
+
+    def observe(self, envelope: Mapping[str, Any]) -> Tuple[TrackedAlert, bool]:
+        """Record ``envelope``; returns the tracked alert and whether it was newly created."""
+        now = self._clock()
+        self.expire(now)
+        key = dedup_key(envelope)
+        alert = self._alerts.get(key)
+        if alert is not None:
+            alert.envelope = envelope
+            alert.last_seen = now
+            alert.occurrences += 1
+            self._alerts.move_to_end(key)
+            return alert, False
+        alert = TrackedAlert(key, envelope.get("alertId") or "", envelope, now, now)
+        self._alerts[key] = alert
+        if len(self._alerts) > self._max_tracked:
+            self._alerts.popitem(last=False)
+            self.evicted += 1
+        return alert, True
+
+    def expire(self, now: Optional[float] = None) -> int:
+        cutoff = (self._clock() if now is None else now) - self._window
+        expired = 0
+        while self._alerts:
+            alert = next(iter(self._alerts.values()))
+            if alert.last_seen > cutoff:
+                break
+            self._alerts.popitem(last=False)
+            expired += 1
+        return expired
+
+    def get(self, key: DedupKey) -> Optional[TrackedAlert]:
+        return self._alerts.get(key)
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+
+@dataclass
+class AlertSummary:
+    """Coalesced activity for one route since the previous flush."""
+
+    channel: str
+    audience: str
+    new_alerts: int = 0
+    updated_alerts: int = 0
+    occurrences: int = 0
+    highest_severity: str = ""
+    alerts: List[TrackedAlert] = field(default_factory=list)
+    omitted: int = 0
+
+
+class _RouteBucket:
+    __slots__ = ("summary", "seen", "max_items")
+
+    def __init__(self, channel: str, audience: str, max_items: int) -> None:
+        self.summary = AlertSummary(channel, audience)
+        self.seen: set[DedupKey] = set()
+        self.max_items = max_items
+
+    def add(self, alert: TrackedAlert, created: bool) -> None:
+        summary = self.summary
+        summary.occurrences += 1
+        if created:
+            summary.new_alerts += 1
+        severity = alert.key[2]
+        if not summary.highest_severity or _severity_rank(severity) < _severity_rank(summary.highest_severity):
+            summary.highest_severity = severity
+        if alert.key in self.seen:
+            return
+        self.seen.add(alert.key)
+        if not created:
+            summary.updated_alerts += 1
+        if len(summary.alerts) < self.max_items:
+            summary.alerts.append(alert)
+        else:
+            summary.omitted += 1
+
+
+@dataclass
+class AlertPipelineMetrics:
+    received: int = 0
+    deduplicated: int = 0
+    dropped: int = 0
+    summaries_sent: int = 0
+    send_failures: int = 0
+    unsuppressed_evicted: int = 0
+
+
+AlertSender = Callable[[AlertSummary], Awaitable[RequestOutcome]]
+
+
+class AlertPipeline:
+    """Deduplicate alert envelopes and send one coalesced summary per route per interval.
+
+    ``send(summary)`` delivers a summary to its channel (Teams post or card edit,
+    email, webhook, ...) and is run through ``queue``. ``channels`` restricts the
+    channels summaries are sent to (``ALERTING_CHANNELS``); envelopes routed only to
+    other channels are still deduplicated but produce no outbound call. At most
+    ``max_pending_unsuppressed`` unsuppressed summaries wait for a flush; beyond that
+    the oldest is dropped and counted in ``metrics.unsuppressed_evicted``.
+    """
+
+    def __init__(
+        self,
+        queue: RateLimitedRequestQueue,
+        send: AlertSender,
+        *,
+        dedup_window_seconds: float = DEFAULT_DEDUP_WINDOW_MINUTES * 60,
+        flush_interval_seconds: float = 5.0,
+        max_tracked_alerts: int = 10_000,
+        max_summary_items: int = 20,
+        max_pending_unsuppressed: int = 1_000,
+        channels: Optional[Sequence[str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if flush_interval_seconds <= 0:
+            raise ValueError("flush_interval_seconds must be positive")
+        if max_pending_unsuppressed <= 0:
+            raise ValueError("max_pending_unsuppressed must be positive")
+        self._queue = queue
+        self._send = send
+        self._dedup = AlertDeduplicator(dedup_window_seconds, max_tracked=max_tracked_alerts, clock=clock)
+        self._flush_interval = flush_interval_seconds
+        self._max_summary_items = max_summary_items
+        self._channels = None if channels is None else frozenset(channels)
+        self._clock = clock
+        self._buckets: Dict[Route, _RouteBucket] = {}
+        # Unsuppressed alerts waiting for the next flush, one summary per alert and route.
+        self._unsuppressed: Deque[AlertSummary] = deque()
+        self._max_pending_unsuppressed = max_pending_unsuppressed
+        self._in_flight: Dict[Route, asyncio.Task[None]] = {}
+        # Every running send (routes and unsuppressed alerts), also keeping the tasks alive.
+        self._sending: set[asyncio.Task[None]] = set()
+        self._metrics = AlertPipelineMetrics()
+        self._flusher: Optional[asyncio.Task[None]] = None
+        self._stopping = asyncio.Event()
+        self._closed = False
+
+    @classmethod
+    def from_env(
+        cls,
+        queue: RateLimitedRequestQueue,
+        send: AlertSender,
+        environ: Mapping[str, str] = os.environ,
+        **options: Any,
+    ) -> "AlertPipeline":
+        """Build a pipeline from the ``ALERTING_*`` / ``ALERT_DEDUP_WINDOW_MINUTES`` flags."""
+        minutes = float(environ.get("ALERT_DEDUP_WINDOW_MINUTES", DEFAULT_DEDUP_WINDOW_MINUTES))
+        channels: Optional[Sequence[str]] = None
+        if "ALERTING_CHANNELS" in environ:
+            raw = environ["ALERTING_CHANNELS"].strip()
+            channels = json.loads(raw) if raw.startswith("[") else [part.strip() for part in raw.split(",") if part.strip()]
+        if environ.get("ALERTING_ENABLED", "true").lower() == "false":
+            channels = ["dataverse"]
+        return cls(queue, send, dedup_window_seconds=minutes * 60, channels=channels, **options)
+
+    @property
+    def metrics(self) -> AlertPipelineMetrics:
+        return self._metrics
+
+    @property
+    def tracked_alerts(self) -> int:
+        return len(self._dedup)
+
+    def submit(self, envelope: Mapping[str, Any]) -> TrackedAlert:
+        """Deduplicate ``envelope`` and add it to the pending summary of each of its routes."""
+        if self._closed:
+            raise RuntimeError("Cannot submit after pipeline is closed")
+        self._metrics.received += 1
+        unsuppressed = envelope.get("category") in UNSUPPRESSED_CATEGORIES
+        if unsuppressed:
+            now = self._clock()
+            alert, created = TrackedAlert(dedup_key(envelope), envelope.get("alertId") or "", envelope, now, now), True
+        else:
+            alert, created = self._dedup.observe(envelope)
+            if not created:
+                self._metrics.deduplicated += 1
+        routing = envelope.get("routing") or {}
+        audience = routing.get("audience") or ""
+        routed = False
+        for channel in routing.get("channels") or ():
+            if self._channels is not None and channel not in self._channels:
+                continue
+            routed = True
+            if unsuppressed:
+                single = _RouteBucket(channel, audience, 1)
+                single.add(alert, created)
+                if len(self._unsuppressed) >= self._max_pending_unsuppressed:
+                    self._unsuppressed.popleft()
+                    self._metrics.unsuppressed_evicted += 1
+                self._unsuppressed.append(single.summary)
+                continue
+            route = (channel, audience)
+            bucket = self._buckets.get(route)
+            if bucket is None:
+                bucket = self._buckets[route] = _RouteBucket(channel, audience, self._max_summary_items)
+            bucket.add(alert, created)
+        if not routed:
+            self._metrics.dropped += 1
+        return alert
+
+    async def flush(self) -> List[AlertSummary]:
+        """Send everything pending and wait for delivery.
+
+        Sends already in flight are waited for first, so routes they hold back get
+        their pending activity out too.
+        """
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        started = self._dispatch()
+        if started:
+            await asyncio.gather(*(task for _, task in started), return_exceptions=True)
+        return [summary for summary, _ in started]
+
+    def _dispatch(self) -> List[Tuple[AlertSummary, "asyncio.Task[None]"]]:
+        """Start a send for each pending unsuppressed alert and each idle route; does not wait."""
+        started = []
+        unsuppressed, self._unsuppressed = self._unsuppressed, deque()
+        for summary in unsuppressed:
+            started.append((summary, self._start_send(summary)))
+        for route in [route for route in self._buckets if route not in self._in_flight]:
+            summary = self._buckets.pop(route).summary
+            task = self._in_flight[route] = self._start_send(summary, route)
+            started.append((summary, task))
+        return started
+
+    def _start_send(self, summary: AlertSummary, route: Optional[Route] = None) -> "asyncio.Task[None]":
+        task = asyncio.create_task(self._deliver(summary, route))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+        return task
+
+    async def _deliver(self, summary: AlertSummary, route: Optional[Route]) -> None:
+        try:
+            result = await self._queue.enqueue(f"alerts:{summary.channel}", lambda: self._send(summary))
+        except Exception:  # noqa: BLE001 - counted; the pipeline keeps running
+            self._metrics.send_failures += 1
+        else:
+            if result.status_code >= 400:
+                self._metrics.send_failures += 1
+            else:
+                self._metrics.summaries_sent += 1
+        finally:
+            if route is not None:
+                self._in_flight.pop(route, None)
+
+    async def start(self) -> None:
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        """Stop the periodic flush and send whatever is still pending."""
+        if self._closed:
+            return
+        self._closed = True
+        self._stopping.set()
+        if self._flusher is not None:
+            await self._flusher
+        await self.flush()
+
+    async def _flush_periodically(self) -> None:
+        # The tick never waits for sends: a throttled route keeps its one summary in
+        # flight (and keeps coalescing) while the other routes flush on schedule.
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                self._dispatch()
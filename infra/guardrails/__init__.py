@@ -0,0 +1,28 @@
+"""Guardrail scanning and redaction for LLM prompts and responses."""
+
+from .matcher import AhoCorasick, CombinedPattern
+from .pool import GuardrailPool
+from .scanner import (
+    POLICY_OUTCOMES,
+    Finding,
+    GuardrailPolicy,
+    GuardrailRule,
+    GuardrailScanner,
+    ScanResult,
+    StreamScan,
+    default_policy,
+)
+
+__all__ = [
+    "POLICY_OUTCOMES",
+    "AhoCorasick",
+    "CombinedPattern",
+    "Finding",
+    "GuardrailPolicy",
+    "GuardrailPool",
+    "GuardrailRule",
+    "GuardrailScanner",
+    "ScanResult",
+    "StreamScan",
+    "default_policy",
+]
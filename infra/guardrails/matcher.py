@@ -0,0 +1,96 @@
+"""Single-pass multi-pattern matchers used by the guardrails scanner."""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+Match = Tuple[int, int, T]
+
+
+class AhoCorasick(Generic[T]):
+    """Aho-Corasick automaton over ``(keyword, value)`` pairs.
+
+    The goto and failure functions are folded into one transition table when the
+    automaton is built, so scanning costs one dict lookup per character and
+    reports every occurrence, including overlapping ones, in a single pass.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, T]]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, T]]] = [[]]
+        for keyword, value in keywords:
+            if not keyword:
+                raise ValueError("keywords must not be empty")
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = goto[state][char] = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((len(keyword), value))
+
+        # Breadth-first, so a state's failure target is complete before the state is.
+        delta: List[Dict[str, int]] = [dict(goto[0]) for _ in goto]
+        fail = [0] * len(goto)
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state].extend(outputs[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                pending.append(child)
+        self._delta = delta
+        self._steps = [transitions.get for transitions in delta]
+        self._outputs: List[Tuple[Tuple[int, T], ...]] = [tuple(output) for output in outputs]
+
+    @property
+    def states(self) -> int:
+        return len(self._delta)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Match[T]]:
+        """Yield ``(start, end, value)`` for every keyword occurrence starting at or after ``pos``."""
+        steps = self._steps
+        outputs = self._outputs
+        state = 0
+        for index, char in enumerate(text[pos:] if pos else text, pos):
+            state = steps[state](char, 0)
+            if outputs[state]:
+                end = index + 1
+                for length, value in outputs[state]:
+                    yield end - length, end, value
+
+
+class CombinedPattern(Generic[T]):
+    """One compiled alternation of many regular expressions.
+
+    Each pattern becomes a named group, so one ``finditer`` pass reports which
+    pattern matched via ``lastgroup``. As with any alternation, matches do not
+    overlap and at a given position the earliest listed pattern wins. Patterns may
+    not use numbered backreferences, which would point at the wrong group.
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, bool, T]]) -> None:
+        groups = []
+        self._values: Dict[str, T] = {}
+        for index, (pattern, ignore_case, value) in enumerate(patterns):
+            re.compile(pattern)  # surface errors against the pattern as written
+            name = f"p{index}"
+            groups.append(f"(?P<{name}>(?{'i' if ignore_case else '-i'}:{pattern}))")
+            self._values[name] = value
+        self._regex = re.compile("|".join(groups)) if groups else None
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[Match[T]]:
+        if self._regex is None:
+            return
+        values = self._values
+        for match in self._regex.finditer(text, pos):
+            start, end = match.span()
+            if start != end:
+                yield start, end, values[match.lastgroup]
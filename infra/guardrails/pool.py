@@ -0,0 +1,66 @@
+"""Batch scanning across worker processes."""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from .scanner import GuardrailPolicy, GuardrailScanner, ScanResult
+
+_worker_scanner: Optional[GuardrailScanner] = None
+
+
+def _init_worker(policy: GuardrailPolicy) -> None:
+    global _worker_scanner
+    _worker_scanner = GuardrailScanner(policy)
+
+
+def _scan_chunk(texts: Sequence[str]) -> List[ScanResult]:
+    assert _worker_scanner is not None
+    return [_worker_scanner.scan(text) for text in texts]
+
+
+class GuardrailPool:
+    """Scan batches of prompts or responses on ``workers`` processes.
+
+    Each worker compiles the policy once at start-up. Texts are sent in chunks of
+    ``chunksize`` so per-task pickling overhead is amortised over many small
+    prompts. Batches no larger than ``chunksize`` are scanned in-process, where the
+    round trip to a worker would cost more than the scan.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[GuardrailPolicy] = None,
+        *,
+        workers: Optional[int] = None,
+        chunksize: int = 64,
+    ) -> None:
+        if chunksize <= 0:
+            raise ValueError("chunksize must be positive")
+        self._scanner = GuardrailScanner(policy)
+        self._chunksize = chunksize
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(self._scanner.policy,)
+        )
+
+    @property
+    def scanner(self) -> GuardrailScanner:
+        return self._scanner
+
+    def scan_batch(self, texts: Sequence[str]) -> List[ScanResult]:
+        """Results in the order of ``texts``."""
+        size = self._chunksize
+        if len(texts) <= size:
+            return [self._scanner.scan(text) for text in texts]
+        chunks = [texts[start:start + size] for start in range(0, len(texts), size)]
+        return [result for results in self._executor.map(_scan_chunk, chunks) for result in results]
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> "GuardrailPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
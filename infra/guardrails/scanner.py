@@ -0,0 +1,282 @@
+"""Guardrail policy scanning and redaction for LLM prompts and responses (docs/guardrails_middleware.md).
+
+A :class:`GuardrailPolicy` is compiled once into an Aho-Corasick automaton over
+every keyword list and a single alternation of every regex rule, so a text is
+read once per matcher regardless of how many rules the policy holds. Each
+result carries the ``policy_outcome`` recorded in the workflow instance log:
+``blocked`` if a blocking rule matched, else ``redacted`` if anything was
+masked, else ``allowed``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .matcher import AhoCorasick, CombinedPattern
+
+POLICY_OUTCOMES = ("allowed", "redacted", "blocked")
+RULE_ACTIONS = ("redact", "block")
+
+# Look-behind context kept when a stream is rescanned across a chunk boundary, so
+# anchors such as ``\b`` see the character before the carried text.
+_STREAM_CONTEXT = 32
+
+
+@dataclass(frozen=True)
+class GuardrailRule:
+    """One policy rule: a regex ``pattern`` or a list of literal ``keywords``.
+
+    Keywords match anywhere in the text (not only on word boundaries). Matches are
+    replaced with ``replacement``, which defaults to ``[REDACTED:<rule_id>]``.
+    """
+
+    rule_id: str
+    category: str
+    action: str = "redact"
+    pattern: Optional[str] = None
+    keywords: Tuple[str, ...] = ()
+    ignore_case: bool = True
+    replacement: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if self.action not in RULE_ACTIONS:
+            raise ValueError(f"Rule '{self.rule_id}' has unsupported action '{self.action}'")
+        if (self.pattern is None) == (not self.keywords):
+            raise ValueError(f"Rule '{self.rule_id}' needs exactly one of pattern or keywords")
+
+    @property
+    def mask(self) -> str:
+        return self.replacement if self.replacement is not None else f"[REDACTED:{self.rule_id}]"
+
+
+@dataclass(frozen=True)
+class GuardrailPolicy:
+    """Ordered rules plus the longest match a streamed scan must be able to see whole."""
+
+    rules: Tuple[GuardrailRule, ...]
+    max_match_length: int = 256
+
+    def __post_init__(self) -> None:
+        ids = [rule.rule_id for rule in self.rules]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Rule ids must be unique")
+        if self.max_match_length <= 0:
+            raise ValueError("max_match_length must be positive")
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "GuardrailPolicy":
+        """Build a policy from its JSON form (``rules`` entries use ``id``, ``ignoreCase``)."""
+        rules = tuple(
+            GuardrailRule(
+                rule_id=rule["id"],
+                category=rule["category"],
+                action=rule.get("action", "redact"),
+                pattern=rule.get("pattern"),
+                keywords=tuple(rule.get("keywords", ())),
+                ignore_case=rule.get("ignoreCase", True),
+                replacement=rule.get("replacement"),
+            )
+            for rule in data["rules"]
+        )
+        return cls(rules, max_match_length=data.get("maxMatchLength", 256))
+
+
+def default_policy() -> GuardrailPolicy:
+    """Baseline PII, secret and prompt-injection rules; organisation policies extend or replace it."""
+    return GuardrailPolicy(
+        (
+            GuardrailRule("email", "pii", pattern=r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b"),
+            GuardrailRule("us_ssn", "pii", pattern=r"\b\d{3}-\d{2}-\d{4}\b"),
+            GuardrailRule("payment_card", "pci", pattern=r"\b(?:\d[ -]?){12,15}\d\b"),
+            GuardrailRule("phone", "pii", pattern=r"(?<![\w+])(?:\+\d{1,2}[ .-]?)?\(?\d{3}\)?[ .-]?\d{3}[ .-]?\d{4}\b"),
+            GuardrailRule(
+                "secret_token",
+                "secret",
+                pattern=r"\b(?:gh[pousr]_[A-Za-z0-9]{36}|AKIA[0-9A-Z]{16}|xox[abpr]-[A-Za-z0-9-]{10,})\b",
+                ignore_case=False,
+            ),
+            GuardrailRule(
+                "prompt_injection",
+                "injection",
+                action="block",
+                keywords=(
+                    "ignore previous instructions",
+                    "ignore all previous instructions",
+                    "disregard the above",
+                    "disregard previous instructions",
+                    "reveal your system prompt",
+                    "you are now in developer mode",
+                    "do anything now",
+                ),
+            ),
+        )
+    )
+
+
+@dataclass(frozen=True)
+class Finding:
+    """A rule match; offsets index the original (unredacted) text."""
+
+    rule_id: str
+    category: str
+    action: str
+    start: int
+    end: int
+
+
+@dataclass
+class ScanResult:
+    policy_outcome: str
+    text: str
+    findings: List[Finding] = field(default_factory=list)
+
+    @property
+    def blocked_by(self) -> List[str]:
+        return sorted({finding.rule_id for finding in self.findings if finding.action == "block"})
+
+
+class GuardrailScanner:
+    """Compiled form of a :class:`GuardrailPolicy`; safe to share across threads."""
+
+    def __init__(self, policy: Optional[GuardrailPolicy] = None) -> None:
+        self.policy = policy or default_policy()
+        rules = self.policy.rules
+        self._masks = {rule.rule_id: rule.mask for rule in rules}
+        # One automaton per case mode: case-insensitive keywords run over lower-cased text.
+        self._keywords: List[Tuple[AhoCorasick[GuardrailRule], bool]] = []
+        for ignore_case in (True, False):
+            keyword_rules = [rule for rule in rules if rule.keywords and rule.ignore_case == ignore_case]
+            if keyword_rules:
+                automaton = AhoCorasick(
+                    (keyword.lower() if ignore_case else keyword, rule)
+                    for rule in keyword_rules
+                    for keyword in rule.keywords
+                )
+                self._keywords.append((automaton, ignore_case))
+        # Blocking rules first, so they win when rules match at the same position.
+        ordered = sorted((rule for rule in rules if rule.pattern is not None), key=lambda rule: rule.action != "block")
+        self._patterns = CombinedPattern([(rule.pattern, rule.ignore_case, rule) for rule in ordered])
+
+    def scan(self, text: str) -> ScanResult:
+        """Scan ``text`` and redact every match in one pass."""
+        findings = self._find(text)
+        return ScanResult(_outcome(findings), self._redact(text, 0, len(text), findings), findings)
+
+    def stream(self) -> "StreamScan":
+        """Start an incremental scan; see :class:`StreamScan`."""
+        return StreamScan(self)
+
+    def scan_stream(self, chunks: Iterable[str]) -> ScanResult:
+        """Scan an iterable of text chunks (e.g. a streamed model response) without joining it first."""
+        stream = self.stream()
+        parts = [stream.feed(chunk) for chunk in chunks]
+        parts.append(stream.finish())
+        result = stream.result
+        result.text = "".join(parts)
+        return result
+
+    def _find(self, text: str, pos: int = 0) -> List[Finding]:
+        """Findings at or after ``pos`` sorted by start (longest first)."""
+        matches: List[Tuple[int, int, GuardrailRule]] = list(self._patterns.finditer(text, pos))
+        for automaton, ignore_case in self._keywords:
+            matches.extend(automaton.finditer(_lower_preserving_length(text) if ignore_case else text, pos))
+        matches.sort(key=lambda match: (match[0], -match[1]))
+        return [Finding(rule.rule_id, rule.category, rule.action, start, end) for start, end, rule in matches]
+
+    def _redact(self, text: str, start: int, stop: int, findings: Sequence[Finding]) -> str:
+        """Masked ``text[start:stop]``; ``findings`` are sorted and overlapping ones share one mask."""
+        parts = []
+        cursor = start
+        for finding in findings:
+            if finding.end <= cursor:
+                continue
+            if finding.start >= cursor:
+                parts.append(text[cursor:finding.start])
+                parts.append(self._masks[finding.rule_id])
+            cursor = finding.end
+        parts.append(text[cursor:stop])
+        return "".join(parts)
+
+
+class StreamScan:
+    """Incremental scan of a text that arrives in chunks.
+
+    :meth:`feed` returns the redacted text that can be released so far. Text within
+    ``policy.max_match_length`` of the end of what has arrived is held back until
+    more arrives or :meth:`finish` is called, so matches spanning chunk boundaries
+    are still redacted; longer matches can be missed at a boundary. The outcome is
+    only final once :meth:`finish` has returned.
+    """
+
+    def __init__(self, scanner: GuardrailScanner) -> None:
+        self._scanner = scanner
+        self._overlap = scanner.policy.max_match_length
+        self._buffer = ""
+        self._context = 0  # leading characters of _buffer that were already released
+        self._offset = 0  # stream offset of _buffer[0]
+        self._findings: List[Finding] = []
+        self._finished = False
+
+    def feed(self, chunk: str) -> str:
+        if self._finished:
+            raise RuntimeError("Cannot feed a finished stream scan")
+        self._buffer += chunk
+        release = len(self._buffer) - self._overlap
+        if release <= self._context:
+            return ""
+        return self._release(release)
+
+    def finish(self) -> str:
+        if self._finished:
+            return ""
+        self._finished = True
+        return self._release(None)
+
+    @property
+    def result(self) -> ScanResult:
+        """Outcome and findings so far; ``text`` is left empty as the caller holds the released output."""
+        return ScanResult(_outcome(self._findings), "", list(self._findings))
+
+    def _release(self, limit: Optional[int]) -> str:
+        buffer, context = self._buffer, self._context
+        findings = self._scanner._find(buffer, context)
+        if limit is None:
+            release = len(buffer)
+        else:
+            # Hold back from the earliest match straddling the release point.
+            release = limit
+            while True:
+                straddling = [finding.start for finding in findings if finding.start < release < finding.end]
+                if not straddling:
+                    break
+                release = min(straddling)
+            findings = [finding for finding in findings if finding.start < release]
+        text = self._scanner._redact(buffer, context, release, findings)
+        self._findings.extend(_shift(finding, self._offset) for finding in findings)
+        keep_from = max(0, release - _STREAM_CONTEXT)
+        self._buffer = buffer[keep_from:]
+        self._context = release - keep_from
+        self._offset += keep_from
+        return text
+
+
+def _outcome(findings: Sequence[Finding]) -> str:
+    if any(finding.action == "block" for finding in findings):
+        return "blocked"
+    return "redacted" if findings else "allowed"
+
+
+def _shift(finding: Finding, offset: int) -> Finding:
+    if not offset:
+        return finding
+    return Finding(finding.rule_id, finding.category, finding.action, finding.start + offset, finding.end + offset)
+
+
+def _lower_preserving_length(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. "İ") lower-case to two; keep those as-is so offsets line up.
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
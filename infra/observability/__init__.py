@@ -0,0 +1,18 @@
+"""Metrics exposition for queues and API clients."""
+
+from .collectors import DeadLetterCollector, GitHubClientCollector, RateLimitedQueueCollector, RequestQueueCollector
+from .openmetrics import CONTENT_TYPE, Histogram, MetricFamily, MetricsRegistry, render
+from .server import MetricsServer
+
+__all__ = [
+    "CONTENT_TYPE",
+    "DeadLetterCollector",
+    "GitHubClientCollector",
+    "Histogram",
+    "MetricFamily",
+    "MetricsRegistry",
+    "MetricsServer",
+    "RateLimitedQueueCollector",
+    "RequestQueueCollector",
+    "render",
+]
@@ -0,0 +1,187 @@
+"""Scrape-time collectors for the request queues and the GitHub API client.
+
+Collectors only read state the instrumented objects already maintain, so
+publishing metrics adds no locking or extra work to the request path.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping
+from urllib.parse import urlparse
+
+from .openmetrics import MetricFamily
+
+
+def _per_host(family: MetricFamily, values: Mapping[str, float]) -> MetricFamily:
+    for host, value in dict(values).items():
+        family.add(value, {"host": host})
+    return family
+
+
+def _histograms(family: MetricFamily, histograms: Mapping[str, Any], label: str = "host") -> MetricFamily:
+    for key, histogram in dict(histograms).items():
+        family.add_histogram(histogram, {label: key})
+    return family
+
+
+_QUEUE_COUNTERS = (
+    ("completed", "Requests completed."),
+    ("backoff_events", "Rate-limit backoffs observed."),
+    ("retries", "Requests re-queued after a backoff."),
+    ("expired", "Requests rejected after their deadline."),
+    ("dead_lettered", "Requests moved to the dead-letter sink."),
+    ("shed", "Requests shed by admission control."),
+    ("degraded", "Shed requests served by the degraded path."),
+)
+
+
+class _QueueCollector:
+    # Maps exported metric names to the attribute holding the per-host values.
+    _sources: Dict[str, str] = {}
+
+    def __init__(self, queue: Any, *, prefix: str) -> None:
+        self._queue = queue
+        self._prefix = prefix
+
+    def __call__(self) -> List[MetricFamily]:
+        p = self._prefix
+        metrics = self._queue.metrics
+        source = {name: getattr(metrics, attr) for name, attr in self._sources.items()}
+        depth = MetricFamily(f"{p}_depth", "gauge", "Requests waiting to be dispatched.")
+        in_flight = MetricFamily(f"{p}_in_flight", "gauge", "Requests currently executing.")
+        for host, load in self._queue.host_activity().items():
+            depth.add(load.queued, {"host": host})
+            in_flight.add(load.active, {"host": host})
+        families = [
+            depth,
+            in_flight,
+            _histograms(MetricFamily(f"{p}_wait_seconds", "histogram", "Time queued before dispatch."), source["wait"]),
+            _histograms(MetricFamily(f"{p}_service_seconds", "histogram", "Upstream call time."), source["service"]),
+        ]
+        for name, help_text in _QUEUE_COUNTERS:
+            families.append(_per_host(MetricFamily(f"{p}_{name}", "counter", help_text), source[name]))
+        remaining = MetricFamily(f"{p}_rate_limit_remaining", "gauge", "Last x-ratelimit-remaining seen.")
+        families.append(_per_host(remaining, source["rate_limit_remaining"]))
+        expected_wait = MetricFamily(f"{p}_expected_wait_seconds", "gauge", "Admission control's last wait estimate.")
+        families.append(_per_host(expected_wait, source["expected_wait"]))
+        return families
+
+
+class RateLimitedQueueCollector(_QueueCollector):
+    """Publish RateLimitedRequestQueue state and RateLimitedQueueMetrics per host."""
+
+    _sources = {
+        "wait": "wait_seconds_by_host",
+        "service": "service_seconds_by_host",
+        "completed": "completed_by_host",
+        "backoff_events": "backoff_events_by_host",
+        "retries": "retries_by_host",
+        "expired": "expired_by_host",
+        "dead_lettered": "dead_lettered_by_host",
+        "shed": "shed_by_host",
+        "degraded": "degraded_by_host",
+        "expected_wait": "expected_wait_by_host",
+        "rate_limit_remaining": "rate_limit_remaining_by_host",
+    }
+
+    def __init__(self, queue: Any, *, prefix: str = "rate_limited_queue") -> None:
+        super().__init__(queue, prefix=prefix)
+
+
+class RequestQueueCollector(_QueueCollector):
+    """Publish RequestQueue state and QueueMetrics per host."""
+
+    _sources = {
+        "wait": "wait_histograms",
+        "service": "service_histograms",
+        "completed": "completed",
+        "backoff_events": "backoff_counts",
+        "retries": "retries",
+        "expired": "expired",
+        "dead_lettered": "dead_lettered",
+        "shed": "shed",
+        "degraded": "degraded",
+        "expected_wait": "expected_wait",
+        "rate_limit_remaining": "rate_limit_remaining",
+    }
+
+    def __init__(self, queue: Any, *, prefix: str = "request_queue") -> None:
+        super().__init__(queue, prefix=prefix)
+
+
+class DeadLetterCollector:
+    """Publish DeadLetterSink backlog and replay counters."""
+
+    _COUNTERS = (
+        ("dropped", "Dead letters discarded because the sink was full."),
+        ("replayed", "Dead letters re-enqueued."),
+        ("replay_succeeded", "Replays that completed."),
+        ("replay_failed", "Replays that failed again."),
+    )
+
+    def __init__(self, sink: Any, *, prefix: str = "dead_letter") -> None:
+        self._sink = sink
+        self._prefix = prefix
+
+    def __call__(self) -> List[MetricFamily]:
+        p = self._prefix
+        metrics = self._sink.metrics
+        pending = MetricFamily(f"{p}_pending", "gauge", "Dead letters awaiting replay.")
+        added = MetricFamily(f"{p}_added", "counter", "Requests dead-lettered, by failure kind.")
+        for kind, count in dict(metrics.by_reason).items():
+            added.add(count, {"reason": kind})
+        families = [_per_host(pending, self._sink.pending_by_host()), added]
+        for name, help_text in self._COUNTERS:
+            family = MetricFamily(f"{p}_{name}", "counter", help_text)
+            family.add(getattr(metrics, name))
+            families.append(family)
+        throughput = MetricFamily(f"{p}_replay_throughput", "gauge", "Letters per second in the last replay.")
+        throughput.add(metrics.last_replay_throughput)
+        families.append(throughput)
+        return families
+
+
+class GitHubClientCollector:
+    """Publish GitHubApiClient ClientMetrics per operation, labelled with the API host."""
+
+    def __init__(self, client: Any, *, prefix: str = "github_client") -> None:
+        self._client = client
+        self._prefix = prefix
+        self._host = urlparse(client.base_url).hostname or client.base_url
+
+    def _per_operation(self, family: MetricFamily, values: Mapping[str, float]) -> MetricFamily:
+        for operation, value in dict(values).items():
+            family.add(value, {"host": self._host, "operation": operation})
+        return family
+
+    def __call__(self) -> List[MetricFamily]:
+        p = self._prefix
+        metrics = self._client.metrics
+        latency = MetricFamily(f"{p}_request_seconds", "histogram", "HTTP request duration per attempt.")
+        for operation, histogram in dict(metrics.latency).items():
+            latency.add_histogram(histogram, {"host": self._host, "operation": operation})
+        families = [
+            self._per_operation(MetricFamily(f"{p}_requests", "counter", "HTTP attempts sent."), metrics.requests),
+            self._per_operation(MetricFamily(f"{p}_retries", "counter", "Attempts retried."), metrics.retries),
+            self._per_operation(MetricFamily(f"{p}_errors", "counter", "Operations that failed."), metrics.errors),
+            latency,
+        ]
+        byte_counters = (
+            ("response", "Response body bytes; kind=wire as received, kind=decoded after decompression.",
+             metrics.response_wire_bytes, metrics.response_decoded_bytes),
+            ("request", "Request body bytes; kind=wire as sent, kind=decoded before compression.",
+             metrics.request_wire_bytes, metrics.request_raw_bytes),
+        )
+        for direction, help_text, wire, decoded in byte_counters:
+            family = MetricFamily(f"{p}_{direction}_bytes", "counter", help_text)
+            for kind, values in (("wire", wire), ("decoded", decoded)):
+                for operation, value in dict(values).items():
+                    family.add(value, {"host": self._host, "operation": operation, "kind": kind})
+            families.append(family)
+        budget: Dict[str, Any] = {"limit": metrics.rate_limit_limit, "remaining": metrics.rate_limit_remaining}
+        for kind, value in budget.items():
+            family = MetricFamily(f"{p}_rate_limit_{kind}", "gauge", f"Last x-ratelimit-{kind} header seen.")
+            if value is not None:
+                family.add(value, {"host": self._host})
+            families.append(family)
+        return families
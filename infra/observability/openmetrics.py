@@ -0,0 +1,134 @@
+"""OpenMetrics text exposition for in-process counters, gauges and histograms."""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Mapping, Sequence, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram updated in place on the hot path.
+
+    ``counts`` is per bucket (not cumulative) with a trailing overflow slot for
+    values above the last bound; cumulative ``le`` counts are derived at scrape.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class MetricFamily:
+    """A named metric and its samples, produced by a collector at scrape time."""
+
+    name: str
+    type: str
+    help: str
+    samples: List[Tuple[str, Labels, float]] = field(default_factory=list)
+
+    def add(self, value: float, labels: Mapping[str, str] | None = None, suffix: str = "") -> None:
+        self.samples.append((suffix, tuple((labels or {}).items()), value))
+
+    def add_histogram(self, histogram: Histogram, labels: Mapping[str, str] | None = None) -> None:
+        # Copy first: the owning event loop may observe concurrently with a scrape thread.
+        counts = list(histogram.counts)
+        base = dict(labels or {})
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.buckets, counts):
+            cumulative += bucket_count
+            self.add(cumulative, {**base, "le": _format_value(bound)}, "_bucket")
+        cumulative += counts[-1]
+        self.add(cumulative, {**base, "le": "+Inf"}, "_bucket")
+        self.add(histogram.sum, base, "_sum")
+        self.add(cumulative, base, "_count")
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Set of collectors rendered together as one OpenMetrics document."""
+
+    def __init__(self) -> None:
+        self._collectors: List[Collector] = []
+
+    def register(self, collector: Collector) -> Collector:
+        self._collectors.append(collector)
+        return collector
+
+    def unregister(self, collector: Collector) -> None:
+        self._collectors.remove(collector)
+
+    def collect(self) -> List[MetricFamily]:
+        families: List[MetricFamily] = []
+        for collector in list(self._collectors):
+            families.extend(collector())
+        return families
+
+    def render(self) -> str:
+        return render(self.collect())
+
+
+def render(families: Iterable[MetricFamily]) -> str:
+    lines: List[str] = []
+    for family in families:
+        lines.append(f"# TYPE {family.name} {family.type}")
+        if family.help:
+            lines.append(f"# HELP {family.name} {_escape(family.help)}")
+        default_suffix = "_total" if family.type == "counter" else ""
+        for suffix, labels, value in family.samples:
+            name = family.name + (suffix or default_suffix)
+            if labels:
+                rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                name = f"{name}{{{rendered}}}"
+            lines.append(f"{name} {_format_value(value)}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
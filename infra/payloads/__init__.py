@@ -0,0 +1,11 @@
+"""Content-addressed offload store for large payloads."""
+
+from .store import PAYLOAD_KINDS, URI_PREFIX, PayloadReference, PayloadStore, PayloadStoreMetrics
+
+__all__ = [
+    "PAYLOAD_KINDS",
+    "URI_PREFIX",
+    "PayloadReference",
+    "PayloadStore",
+    "PayloadStoreMetrics",
+]
@@ -0,0 +1,271 @@
+"""Content-addressed offload store for large step payloads.
+
+Blobs live under ``root`` named by the SHA-256 of their bytes, so identical
+payloads are stored once. :meth:`PayloadStore.offload` swaps a payload above
+``threshold_bytes`` for a :class:`PayloadReference`: a small handle whose
+``uri`` is the workflow schema's ``payload_reference`` and whose contents are
+memory-mapped only when read.
+
+Deciding that a payload is small is cheap: JSON containers are first bounded by
+a short walk that stops as soon as the bound passes the threshold, and are only
+serialized when they might be large. :meth:`PayloadStore.offload_async` does the
+serializing, hashing and writing in the default executor, off the event loop.
+
+Each handle holds one reference to its blob and gives it back when released
+(explicitly or when the handle is garbage collected). :meth:`PayloadStore.collect`
+deletes blobs nobody references, including blobs left by an earlier process,
+unless their digest is passed in ``keep`` (e.g. references recorded in the
+workflow instance store).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+URI_PREFIX = "sha256:"
+PAYLOAD_KINDS = ("bytes", "text", "json")
+
+
+@dataclass
+class PayloadStoreMetrics:
+    offloaded: int = 0
+    deduplicated: int = 0
+    bytes_written: int = 0
+    collected: int = 0
+    bytes_collected: int = 0
+
+
+class PayloadReference:
+    """Lazy handle to an offloaded payload.
+
+    ``view()`` maps the blob and returns a read-only memoryview over it without
+    copying; ``load()`` decodes it back to the type that was offloaded. The
+    mapping is dropped again by :meth:`release`, which also gives up the handle's
+    reference to the blob.
+    """
+
+    __slots__ = ("digest", "size", "kind", "_store", "_mapping", "_finalizer", "__weakref__")
+
+    def __init__(self, store: "PayloadStore", digest: str, size: int, kind: str) -> None:
+        self.digest = digest
+        self.size = size
+        self.kind = kind
+        self._store = store
+        self._mapping: Optional[mmap.mmap] = None
+        self._finalizer = weakref.finalize(self, store._release, digest)
+
+    @property
+    def uri(self) -> str:
+        return URI_PREFIX + self.digest
+
+    @property
+    def released(self) -> bool:
+        return not self._finalizer.alive
+
+    def view(self) -> memoryview:
+        if self.released:
+            raise RuntimeError(f"Payload {self.uri} was released")
+        if not self.size:
+            return memoryview(b"")
+        if self._mapping is None:
+            with open(self._store.path_for(self.digest), "rb") as handle:
+                self._mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(self._mapping)
+
+    def load(self) -> Any:
+        """Decode a copy of the payload: ``bytes``, ``str`` or the JSON value."""
+        with self.view() as view:
+            if self.kind == "bytes":
+                return view.tobytes()
+            text = str(view, "utf-8")
+        return text if self.kind == "text" else json.loads(text)
+
+    def release(self) -> None:
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping closes when it is collected
+            self._mapping = None
+        self._finalizer()
+
+    def __enter__(self) -> "PayloadReference":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"PayloadReference({self.uri!r}, size={self.size}, kind={self.kind!r})"
+
+
+class PayloadStore:
+    """SHA-256 addressed blob directory with reference-counted collection."""
+
+    def __init__(self, root: Union[str, os.PathLike], *, threshold_bytes: int = 64 * 1024) -> None:
+        if threshold_bytes < 0:
+            raise ValueError("threshold_bytes must not be negative")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.threshold_bytes = threshold_bytes
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._metrics = PayloadStoreMetrics()
+
+    @property
+    def metrics(self) -> PayloadStoreMetrics:
+        return self._metrics
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:]
+
+    def references(self, digest: str) -> int:
+        with self._lock:
+            return self._refs.get(digest, 0)
+
+    def offload(self, payload: Any) -> Any:
+        """Return ``payload`` unchanged if it is small or not offloadable, else a reference to it.
+
+        ``bytes``-like values, ``str`` and JSON containers (``dict``/``list``) are
+        offloadable; anything else is returned as is.
+        """
+        if not self._may_offload(payload):
+            return payload
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            return self.put(payload)
+        if isinstance(payload, str):
+            data = payload.encode()
+            return self.put(data, kind="text") if len(data) > self.threshold_bytes else payload
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        return self.put(data, kind="json") if len(data) > self.threshold_bytes else payload
+
+    async def offload_async(self, payload: Any) -> Any:
+        """:meth:`offload` for event loops: payloads that may be large are handled in the default executor."""
+        if not self._may_offload(payload):
+            return payload
+        return await asyncio.get_running_loop().run_in_executor(None, self.offload, payload)
+
+    def _may_offload(self, payload: Any) -> bool:
+        """False when ``payload`` is certainly not offloaded; cheap enough for the event loop."""
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            return len(payload) > self.threshold_bytes
+        if isinstance(payload, str):
+            # UTF-8 is at most four bytes per character, so short strings need no encoding.
+            return len(payload) * 4 > self.threshold_bytes
+        if isinstance(payload, (dict, list)):
+            return _json_size_exceeds(payload, self.threshold_bytes)
+        return False
+
+    def put(self, data: Union[bytes, bytearray, memoryview], *, kind: str = "bytes") -> PayloadReference:
+        """Store ``data`` (once per distinct content) and return a new reference to it."""
+        if kind not in PAYLOAD_KINDS:
+            raise ValueError(f"Unsupported payload kind '{kind}'")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest)
+        with self._lock:
+            exists = path.exists()
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            self._metrics.offloaded += 1
+            if exists:
+                self._metrics.deduplicated += 1
+        if not exists:
+            self._write(path, data)
+        return PayloadReference(self, digest, len(data), kind)
+
+    def open(self, uri: str, *, kind: str = "bytes") -> PayloadReference:
+        """New reference to a stored blob, e.g. from a recorded ``payload_reference``."""
+        if not uri.startswith(URI_PREFIX):
+            raise ValueError(f"Not a payload reference: '{uri}'")
+        digest = uri[len(URI_PREFIX):]
+        path = self.path_for(digest)
+        with self._lock:
+            if not path.exists():
+                raise FileNotFoundError(f"No stored payload for {uri}")
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+        return PayloadReference(self, digest, path.stat().st_size, kind)
+
+    def collect(self, keep: Iterable[str] = ()) -> int:
+        """Delete unreferenced blobs whose digest is not in ``keep``; returns how many were removed."""
+        keep_digests = {uri[len(URI_PREFIX):] if uri.startswith(URI_PREFIX) else uri for uri in keep}
+        removed = 0
+        for path in self.root.glob("??/*"):
+            if path.name.startswith("."):
+                continue  # in-flight write
+            digest = path.parent.name + path.name
+            with self._lock:
+                if self._refs.get(digest) or digest in keep_digests:
+                    continue
+                size = path.stat().st_size
+                path.unlink()
+            removed += 1
+            self._metrics.bytes_collected += size
+        self._metrics.collected += removed
+        return removed
+
+    def _release(self, digest: str) -> None:
+        with self._lock:
+            count = self._refs.get(digest, 0) - 1
+            if count > 0:
+                self._refs[digest] = count
+            else:
+                self._refs.pop(digest, None)
+
+    def _write(self, path: Path, data: Union[bytes, bytearray, memoryview]) -> None:
+        path.parent.mkdir(exist_ok=True)
+        # Write beside the target and rename, so readers never map a partial blob.
+        fd, temp = tempfile.mkstemp(prefix=".", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+        with self._lock:  # offload_async writes from executor threads
+            self._metrics.bytes_written += len(data)
+
+
+def _json_size_exceeds(value: Any, limit: int) -> bool:
+    """Whether compact ``json.dumps(value)`` may be longer than ``limit`` bytes.
+
+    Sums an upper bound of the encoded size and stops once it passes ``limit``, so
+    the walk costs at most about ``limit`` bytes' worth of nodes. Strings are
+    bounded by their worst-case escaping; values json cannot encode count as
+    large, so :meth:`PayloadStore.offload` reports them as ``json.dumps`` does.
+    """
+    size = 0
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        kind = type(item)
+        if kind is str:
+            # ASCII escapes to at most 6 bytes per character (\u00XX), anything else to 12.
+            size += len(item) * (6 if item.isascii() else 12) + 2
+        elif kind is dict:
+            size += 2 + 2 * len(item)  # braces, colons and commas
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif kind is list or kind is tuple:
+            size += 2 + len(item)
+            stack.extend(item)
+        elif kind is bool or item is None:
+            size += 5
+        elif kind is int:
+            size += item.bit_length() // 3 + 4  # digits and sign, quoted when used as a key
+        elif kind is float:
+            size += 26
+        else:
+            return True
+        if size > limit:
+            return True
+    return False
@@ -1,5 +1,41 @@
 """Infrastructure queue package."""
 
-from .request_queue import QueueMetrics, RateLimitedQueueMetrics, RateLimitedRequestQueue, RequestOutcome
+from .admission import AdmissionController, AdmissionDecision, LoadShed
+from .dead_letter import AttemptRecord, DeadLetter, DeadLetterSink, ReplayReport
+from .host_registry import HostStateRegistry
+from .request_queue import (
+    MUTATING_METHODS,
+    DeadlineExceeded,
+    HostActivity,
+    QueueMetrics,
+    RateLimitedQueueMetrics,
+    RateLimitExceeded,
+    RateLimitedRequestQueue,
+    RequestOutcome,
+    lane_key,
+)
+from .shared_backoff import SharedBackoffStore
+from .sharded import ShardedRequestQueue, ShardUnavailable
 
-__all__ = ["QueueMetrics", "RateLimitedQueueMetrics", "RateLimitedRequestQueue", "RequestOutcome"]
+__all__ = [
+    "MUTATING_METHODS",
+    "AdmissionController",
+    "AdmissionDecision",
+    "AttemptRecord",
+    "DeadLetter",
+    "DeadLetterSink",
+    "DeadlineExceeded",
+    "HostActivity",
+    "HostStateRegistry",
+    "LoadShed",
+    "QueueMetrics",
+    "RateLimitedQueueMetrics",
+    "RateLimitedRequestQueue",
+    "RateLimitExceeded",
+    "ReplayReport",
+    "RequestOutcome",
+    "SharedBackoffStore",
+    "ShardedRequestQueue",
+    "ShardUnavailable",
+    "lane_key",
+]
@@ -0,0 +1,132 @@
+"""SLO-based admission control for the request queues.
+
+At enqueue time each host's expected wait is estimated as its remaining backoff
+plus the requests already waiting for it divided by its service rate. The
+service rate is measured from the gaps between completions while the host had a
+backlog, which is how fast it actually drains under load. Before a host has been
+saturated, or once that measurement is older than ``window_seconds``, the rate is
+``concurrency / mean service time`` instead.
+
+When the estimate exceeds ``slo_seconds``, requests with ``priority >=
+shed_priority`` are shed straight away rather than left to time out in the queue.
+So are requests whose deadline falls before the estimated start, whatever their
+priority. Shed requests go to the ``degraded`` path when one is configured
+(cached or partial data, a secondary endpoint), else ``enqueue`` raises
+:class:`LoadShed`.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Weight of the newest sample in the per-host moving averages.
+_SMOOTHING = 0.2
+
+DegradedPath = Callable[[str, Callable[[], Awaitable[Any]]], Awaitable[Any]]
+
+
+class LoadShed(Exception):
+    """Raised by ``enqueue`` when admission control sheds a request and there is no degraded path."""
+
+    def __init__(self, host: str, expected_wait_seconds: float, reason: str) -> None:
+        super().__init__(f"Shed request for host {host} ({reason}): expected wait {expected_wait_seconds:.2f}s")
+        self.host = host
+        self.expected_wait_seconds = expected_wait_seconds
+        self.reason = reason
+
+
+@dataclass
+class AdmissionDecision:
+    admitted: bool
+    expected_wait_seconds: float
+    reason: str = ""
+
+
+class _HostRate:
+    __slots__ = ("service_seconds", "drain_interval", "drain_updated_at", "last_completion")
+
+    def __init__(self) -> None:
+        self.service_seconds: Optional[float] = None
+        self.drain_interval: Optional[float] = None
+        self.drain_updated_at = 0.0
+        self.last_completion: Optional[float] = None
+
+
+def _smooth(current: Optional[float], sample: float) -> float:
+    return sample if current is None else current + _SMOOTHING * (sample - current)
+
+
+class AdmissionController:
+    """Per-host wait estimates and shed decisions; one controller may serve several queues."""
+
+    def __init__(
+        self,
+        slo_seconds: float,
+        *,
+        shed_priority: int = 1,
+        window_seconds: float = 30.0,
+        degraded: Optional[DegradedPath] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if slo_seconds <= 0:
+            raise ValueError("slo_seconds must be positive")
+        if window_seconds <= 0:
+            raise ValueError("window_seconds must be positive")
+        self.slo_seconds = slo_seconds
+        self.shed_priority = shed_priority
+        self.degraded = degraded
+        self._window = window_seconds
+        self._clock = clock
+        self._hosts: Dict[str, _HostRate] = {}
+
+    def record_completion(self, host: str, service_seconds: float, backlog: int) -> None:
+        """Note that a request for ``host`` finished; ``backlog`` is how many still wait for it."""
+        now = self._clock()
+        rate = self._hosts.get(host)
+        if rate is None:
+            rate = self._hosts[host] = _HostRate()
+        rate.service_seconds = _smooth(rate.service_seconds, service_seconds)
+        if backlog > 0 and rate.last_completion is not None:
+            rate.drain_interval = _smooth(rate.drain_interval, now - rate.last_completion)
+            rate.drain_updated_at = now
+        rate.last_completion = now
+
+    def service_rate(self, host: str, concurrency: int = 1) -> Optional[float]:
+        """Requests per second ``host`` is expected to complete; None before any completion."""
+        rate = self._hosts.get(host)
+        if rate is None:
+            return None
+        if rate.drain_interval is not None and self._clock() - rate.drain_updated_at <= self._window:
+            return 1.0 / max(rate.drain_interval, 1e-6)
+        if rate.service_seconds is None:
+            return None
+        return concurrency / max(rate.service_seconds, 1e-6)
+
+    def expected_wait(self, host: str, *, queued: int, concurrency: int = 1, backoff_seconds: float = 0.0) -> float:
+        rate = self.service_rate(host, concurrency)
+        if rate is None or queued <= 0:
+            return backoff_seconds
+        return backoff_seconds + queued / rate
+
+    def decide(
+        self,
+        host: str,
+        *,
+        priority: int,
+        deadline: Optional[float],
+        queued: int,
+        concurrency: int = 1,
+        backoff_seconds: float = 0.0,
+    ) -> AdmissionDecision:
+        """``deadline`` is an absolute value of the controller's clock (``time.monotonic()``)."""
+        wait = self.expected_wait(host, queued=queued, concurrency=concurrency, backoff_seconds=backoff_seconds)
+        if deadline is not None and self._clock() + wait > deadline:
+            return AdmissionDecision(False, wait, "deadline")
+        if priority >= self.shed_priority and wait > self.slo_seconds:
+            return AdmissionDecision(False, wait, "slo")
+        return AdmissionDecision(True, wait)
+
+    def forget_host(self, host: str) -> None:
+        self._hosts.pop(host, None)
@@ -0,0 +1,209 @@
+"""Dead-letter sink shared by the request queues.
+
+When a request exhausts its attempts or its request function raises, the queue
+stores a :class:`DeadLetter`: the host, the request function itself (so it can
+be replayed in-process), the failure reason, every attempt made and the headers
+of the last response. :meth:`DeadLetterSink.replay` re-injects letters into a
+queue at a fixed rate once the host's backoff has cleared.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Protocol
+
+
+@dataclass
+class AttemptRecord:
+    """One attempt at a request; ``started_at`` is wall-clock (``time.time()``)."""
+
+    attempt: int
+    started_at: float
+    duration_seconds: float
+    status: Optional[int] = None
+    error: Optional[str] = None
+    retry_after_seconds: Optional[float] = None
+
+
+@dataclass
+class DeadLetter:
+    letter_id: int
+    host: str
+    request_fn: Callable[[], Awaitable[Any]] = field(repr=False)
+    reason: str
+    failed_at: float
+    attempts: List[AttemptRecord] = field(default_factory=list)
+    last_headers: Dict[str, Any] = field(default_factory=dict)
+    priority: int = 0
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-friendly description for audit logs and operator tooling."""
+        return {
+            "letter_id": self.letter_id,
+            "host": self.host,
+            "reason": self.reason,
+            "failed_at": self.failed_at,
+            "priority": self.priority,
+            "attempts": [vars(attempt).copy() for attempt in self.attempts],
+            "last_headers": dict(self.last_headers),
+        }
+
+
+@dataclass
+class ReplayReport:
+    requested: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Replayed letters per second."""
+        return self.requested / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+@dataclass
+class DeadLetterMetrics:
+    dead_lettered: int = 0
+    dropped: int = 0
+    replayed: int = 0
+    replay_succeeded: int = 0
+    replay_failed: int = 0
+    replay_seconds: float = 0.0
+    last_replay_throughput: float = 0.0
+    by_reason: Dict[str, int] = field(default_factory=dict)
+
+
+class _ReplayTarget(Protocol):
+    async def enqueue(self, host: str, request_fn: Callable[[], Awaitable[Any]], *, priority: int = 0) -> Any:
+        ...
+
+    def backoff_remaining(self, host: str) -> float:
+        ...
+
+
+class DeadLetterSink:
+    """Bounded, insertion-ordered store of dead letters.
+
+    Once ``max_letters`` are held the oldest letter is dropped (and counted) for
+    each new one.
+    """
+
+    def __init__(self, *, max_letters: int = 10_000) -> None:
+        if max_letters <= 0:
+            raise ValueError("max_letters must be positive")
+        self._max_letters = max_letters
+        self._letters: "OrderedDict[int, DeadLetter]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._metrics = DeadLetterMetrics()
+
+    @property
+    def metrics(self) -> DeadLetterMetrics:
+        return self._metrics
+
+    def add(
+        self,
+        host: str,
+        request_fn: Callable[[], Awaitable[Any]],
+        reason: str,
+        *,
+        kind: str,
+        attempts: Optional[List[AttemptRecord]] = None,
+        last_headers: Optional[Mapping[str, Any]] = None,
+        priority: int = 0,
+    ) -> DeadLetter:
+        """Store a failed request; ``kind`` is a short label (``max_attempts``, ``error``) for metrics."""
+        letter = DeadLetter(
+            letter_id=next(self._ids),
+            host=host,
+            request_fn=request_fn,
+            reason=reason,
+            failed_at=time.time(),
+            attempts=list(attempts or ()),
+            last_headers=dict(last_headers or {}),
+            priority=priority,
+        )
+        self._letters[letter.letter_id] = letter
+        self._metrics.dead_lettered += 1
+        self._metrics.by_reason[kind] = self._metrics.by_reason.get(kind, 0) + 1
+        if len(self._letters) > self._max_letters:
+            self._letters.popitem(last=False)
+            self._metrics.dropped += 1
+        return letter
+
+    def letters(self, host: Optional[str] = None) -> List[DeadLetter]:
+        return [letter for letter in self._letters.values() if host is None or letter.host == host]
+
+    def pending_by_host(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for letter in list(self._letters.values()):
+            counts[letter.host] = counts.get(letter.host, 0) + 1
+        return counts
+
+    def take(self, host: Optional[str] = None, limit: Optional[int] = None) -> List[DeadLetter]:
+        """Remove and return letters, oldest first."""
+        taken = []
+        for letter in self.letters(host):
+            if limit is not None and len(taken) >= limit:
+                break
+            del self._letters[letter.letter_id]
+            taken.append(letter)
+        return taken
+
+    def __len__(self) -> int:
+        return len(self._letters)
+
+    async def replay(
+        self,
+        queue: _ReplayTarget,
+        *,
+        host: Optional[str] = None,
+        rate_per_second: float = 10.0,
+        limit: Optional[int] = None,
+    ) -> ReplayReport:
+        """Re-enqueue dead letters on ``queue`` at no more than ``rate_per_second``.
+
+        Each letter waits until ``queue.backoff_remaining(letter.host)`` is zero
+        before it is released. Letters that fail again are dead-lettered afresh by
+        the queue (when it uses this sink).
+        """
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive")
+        letters = self.take(host, limit)
+        report = ReplayReport(requested=len(letters))
+        started = time.monotonic()
+        interval = 1.0 / rate_per_second
+        next_release = started
+        inflight: List[asyncio.Task[bool]] = []
+        for letter in letters:
+            delay = max(next_release - time.monotonic(), queue.backoff_remaining(letter.host))
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_release = max(next_release, time.monotonic()) + interval
+            inflight.append(asyncio.create_task(self._replay_one(queue, letter)))
+        for succeeded in await asyncio.gather(*inflight):
+            if succeeded:
+                report.succeeded += 1
+            else:
+                report.failed += 1
+        report.elapsed_seconds = time.monotonic() - started
+
+        metrics = self._metrics
+        metrics.replayed += report.requested
+        metrics.replay_succeeded += report.succeeded
+        metrics.replay_failed += report.failed
+        metrics.replay_seconds += report.elapsed_seconds
+        metrics.last_replay_throughput = report.throughput
+        return report
+
+    @staticmethod
+    async def _replay_one(queue: _ReplayTarget, letter: DeadLetter) -> bool:
+        try:
+            await queue.enqueue(letter.host, letter.request_fn, priority=letter.priority)
+        except Exception:  # noqa: BLE001 - counted as a failed replay
+            return False
+        return True
@@ -0,0 +1,113 @@
+"""Bounded per-host state table with idle TTL and LRU eviction."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_MAX_BUSY_SKIPS = 16
+
+
+class _Entry(Generic[T]):
+    __slots__ = ("value", "last_used")
+
+    def __init__(self, value: T, last_used: float) -> None:
+        self.value = value
+        self.last_used = last_used
+
+
+class HostStateRegistry(Generic[T]):
+    """Map of host -> state that stays bounded in long-running processes.
+
+    Entries idle for longer than ``idle_ttl_seconds`` are evicted, and the least
+    recently used entries are evicted once ``max_hosts`` is exceeded. Hosts for
+    which ``is_busy`` returns True (active backoff, in-flight work) are never
+    evicted; they are refreshed instead, so the cap is soft while they are busy.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], T],
+        *,
+        max_hosts: int = 10_000,
+        idle_ttl_seconds: float = 300.0,
+        is_busy: Optional[Callable[[str, T], bool]] = None,
+        on_evict: Optional[Callable[[str, T], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_hosts <= 0:
+            raise ValueError("max_hosts must be positive")
+        if idle_ttl_seconds <= 0:
+            raise ValueError("idle_ttl_seconds must be positive")
+        self._factory = factory
+        self._max_hosts = max_hosts
+        self._idle_ttl = idle_ttl_seconds
+        self._is_busy = is_busy or (lambda host, value: False)
+        self._on_evict = on_evict
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry[T]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, host: str) -> T:
+        """Return the state for ``host``, creating it if needed, and mark it as used."""
+        now = self._clock()
+        entry = self._entries.get(host)
+        if entry is not None:
+            entry.last_used = now
+            self._entries.move_to_end(host)
+            return entry.value
+        value = self._factory(host)
+        self._entries[host] = _Entry(value, now)
+        self._evict(now, protect=host)
+        return value
+
+    def peek(self, host: str) -> Optional[T]:
+        """Return the state for ``host`` without creating it or refreshing its age."""
+        entry = self._entries.get(host)
+        return entry.value if entry is not None else None
+
+    def evict_idle(self) -> int:
+        """Evict expired and over-capacity entries; returns how many were removed."""
+        return self._evict(self._clock())
+
+    def values(self) -> Iterator[T]:
+        return (entry.value for entry in list(self._entries.values()))
+
+    def items(self) -> Iterator[Tuple[str, T]]:
+        return ((host, entry.value) for host, entry in list(self._entries.items()))
+
+    def snapshot(self) -> Dict[str, T]:
+        # list() copies in one step so scrapes from other threads see a consistent view.
+        return {host: entry.value for host, entry in list(self._entries.items())}
+
+    def __contains__(self, host: object) -> bool:
+        return host in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict(self, now: float, protect: Optional[str] = None) -> int:
+        cutoff = now - self._idle_ttl
+        evicted = 0
+        skipped = 0
+        # Busy entries are rotated to the fresh end so they are not re-examined until
+        # they age out again; the skip budget keeps each sweep O(1) amortized even
+        # when many hosts are busy at once.
+        while self._entries and skipped < _MAX_BUSY_SKIPS:
+            host, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self._max_hosts and entry.last_used > cutoff:
+                break
+            if host == protect or self._is_busy(host, entry.value):
+                entry.last_used = now
+                self._entries.move_to_end(host)
+                skipped += 1
+                continue
+            del self._entries[host]
+            evicted += 1
+            if self._on_evict is not None:
+                self._on_evict(host, entry.value)
+        self.evictions += evicted
+        return evicted
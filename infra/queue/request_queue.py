@@ -3,11 +3,49 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import math
 import random
 import time
-from collections import defaultdict
+from collections import defaultdict, deque
 from dataclasses import dataclass, field
-from typing import Any, Awaitable, Callable, Dict, Mapping, Optional
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Mapping, Optional
+
+from github_client.types import MUTATING_METHODS
+
+from ..observability.openmetrics import Histogram
+from ..payloads import PayloadStore
+from .admission import AdmissionController, AdmissionDecision, LoadShed
+from .dead_letter import AttemptRecord, DeadLetterSink
+from .host_registry import HostStateRegistry
+from .shared_backoff import SharedBackoffStore
+
+
+# Mutating requests are queued in a separate, serialized lane per host (see ``lane_key``).
+WRITE_LANE_SUFFIX = "#write"
+
+
+def lane_key(host: str, method: str = "GET") -> str:
+    """Key the queues track ``method`` requests for ``host`` under: the host, or its write lane."""
+    if method.upper() in MUTATING_METHODS and not host.endswith(WRITE_LANE_SUFFIX):
+        return host + WRITE_LANE_SUFFIX
+    return host
+
+
+def _is_write_lane(key: str) -> bool:
+    return key.endswith(WRITE_LANE_SUFFIX)
+
+
+def _other_lane(key: str) -> str:
+    return key[: -len(WRITE_LANE_SUFFIX)] if _is_write_lane(key) else key + WRITE_LANE_SUFFIX
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request's deadline passes before it can be dispatched."""
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request is still rate limited after its last allowed attempt."""
 
 
 @dataclass
@@ -19,6 +57,24 @@ class RequestOutcome:
     payload: Any | None = None
 
 
+@dataclass
+class HostActivity:
+    """Point-in-time load for one host: requests waiting and requests executing."""
+
+    queued: int
+    active: int
+
+
+def _parse_remaining(headers: Mapping[str, Any]) -> Optional[float]:
+    remaining = headers.get("x-ratelimit-remaining") or headers.get("X-RateLimit-Remaining")
+    if remaining is None:
+        return None
+    try:
+        return float(remaining)
+    except (TypeError, ValueError):
+        return None
+
+
 @dataclass
 class RateLimitedQueueMetrics:
     """Metrics describing queue state and backoff activity for RateLimitedRequestQueue."""
@@ -29,39 +85,144 @@ class RateLimitedQueueMetrics:
     queue_depth: int = 0
     average_wait_time: float = 0.0
     last_backoff_seconds: float = 0.0
+    expired: int = 0
+    dead_lettered: int = 0
+    shed: int = 0
     retry_after_by_host: Dict[str, float] = field(default_factory=dict)
-    _wait_samples: list[float] = field(default_factory=list, repr=False)
-
-    def record_wait(self, duration_seconds: float) -> None:
-        self._wait_samples.append(duration_seconds)
-        self.average_wait_time = sum(self._wait_samples) / len(self._wait_samples)
+    expired_by_host: Dict[str, int] = field(default_factory=dict)
+    dead_lettered_by_host: Dict[str, int] = field(default_factory=dict)
+    shed_by_host: Dict[str, int] = field(default_factory=dict)
+    degraded_by_host: Dict[str, int] = field(default_factory=dict)
+    expected_wait_by_host: Dict[str, float] = field(default_factory=dict)
+    completed_by_host: Dict[str, int] = field(default_factory=dict)
+    backoff_events_by_host: Dict[str, int] = field(default_factory=dict)
+    retries_by_host: Dict[str, int] = field(default_factory=dict)
+    rate_limit_remaining_by_host: Dict[str, float] = field(default_factory=dict)
+    wait_seconds_by_host: Dict[str, Histogram] = field(default_factory=dict, repr=False)
+    service_seconds_by_host: Dict[str, Histogram] = field(default_factory=dict, repr=False)
+    _wait_total: float = field(default=0.0, repr=False)
+    _wait_count: int = field(default=0, repr=False)
+
+    def record_wait(self, duration_seconds: float, host: Optional[str] = None) -> None:
+        self._wait_total += duration_seconds
+        self._wait_count += 1
+        self.average_wait_time = self._wait_total / self._wait_count
+        if host is not None:
+            _histogram(self.wait_seconds_by_host, host).observe(duration_seconds)
+
+    def record_service(self, host: str, duration_seconds: float, outcome: RequestOutcome) -> None:
+        _histogram(self.service_seconds_by_host, host).observe(duration_seconds)
+        remaining = _parse_remaining(outcome.headers)
+        if remaining is not None:
+            self.rate_limit_remaining_by_host[host] = remaining
+
+    def record_completed(self, host: str) -> None:
+        self.completed += 1
+        self.completed_by_host[host] = self.completed_by_host.get(host, 0) + 1
 
     def record_backoff(self, host: str, duration_seconds: float) -> None:
         self.backoff_events += 1
         self.last_backoff_seconds = duration_seconds
         self.retry_after_by_host[host] = time.monotonic() + duration_seconds
+        self.backoff_events_by_host[host] = self.backoff_events_by_host.get(host, 0) + 1
+
+    def record_retry(self, host: str) -> None:
+        self.retries_by_host[host] = self.retries_by_host.get(host, 0) + 1
+
+    def record_expired(self, host: str) -> None:
+        self.expired += 1
+        self.expired_by_host[host] = self.expired_by_host.get(host, 0) + 1
+
+    def record_dead_lettered(self, host: str) -> None:
+        self.dead_lettered += 1
+        self.dead_lettered_by_host[host] = self.dead_lettered_by_host.get(host, 0) + 1
+
+    def record_expected_wait(self, host: str, seconds: float) -> None:
+        self.expected_wait_by_host[host] = seconds
+
+    def record_shed(self, host: str, degraded: bool) -> None:
+        self.shed += 1
+        self.shed_by_host[host] = self.shed_by_host.get(host, 0) + 1
+        if degraded:
+            self.degraded_by_host[host] = self.degraded_by_host.get(host, 0) + 1
+
+    def forget_host(self, host: str) -> None:
+        for per_host in (
+            self.retry_after_by_host,
+            self.expired_by_host,
+            self.dead_lettered_by_host,
+            self.shed_by_host,
+            self.degraded_by_host,
+            self.expected_wait_by_host,
+            self.completed_by_host,
+            self.backoff_events_by_host,
+            self.retries_by_host,
+            self.rate_limit_remaining_by_host,
+            self.wait_seconds_by_host,
+            self.service_seconds_by_host,
+        ):
+            per_host.pop(host, None)
+
+
+def _histogram(histograms: Dict[str, Histogram], host: str) -> Histogram:
+    histogram = histograms.get(host)
+    if histogram is None:
+        histogram = histograms[host] = Histogram()
+    return histogram
 
 
 @dataclass
+class _HostSlot:
+    semaphore: asyncio.Semaphore
+    backoff_until: float = 0.0
+    in_flight: int = 0
+    active: int = 0
+    # Write lanes only: minimum gap between one request finishing and the next starting,
+    # and the lane's own queue and worker, so a write waiting its turn never holds one
+    # of the shared workers.
+    min_interval: float = 0.0
+    last_finished: float = 0.0
+    queue: Optional[asyncio.PriorityQueue[tuple[float, int, "_QueuedRequest | None"]]] = None
+    worker: Optional[asyncio.Task[None]] = None
+
+
 class _QueuedRequest:
-    host: str
-    request_fn: Callable[[], Awaitable[RequestOutcome]]
-    future: asyncio.Future[RequestOutcome]
-    enqueued_at: float
-    attempt: int = 0
-
-    def next_attempt(self) -> "_QueuedRequest":
-        return _QueuedRequest(
-            host=self.host,
-            request_fn=self.request_fn,
-            future=self.future,
-            enqueued_at=time.monotonic(),
-            attempt=self.attempt + 1,
-        )
+    # One record per request for its whole life; retries update it in place.
+    __slots__ = ("host", "request_fn", "future", "enqueued_at", "attempt", "deadline", "priority", "history")
+
+    def __init__(
+        self,
+        host: str,
+        request_fn: Callable[[], Awaitable[RequestOutcome]],
+        future: asyncio.Future[RequestOutcome],
+        enqueued_at: float,
+        deadline: Optional[float] = None,
+        priority: int = 0,
+    ) -> None:
+        self.host = host
+        self.request_fn = request_fn
+        self.future = future
+        self.enqueued_at = enqueued_at
+        self.attempt = 0
+        self.deadline = deadline
+        self.priority = priority
+        self.history: Optional[List[AttemptRecord]] = None
+
+    def retry(self) -> None:
+        self.attempt += 1
+        self.enqueued_at = time.monotonic()
+
+    def expires_before(self, when: float) -> bool:
+        return self.deadline is not None and when > self.deadline
 
 
 class RateLimitedRequestQueue:
-    """Queue that enforces bounded concurrency and rate limit backoff."""
+    """Queue that enforces bounded concurrency and rate limit backoff.
+
+    Requests enqueued with a mutating ``method`` run in the host's write lane: one
+    at a time, ``write_spacing_seconds`` apart, with backoff state of their own, so
+    a secondary rate limit hit by writes leaves reads to the host running.
+    """
 
     def __init__(
         self,
@@ -71,33 +232,97 @@ class RateLimitedRequestQueue:
         base_backoff_seconds: float = 0.25,
         max_backoff_seconds: float = 30.0,
         jitter_ratio: float = 0.25,
+        max_hosts: int = 10_000,
+        host_idle_ttl_seconds: float = 300.0,
+        shared_backoff: Optional[SharedBackoffStore] = None,
+        max_attempts: Optional[int] = None,
+        dead_letters: Optional[DeadLetterSink] = None,
+        admission: Optional[AdmissionController] = None,
+        payload_store: Optional[PayloadStore] = None,
+        write_spacing_seconds: float = 1.0,
     ) -> None:
+        """``max_attempts`` caps attempts for rate-limited requests (``None`` retries
+        until the deadline). Requests that exhaust it, or whose ``request_fn`` raises,
+        are recorded in ``dead_letters`` when one is given. ``admission`` sheds
+        requests at enqueue time when their host's expected wait breaks its SLO.
+        ``payload_store`` swaps large outcome payloads for lazy references."""
         if max_workers <= 0:
             raise ValueError("max_workers must be positive")
+        if max_attempts is not None and max_attempts <= 0:
+            raise ValueError("max_attempts must be positive")
         if per_host_limit <= 0:
             raise ValueError("per_host_limit must be positive")
         if base_backoff_seconds <= 0:
             raise ValueError("base_backoff_seconds must be positive")
-        self._queue: asyncio.Queue[_QueuedRequest | None] = asyncio.Queue()
+        if write_spacing_seconds < 0:
+            raise ValueError("write_spacing_seconds must not be negative")
+        self._queue: asyncio.PriorityQueue[tuple[float, int, _QueuedRequest | None]] = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
         self._max_workers = max_workers
         self._per_host_limit = per_host_limit
         self._base_backoff = base_backoff_seconds
         self._max_backoff = max_backoff_seconds
         self._jitter_ratio = jitter_ratio
+        self._shared_backoff = shared_backoff
+        self._max_attempts = max_attempts
+        self._dead_letters = dead_letters
+        self._admission = admission
+        self._payload_store = payload_store
+        self._write_spacing = write_spacing_seconds
         self._metrics = RateLimitedQueueMetrics()
         self._workers: list[asyncio.Task[None]] = []
-        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
-        self._host_backoff: Dict[str, float] = {}
+        self._hosts: HostStateRegistry[_HostSlot] = HostStateRegistry(
+            self._create_slot,
+            max_hosts=max_hosts,
+            idle_ttl_seconds=host_idle_ttl_seconds,
+            is_busy=lambda host, slot: slot.in_flight > 0 or slot.backoff_until > time.monotonic(),
+            on_evict=self._evict_slot,
+        )
         self._closed = False
 
     @property
     def metrics(self) -> RateLimitedQueueMetrics:
         return self._metrics
 
+    @property
+    def tracked_hosts(self) -> int:
+        return len(self._hosts)
+
+    def _create_slot(self, key: str) -> _HostSlot:
+        if not _is_write_lane(key):
+            return _HostSlot(asyncio.Semaphore(self._per_host_limit))
+        slot = _HostSlot(asyncio.Semaphore(1), min_interval=self._write_spacing, queue=asyncio.PriorityQueue())
+        slot.worker = asyncio.create_task(self._worker(slot.queue))
+        return slot
+
+    def _evict_slot(self, host: str, slot: _HostSlot) -> None:
+        # Evicted lanes are idle, so their worker is parked on an empty queue.
+        if slot.worker is not None:
+            slot.worker.cancel()
+        self._forget_host(host)
+
     def _get_host_semaphore(self, host: str) -> asyncio.Semaphore:
-        if host not in self._host_semaphores:
-            self._host_semaphores[host] = asyncio.Semaphore(self._per_host_limit)
-        return self._host_semaphores[host]
+        return self._hosts.get(host).semaphore
+
+    def host_activity(self) -> Dict[str, HostActivity]:
+        """Snapshot of queued and executing requests per tracked host."""
+        return {
+            host: HostActivity(queued=slot.in_flight - slot.active, active=slot.active)
+            for host, slot in self._hosts.snapshot().items()
+        }
+
+    def backoff_remaining(self, host: str) -> float:
+        """Seconds until ``host`` leaves backoff (local or shared); 0.0 when it is callable now."""
+        slot = self._hosts.peek(host)
+        remaining = slot.backoff_until - time.monotonic() if slot is not None else 0.0
+        if self._shared_backoff is not None:
+            remaining = max(remaining, self._shared_backoff.delay_for(host))
+        return max(0.0, remaining)
+
+    def _forget_host(self, host: str) -> None:
+        self._metrics.forget_host(host)
+        if self._admission is not None:
+            self._admission.forget_host(host)
 
     async def start(self) -> None:
         if self._workers:
@@ -110,22 +335,66 @@ class RateLimitedRequestQueue:
             return
         self._closed = True
         for _ in self._workers:
-            await self._queue.put(None)
-        await asyncio.gather(*self._workers, return_exceptions=True)
+            await self._queue.put((math.inf, next(self._sequence), None))
+        lane_workers = []
+        for slot in self._hosts.values():
+            if slot.queue is not None and slot.worker is not None:
+                slot.queue.put_nowait((math.inf, next(self._sequence), None))
+                lane_workers.append(slot.worker)
+        await asyncio.gather(*self._workers, *lane_workers, return_exceptions=True)
 
     async def enqueue(
         self,
         host: str,
         request_fn: Callable[[], Awaitable[RequestOutcome]],
+        *,
+        deadline: Optional[float] = None,
+        priority: int = 0,
+        method: str = "GET",
     ) -> RequestOutcome:
+        """Queue ``request_fn`` for ``host`` and wait for its outcome.
+
+        ``deadline`` is an absolute ``time.monotonic()`` value; once it has passed the
+        request fails with :class:`DeadlineExceeded` instead of being dispatched.
+        Lower ``priority`` values are dispatched first. A mutating ``method`` queues
+        the request in the host's write lane, tracked as ``lane_key(host, method)``.
+        With admission control, a shed request returns the degraded path's result or
+        raises :class:`LoadShed`.
+        """
         if self._closed:
             raise RuntimeError("Cannot enqueue after queue is closed")
+        host = lane_key(host, method)
+        slot = self._hosts.get(host)
+        if self._admission is not None:
+            decision = self._admission.decide(
+                host,
+                priority=priority,
+                deadline=deadline,
+                queued=slot.in_flight - slot.active,
+                concurrency=1 if _is_write_lane(host) else min(self._per_host_limit, self._max_workers),
+                backoff_seconds=self.backoff_remaining(host),
+            )
+            self._metrics.record_expected_wait(host, decision.expected_wait_seconds)
+            if not decision.admitted:
+                return await self._shed(host, request_fn, decision)
         future: asyncio.Future[RequestOutcome] = asyncio.get_event_loop().create_future()
-        await self._queue.put(_QueuedRequest(host, request_fn, future, time.monotonic()))
+        queued = _QueuedRequest(host, request_fn, future, time.monotonic(), deadline, priority)
+        slot.in_flight += 1
+        self._put(queued)
         self._metrics.total_enqueued += 1
-        self._metrics.queue_depth = self._queue.qsize()
+        self._metrics.queue_depth = self._depth()
         return await future
 
+    async def _shed(
+        self, host: str, request_fn: Callable[[], Awaitable[RequestOutcome]], decision: AdmissionDecision
+    ) -> RequestOutcome:
+        assert self._admission is not None
+        degraded = self._admission.degraded
+        self._metrics.record_shed(host, degraded is not None)
+        if degraded is None:
+            raise LoadShed(host, decision.expected_wait_seconds, decision.reason)
+        return await degraded(host, request_fn)
+
     def _should_backoff(self, outcome: RequestOutcome) -> bool:
         retry_after = self._parse_retry_after(outcome.headers)
         is_rate_limited = outcome.status_code == 429 or retry_after is not None
@@ -149,56 +418,176 @@ class RateLimitedRequestQueue:
         delay += random.uniform(0, delay * self._jitter_ratio)
         return min(delay, self._max_backoff)
 
-    async def _worker(self) -> None:
+    def _depth(self) -> int:
+        return self._queue.qsize() + sum(slot.queue.qsize() for slot in self._hosts.values() if slot.queue is not None)
+
+    def _put(self, queued: _QueuedRequest) -> None:
+        # The queues are unbounded, so put_nowait never blocks and needs no coroutine.
+        slot = self._hosts.peek(queued.host)
+        queue = slot.queue if slot is not None and slot.queue is not None else self._queue
+        queue.put_nowait((queued.priority, next(self._sequence), queued))
+
+    def _expire(self, queued: _QueuedRequest) -> None:
+        self._metrics.record_expired(queued.host)
+        self._try_set_future_exception(queued.future, DeadlineExceeded(f"Deadline exceeded for host {queued.host}"))
+
+    def _settle(self, queued: _QueuedRequest) -> None:
+        slot = self._hosts.peek(queued.host)
+        if slot is not None and slot.in_flight > 0:
+            slot.in_flight -= 1
+
+    async def _worker(
+        self, queue: Optional[asyncio.PriorityQueue[tuple[float, int, _QueuedRequest | None]]] = None
+    ) -> None:
+        """Serve ``queue``: the shared queue, or a write lane's own queue."""
+        queue = self._queue if queue is None else queue
         while True:
-            queued = await self._queue.get()
+            _, _, queued = await queue.get()
             if queued is None:
-                self._queue.task_done()
+                queue.task_done()
                 return
-            if queued.future.cancelled():
-                self._queue.task_done()
-                self._metrics.queue_depth = self._queue.qsize()
-                continue
-            self._metrics.queue_depth = self._queue.qsize()
-            wait_time = time.monotonic() - queued.enqueued_at
-            self._metrics.record_wait(wait_time)
-            now = time.monotonic()
-            retry_until = self._host_backoff.get(queued.host)
-            if retry_until is not None and retry_until > now:
-                sleep_for = retry_until - now
-                self._metrics.record_wait(sleep_for)
-                await asyncio.sleep(sleep_for)
-            semaphore = self._get_host_semaphore(queued.host)
+            settled = True
             try:
-                async with semaphore:
+                settled = await self._dispatch(queued)
+            finally:
+                if settled:
+                    self._settle(queued)
+                queue.task_done()
+                self._metrics.queue_depth = self._depth()
+
+    async def _dispatch(self, queued: _QueuedRequest) -> bool:
+        """Run one attempt of ``queued``; returns False when a retry was scheduled."""
+        if queued.future.cancelled():
+            return True
+        self._metrics.queue_depth = self._depth()
+        wait_time = time.monotonic() - queued.enqueued_at
+        self._metrics.record_wait(wait_time, queued.host)
+        slot = self._hosts.get(queued.host)
+        now = time.monotonic()
+        retry_until = slot.backoff_until
+        if self._shared_backoff is not None:
+            retry_until = max(retry_until, now + self._shared_backoff.delay_for(queued.host))
+        if queued.expires_before(max(now, retry_until)):
+            self._expire(queued)
+            return True
+        if retry_until > now:
+            sleep_for = retry_until - now
+            self._metrics.record_wait(sleep_for, queued.host)
+            await asyncio.sleep(sleep_for)
+        try:
+            async with slot.semaphore:
+                if _is_write_lane(queued.host):
+                    # The previous write may have hit a limit while this one waited its turn.
+                    resume_at = max(slot.last_finished + slot.min_interval, slot.backoff_until)
+                    if resume_at > time.monotonic():
+                        await asyncio.sleep(resume_at - time.monotonic())
+                if queued.expires_before(time.monotonic()):
+                    self._expire(queued)
+                    return True
+                slot.active += 1
+                started = time.monotonic()
+                try:
                     outcome = await queued.request_fn()
-            except Exception as exc:  # noqa: BLE001 - propagate failure to caller
-                self._try_set_future_exception(queued.future, exc)
-                self._queue.task_done()
-                self._metrics.queue_depth = self._queue.qsize()
-                continue
-
-            if self._should_backoff(outcome):
-                retry_after_header = self._parse_retry_after(outcome.headers)
-                delay = self._backoff_delay(queued.attempt, retry_after_header)
-                self._metrics.record_backoff(queued.host, delay)
-                self._host_backoff[queued.host] = time.monotonic() + delay
-                self._queue.task_done()
-                self._metrics.queue_depth = self._queue.qsize()
-                asyncio.create_task(self._requeue_after_delay(queued, delay))
-                continue
-
-            if self._try_set_future_result(queued.future, outcome):
-                self._metrics.completed += 1
-            self._queue.task_done()
-            self._metrics.queue_depth = self._queue.qsize()
-
-    async def _requeue_after_delay(self, queued: _QueuedRequest, delay: float) -> None:
-        await asyncio.sleep(delay)
+                finally:
+                    slot.active -= 1
+                    slot.last_finished = time.monotonic()
+        except Exception as exc:  # noqa: BLE001 - propagate failure to caller
+            self._record_attempt(queued, started, error=exc)
+            self._dead_letter(queued, f"{type(exc).__name__}: {exc}", "error", {})
+            self._try_set_future_exception(queued.future, exc)
+            return True
+        self._metrics.record_service(queued.host, time.monotonic() - started, outcome)
+        if self._shared_backoff is not None:
+            remaining = _parse_remaining(outcome.headers)
+            if remaining is not None:
+                self._shared_backoff.record_remaining(queued.host, remaining)
+
+        if self._should_backoff(outcome):
+            retry_after_header = self._parse_retry_after(outcome.headers)
+            delay = self._backoff_delay(queued.attempt, retry_after_header)
+            self._record_attempt(queued, started, outcome=outcome, retry_after=delay)
+            self._metrics.record_backoff(queued.host, delay)
+            # An exhausted primary quota is shared by the host's read and write lanes.
+            lanes = [queued.host]
+            if _parse_remaining(outcome.headers) == 0:
+                lanes.append(_other_lane(queued.host))
+            for lane in lanes:
+                lane_slot = self._hosts.get(lane)
+                lane_slot.backoff_until = max(lane_slot.backoff_until, time.monotonic() + delay)
+                if self._shared_backoff is not None:
+                    self._shared_backoff.extend(lane, time.time() + delay)
+            if self._max_attempts is not None and queued.attempt + 1 >= self._max_attempts:
+                self._dead_letter(
+                    queued, f"Rate limited after {queued.attempt + 1} attempts", "max_attempts", outcome.headers
+                )
+                self._try_set_future_exception(
+                    queued.future, RateLimitExceeded(f"Max attempts exceeded for host {queued.host}")
+                )
+                return True
+            if queued.expires_before(time.monotonic() + delay):
+                self._expire(queued)
+                return True
+            asyncio.get_running_loop().call_later(delay, self._requeue, queued)
+            return False
+
+        if self._payload_store is not None:
+            outcome.payload = await self._payload_store.offload_async(outcome.payload)
+        if self._try_set_future_result(queued.future, outcome):
+            self._metrics.record_completed(queued.host)
+            if self._admission is not None:
+                # in_flight still counts this request, so the backlog behind it is one less.
+                backlog = slot.in_flight - slot.active - 1
+                self._admission.record_completion(queued.host, time.monotonic() - started, backlog)
+        return True
+
+    def _record_attempt(
+        self,
+        queued: _QueuedRequest,
+        started: float,
+        *,
+        outcome: Optional[RequestOutcome] = None,
+        error: Optional[Exception] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        # Attempt history only feeds dead letters, so it is not kept without a sink.
+        if self._dead_letters is None:
+            return
+        duration = time.monotonic() - started
+        if queued.history is None:
+            queued.history = []
+        queued.history.append(
+            AttemptRecord(
+                attempt=queued.attempt + 1,
+                started_at=time.time() - duration,
+                duration_seconds=duration,
+                status=outcome.status_code if outcome is not None else None,
+                error=None if error is None else f"{type(error).__name__}: {error}",
+                retry_after_seconds=retry_after,
+            )
+        )
+
+    def _dead_letter(self, queued: _QueuedRequest, reason: str, kind: str, headers: Mapping[str, Any]) -> None:
+        if self._dead_letters is None or queued.future.done():
+            return
+        self._metrics.record_dead_lettered(queued.host)
+        self._dead_letters.add(
+            queued.host,
+            queued.request_fn,
+            reason,
+            kind=kind,
+            attempts=queued.history,
+            last_headers=headers,
+            priority=queued.priority,
+        )
+
+    def _requeue(self, queued: _QueuedRequest) -> None:
         if queued.future.cancelled():
+            self._settle(queued)
             return
-        await self._queue.put(queued.next_attempt())
-        self._metrics.queue_depth = self._queue.qsize()
+        self._metrics.record_retry(queued.host)
+        queued.retry()
+        self._put(queued)
+        self._metrics.queue_depth = self._depth()
 
     def _try_set_future_result(
         self,
@@ -249,46 +638,122 @@ class BackoffEvent:
 class QueueMetrics:
     """Alternative metrics implementation for RequestQueue."""
 
-    def __init__(self) -> None:
+    def __init__(self, *, max_wait_samples: int = 1_000, max_backoff_events: int = 1_000) -> None:
         self.queue_depths: Dict[str, int] = defaultdict(int)
-        self.wait_times: Dict[str, list[float]] = defaultdict(list)
-        self.backoff_events: list[BackoffEvent] = []
+        self.wait_times: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=max_wait_samples))
+        self.backoff_events: Deque[BackoffEvent] = deque(maxlen=max_backoff_events)
+        self.expired: Dict[str, int] = defaultdict(int)
+        self.dead_lettered: Dict[str, int] = defaultdict(int)
+        self.shed: Dict[str, int] = defaultdict(int)
+        self.degraded: Dict[str, int] = defaultdict(int)
+        self.expected_wait: Dict[str, float] = {}
+        self.completed: Dict[str, int] = defaultdict(int)
+        self.backoff_counts: Dict[str, int] = defaultdict(int)
+        self.retries: Dict[str, int] = defaultdict(int)
+        self.rate_limit_remaining: Dict[str, float] = {}
+        self.wait_histograms: Dict[str, Histogram] = {}
+        self.service_histograms: Dict[str, Histogram] = {}
 
     def record_depth(self, host: str, depth: int) -> None:
         self.queue_depths[host] = depth
 
     def record_wait_time(self, host: str, wait_time: float) -> None:
         self.wait_times[host].append(wait_time)
+        _histogram(self.wait_histograms, host).observe(wait_time)
+
+    def record_service(self, host: str, duration: float, response: Any) -> None:
+        _histogram(self.service_histograms, host).observe(duration)
+        remaining = _parse_remaining({k.lower(): v for k, v in getattr(response, "headers", {}).items()})
+        if remaining is not None:
+            self.rate_limit_remaining[host] = remaining
+
+    def record_completed(self, host: str) -> None:
+        self.completed[host] += 1
 
     def record_backoff(
         self, host: str, attempt: int, delay: float, retry_after: Optional[float], status: int
     ) -> None:
         self.backoff_events.append(BackoffEvent(host, attempt, delay, retry_after, status))
+        self.backoff_counts[host] += 1
+
+    def record_retry(self, host: str) -> None:
+        self.retries[host] += 1
+
+    def record_expired(self, host: str) -> None:
+        self.expired[host] += 1
+
+    def record_dead_lettered(self, host: str) -> None:
+        self.dead_lettered[host] += 1
+
+    def record_expected_wait(self, host: str, seconds: float) -> None:
+        self.expected_wait[host] = seconds
+
+    def record_shed(self, host: str, degraded: bool) -> None:
+        self.shed[host] += 1
+        if degraded:
+            self.degraded[host] += 1
+
+    def forget_host(self, host: str) -> None:
+        for per_host in (
+            self.queue_depths,
+            self.wait_times,
+            self.expired,
+            self.dead_lettered,
+            self.shed,
+            self.degraded,
+            self.expected_wait,
+            self.completed,
+            self.backoff_counts,
+            self.retries,
+            self.rate_limit_remaining,
+            self.wait_histograms,
+            self.service_histograms,
+        ):
+            per_host.pop(host, None)
 
 
-@dataclass
 class _RequestTask:
-    operation: Callable[[], Awaitable[Any]]
-    future: asyncio.Future
-    enqueued_at: float
-    attempt: int = 0
-    max_attempts: int = 5
+    __slots__ = ("operation", "future", "enqueued_at", "attempt", "max_attempts", "deadline", "priority", "history")
+
+    def __init__(
+        self,
+        operation: Callable[[], Awaitable[Any]],
+        future: asyncio.Future,
+        enqueued_at: float,
+        max_attempts: int = 5,
+        deadline: Optional[float] = None,
+        priority: int = 0,
+    ) -> None:
+        self.operation = operation
+        self.future = future
+        self.enqueued_at = enqueued_at
+        self.attempt = 0
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self.priority = priority
+        self.history: Optional[List[AttemptRecord]] = None
 
 
 @dataclass
 class _HostState:
-    queue: asyncio.Queue[_RequestTask]
+    queue: asyncio.PriorityQueue[tuple[int, int, _RequestTask]]
     retry_after: float = 0.0
     backoff_attempts: int = 0
+    in_flight: int = 0
+    active: int = 0
     workers: list[asyncio.Task] = field(default_factory=list)
-
-
-class RateLimitExceeded(Exception):
-    pass
+    # Write lanes only: minimum gap between one request finishing and the next starting.
+    min_interval: float = 0.0
+    last_finished: float = 0.0
 
 
 class RequestQueue:
-    """Alternative queue implementation with per-host state management."""
+    """Alternative queue implementation with per-host state management.
+
+    Requests enqueued with a mutating ``method`` get a per-host write lane with a
+    single worker that leaves ``write_spacing_seconds`` between them and keeps its
+    own backoff.
+    """
 
     def __init__(
         self,
@@ -299,80 +764,202 @@ class RequestQueue:
         jitter: float = 0.25,
         metrics: Optional[QueueMetrics] = None,
         randomizer: Callable[[float, float], float] = random.uniform,
+        max_hosts: int = 10_000,
+        host_idle_ttl_seconds: float = 300.0,
+        shared_backoff: Optional[SharedBackoffStore] = None,
+        dead_letters: Optional[DeadLetterSink] = None,
+        admission: Optional[AdmissionController] = None,
+        payload_store: Optional[PayloadStore] = None,
+        write_spacing_seconds: float = 1.0,
     ) -> None:
+        if write_spacing_seconds < 0:
+            raise ValueError("write_spacing_seconds must not be negative")
         self._default_concurrency = max(1, default_concurrency)
+        self._write_spacing = write_spacing_seconds
         self._base_backoff = base_backoff
         self._max_backoff = max_backoff
         self._jitter = jitter
         self._metrics = metrics or QueueMetrics()
         self._randomizer = randomizer
-        self._host_states: Dict[str, _HostState] = {}
+        self._shared_backoff = shared_backoff
+        self._dead_letters = dead_letters
+        self._admission = admission
+        self._payload_store = payload_store
+        self._host_states: HostStateRegistry[_HostState] = HostStateRegistry(
+            self._create_host,
+            max_hosts=max_hosts,
+            idle_ttl_seconds=host_idle_ttl_seconds,
+            is_busy=lambda host, state: state.in_flight > 0 or state.retry_after > time.monotonic(),
+            on_evict=self._evict_host,
+        )
+        self._sequence = itertools.count()
         self._closed = False
 
     @property
     def metrics(self) -> QueueMetrics:
         return self._metrics
 
+    @property
+    def tracked_hosts(self) -> int:
+        return len(self._host_states)
+
+    def host_activity(self) -> Dict[str, HostActivity]:
+        """Snapshot of queued and executing requests per tracked host."""
+        return {
+            host: HostActivity(queued=state.in_flight - state.active, active=state.active)
+            for host, state in self._host_states.snapshot().items()
+        }
+
+    def backoff_remaining(self, host: str) -> float:
+        """Seconds until ``host`` leaves backoff (local or shared); 0.0 when it is callable now."""
+        state = self._host_states.peek(host)
+        if state is not None:
+            return max(0.0, self._ready_at(host, state) - time.monotonic())
+        return self._shared_backoff.delay_for(host) if self._shared_backoff is not None else 0.0
+
     async def enqueue(
         self,
         host: str,
         operation: Callable[[], Awaitable[Any]],
         *,
         max_attempts: int = 5,
+        deadline: Optional[float] = None,
+        priority: int = 0,
+        method: str = "GET",
     ) -> Any:
+        """Queue ``operation`` for ``host``; ``deadline`` is an absolute ``time.monotonic()`` value.
+
+        A mutating ``method`` queues it in the host's write lane, tracked as
+        ``lane_key(host, method)``. With admission control, a shed request returns the
+        degraded path's result or raises :class:`LoadShed`.
+        """
         if self._closed:
             raise RuntimeError("RequestQueue is closed")
 
+        host = lane_key(host, method)
         state = self._ensure_host(host)
+        if self._admission is not None:
+            decision = self._admission.decide(
+                host,
+                priority=priority,
+                deadline=deadline,
+                queued=state.in_flight - state.active,
+                concurrency=len(state.workers),
+                backoff_seconds=self.backoff_remaining(host),
+            )
+            self._metrics.record_expected_wait(host, decision.expected_wait_seconds)
+            if not decision.admitted:
+                return await self._shed(host, operation, decision)
+        state.in_flight += 1
         loop = asyncio.get_running_loop()
         future: asyncio.Future = loop.create_future()
-        task = _RequestTask(operation=operation, future=future, enqueued_at=time.monotonic(), max_attempts=max_attempts)
-        await state.queue.put(task)
+        task = _RequestTask(operation, future, time.monotonic(), max_attempts, deadline, priority)
+        self._put(state.queue, task)
         self._metrics.record_depth(host, state.queue.qsize())
         return await future
 
+    async def _shed(self, host: str, operation: Callable[[], Awaitable[Any]], decision: AdmissionDecision) -> Any:
+        assert self._admission is not None
+        degraded = self._admission.degraded
+        self._metrics.record_shed(host, degraded is not None)
+        if degraded is None:
+            raise LoadShed(host, decision.expected_wait_seconds, decision.reason)
+        return await degraded(host, operation)
+
     def _ensure_host(self, host: str) -> _HostState:
-        if host in self._host_states:
-            return self._host_states[host]
+        return self._host_states.get(host)
 
-        queue: asyncio.Queue[_RequestTask] = asyncio.Queue()
+    def _create_host(self, host: str) -> _HostState:
+        queue: asyncio.PriorityQueue[tuple[int, int, _RequestTask]] = asyncio.PriorityQueue()
         state = _HostState(queue=queue)
-        self._host_states[host] = state
+        concurrency = self._default_concurrency
+        if _is_write_lane(host):
+            state.min_interval = self._write_spacing
+            concurrency = 1
 
-        for _ in range(self._default_concurrency):
+        for _ in range(concurrency):
             worker = asyncio.create_task(self._worker(host, state))
             state.workers.append(worker)
         return state
 
+    def _evict_host(self, host: str, state: _HostState) -> None:
+        # Evicted hosts are idle, so their workers are parked on an empty queue.
+        for worker in state.workers:
+            worker.cancel()
+        self._metrics.forget_host(host)
+        if self._admission is not None:
+            self._admission.forget_host(host)
+
     async def _worker(self, host: str, state: _HostState) -> None:
         while not self._closed:
-            task: _RequestTask = await state.queue.get()
+            _, _, task = await state.queue.get()
             wait_time = time.monotonic() - task.enqueued_at
             self._metrics.record_wait_time(host, wait_time)
-            await self._respect_retry_after(state)
-            await self._execute_task(host, state, task)
+            settled = True
+            now = time.monotonic()
+            ready_at = max(self._ready_at(host, state), state.last_finished + state.min_interval)
+            if not self._expire_if_due(host, task, max(now, ready_at)):
+                if ready_at > now:
+                    await asyncio.sleep(ready_at - now)
+                settled = await self._execute_task(host, state, task)
             state.queue.task_done()
             self._metrics.record_depth(host, state.queue.qsize())
+            if settled:
+                state.in_flight -= 1
+
+    def _put(self, queue: asyncio.PriorityQueue[tuple[int, int, _RequestTask]], task: _RequestTask) -> None:
+        queue.put_nowait((task.priority, next(self._sequence), task))
+
+    def _expire_if_due(self, host: str, task: _RequestTask, ready_at: float) -> bool:
+        """Fail ``task`` with DeadlineExceeded if it cannot start before its deadline."""
+        if task.deadline is None or ready_at <= task.deadline:
+            return False
+        self._metrics.record_expired(host)
+        if not task.future.done():
+            task.future.set_exception(DeadlineExceeded(f"Deadline exceeded for host {host}"))
+        return True
 
-    async def _execute_task(self, host: str, state: _HostState, task: _RequestTask) -> None:
+    async def _execute_task(self, host: str, state: _HostState, task: _RequestTask) -> bool:
+        """Run one attempt of ``task``; returns False when it was requeued for a retry."""
+        if task.future.done() or self._expire_if_due(host, task, time.monotonic()):
+            return True
         task.attempt += 1
+        state.active += 1
+        started = time.monotonic()
         try:
             response = await task.operation()
-        except Exception as exc:  # pragma: no cover - passthrough for unexpected errors
+        except Exception as exc:  # noqa: BLE001 - passed to the caller and dead-lettered
+            self._record_attempt(task, started, error=exc)
+            self._dead_letter(host, task, f"{type(exc).__name__}: {exc}", "error", {})
             if not task.future.done():
                 task.future.set_exception(exc)
-            return
+            return True
+        finally:
+            state.active -= 1
+            state.last_finished = time.monotonic()
+        self._metrics.record_service(host, time.monotonic() - started, response)
+        if self._shared_backoff is not None:
+            remaining = _parse_remaining({k.lower(): v for k, v in getattr(response, "headers", {}).items()})
+            if remaining is not None:
+                self._shared_backoff.record_remaining(host, remaining)
 
         if self._is_rate_limited(response):
-            await self._handle_backoff(host, state, task, response)
-            return
+            return not self._handle_backoff(host, state, task, response, started)
 
         state.backoff_attempts = 0
         state.retry_after = 0.0
+        if self._payload_store is not None and not task.future.done() and hasattr(response, "payload"):
+            response.payload = await self._payload_store.offload_async(response.payload)
         if not task.future.done():
             task.future.set_result(response)
+            self._metrics.record_completed(host)
+            if self._admission is not None:
+                self._admission.record_completion(host, time.monotonic() - started, state.in_flight - state.active - 1)
+        return True
 
-    async def _handle_backoff(self, host: str, state: _HostState, task: _RequestTask, response: FakeResponse) -> None:
+    def _handle_backoff(
+        self, host: str, state: _HostState, task: _RequestTask, response: FakeResponse, started: float
+    ) -> bool:
         headers = {k.lower(): v for k, v in getattr(response, "headers", {}).items()}
         retry_after_header = headers.get("retry-after") or headers.get("x-ratelimit-reset-after")
         retry_after_seconds = float(retry_after_header) if retry_after_header is not None else None
@@ -382,32 +969,82 @@ class RequestQueue:
         jitter = self._randomizer(0, self._jitter)
         delay_with_jitter = min(self._max_backoff, delay + jitter)
         retry_after_deadline = time.monotonic() + delay_with_jitter
-        state.retry_after = max(state.retry_after, retry_after_deadline)
+        # An exhausted primary quota is shared by the host's read and write lanes.
+        lanes = [(host, state)]
+        if _parse_remaining(headers) == 0:
+            other = _other_lane(host)
+            lanes.append((other, self._ensure_host(other)))
+        for lane, lane_state in lanes:
+            lane_state.retry_after = max(lane_state.retry_after, retry_after_deadline)
+            if self._shared_backoff is not None:
+                self._shared_backoff.extend(lane, time.time() + delay_with_jitter)
         self._metrics.record_backoff(host, task.attempt, delay_with_jitter, retry_after_seconds, getattr(response, "status", 0))
+        self._record_attempt(task, started, response=response, retry_after=delay_with_jitter)
 
         if task.attempt >= task.max_attempts:
+            self._dead_letter(host, task, f"Rate limited after {task.attempt} attempts", "max_attempts", headers)
             if not task.future.done():
                 task.future.set_exception(RateLimitExceeded(f"Max attempts exceeded for host {host}"))
-            return
+            return False
+
+        if self._expire_if_due(host, task, time.monotonic() + delay_with_jitter):
+            return False
 
         # Requeue the task after waiting
-        task.enqueued_at = time.monotonic() + delay_with_jitter
-        asyncio.create_task(self._requeue_after_delay(state.queue, task, delay_with_jitter))
+        self._metrics.record_retry(host)
+        asyncio.get_running_loop().call_later(delay_with_jitter, self._requeue, state.queue, task)
+        return True
 
-    async def _requeue_after_delay(self, queue: asyncio.Queue[_RequestTask], task: _RequestTask, delay: float) -> None:
-        await asyncio.sleep(delay)
+    def _record_attempt(
+        self,
+        task: _RequestTask,
+        started: float,
+        *,
+        response: Any = None,
+        error: Optional[Exception] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        if self._dead_letters is None:
+            return
+        duration = time.monotonic() - started
+        if task.history is None:
+            task.history = []
+        task.history.append(
+            AttemptRecord(
+                attempt=task.attempt,
+                started_at=time.time() - duration,
+                duration_seconds=duration,
+                status=getattr(response, "status", None),
+                error=None if error is None else f"{type(error).__name__}: {error}",
+                retry_after_seconds=retry_after,
+            )
+        )
+
+    def _dead_letter(self, host: str, task: _RequestTask, reason: str, kind: str, headers: Mapping[str, Any]) -> None:
+        if self._dead_letters is None or task.future.done():
+            return
+        self._metrics.record_dead_lettered(host)
+        self._dead_letters.add(
+            host,
+            task.operation,
+            reason,
+            kind=kind,
+            attempts=task.history,
+            last_headers=headers,
+            priority=task.priority,
+        )
+
+    def _requeue(self, queue: asyncio.PriorityQueue[tuple[int, int, _RequestTask]], task: _RequestTask) -> None:
         if self._closed:
             return
         task.enqueued_at = time.monotonic()
-        await queue.put(task)
+        self._put(queue, task)
         # depth recorded when worker processes task
 
-    async def _respect_retry_after(self, state: _HostState) -> None:
-        if state.retry_after <= 0:
-            return
-        now = time.monotonic()
-        if now < state.retry_after:
-            await asyncio.sleep(state.retry_after - now)
+    def _ready_at(self, host: str, state: _HostState) -> float:
+        if self._shared_backoff is None:
+            return state.retry_after
+        return max(state.retry_after, time.monotonic() + self._shared_backoff.delay_for(host))
 
     def _is_rate_limited(self, response: Any) -> bool:
         status = getattr(response, "status", None)
@@ -0,0 +1,501 @@
+"""Process-sharded front end for RateLimitedRequestQueue.
+
+Each shard is a worker process running its own event loop and
+RateLimitedRequestQueue. Hosts are pinned to shards with a consistent hash
+ring, so per-host concurrency limits and backoff state live in exactly one
+process and need no cross-process locking. When a shard dies it is restarted
+under the same ring position, up to ``max_restarts`` times, and its pending
+requests are re-dispatched to the replacement (at-least-once delivery for
+requests that were executing when it died). Once a shard has used up its
+restarts its hosts move to the surviving shards and capacity shrinks by one.
+
+Neither side ever blocks its event loop on a full pipe: batches are pickled on
+the loop and written by a sender thread per connection, with at most
+``_MAX_OUTSTANDING_BATCHES`` handed to it at a time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import itertools
+import multiprocessing
+import os
+import pickle
+import queue
+import threading
+import time
+from bisect import bisect
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.reduction import ForkingPickler
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .request_queue import RateLimitedRequestQueue, RequestOutcome
+
+ShardHandler = Callable[[str, Any], Awaitable[RequestOutcome]]
+
+# (request_id, host, payload, seconds_until_deadline, priority)
+_Request = Tuple[int, str, Any, Optional[float], int]
+# (request_id, succeeded, outcome_or_exception)
+_Result = Tuple[int, bool, Any]
+
+# Batches handed to a sender thread but not yet written; later items coalesce meanwhile.
+_MAX_OUTSTANDING_BATCHES = 2
+_STOP = object()
+
+
+class ShardUnavailable(Exception):
+    """Raised when no live shard is left to run a request."""
+
+
+class ConsistentHashRing:
+    """Hash ring mapping keys to nodes; removing a node only moves that node's keys."""
+
+    def __init__(self, nodes: Iterable[int] = (), *, replicas: int = 64) -> None:
+        self._replicas = replicas
+        self._points: List[int] = []
+        self._owners: Dict[int, int] = {}
+        for node in nodes:
+            self.add(node)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def add(self, node: int) -> None:
+        for replica in range(self._replicas):
+            point = self._hash(f"{node}:{replica}")
+            self._owners[point] = node
+        self._points = sorted(self._owners)
+
+    def remove(self, node: int) -> None:
+        self._owners = {point: owner for point, owner in self._owners.items() if owner != node}
+        self._points = sorted(self._owners)
+
+    def node_for(self, key: str) -> int:
+        if not self._points:
+            raise ShardUnavailable("No shards available")
+        index = bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def __len__(self) -> int:
+        return len(set(self._owners.values()))
+
+
+@dataclass
+class ShardedQueueMetrics:
+    """Front-end view of the sharded queue; per-host metrics stay inside each shard."""
+
+    total_enqueued: int = 0
+    completed: int = 0
+    failed: int = 0
+    redispatched: int = 0
+    shard_deaths: int = 0
+    shard_restarts: int = 0
+    in_flight_by_shard: Dict[int, int] = field(default_factory=dict)
+
+
+class _BatchSender:
+    """Writes batches to ``conn`` from a thread so the owning event loop never blocks on it.
+
+    Items added on the loop are pickled into one batch per loop iteration. While
+    ``_MAX_OUTSTANDING_BATCHES`` batches are still being written, new items wait and
+    go out together once the thread catches up. ``on_unsendable(item, exc)`` is
+    called for items that cannot be pickled; ``on_broken()`` once the pipe fails.
+    """
+
+    def __init__(
+        self,
+        conn: Connection,
+        *,
+        on_unsendable: Callable[[Any, Exception], None],
+        on_broken: Callable[[], None],
+        name: str,
+    ) -> None:
+        self._conn = conn
+        self._loop = asyncio.get_running_loop()
+        self._on_unsendable = on_unsendable
+        self._on_broken = on_broken
+        self._items: List[Any] = []
+        self._outstanding = 0
+        self._flush_scheduled = False
+        self._broken = False
+        self._discarded = False
+        self._writes: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def add(self, item: Any) -> None:
+        self._items.append(item)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self.flush)
+
+    def flush(self) -> None:
+        self._flush_scheduled = False
+        if self._broken or not self._items or self._outstanding >= _MAX_OUTSTANDING_BATCHES:
+            return
+        batch, self._items = self._items, []
+        data = self._dumps(batch)
+        if data is not None:
+            self._outstanding += 1
+            self._writes.put(data)
+
+    def close(self, *final: Any) -> None:
+        """Queue every remaining item, then each of ``final``, and stop the thread once written."""
+        if self._items and not self._broken:
+            data = self._dumps(self._items)
+            self._items = []
+            if data is not None:
+                self._writes.put(data)
+        for message in final:
+            self._writes.put(ForkingPickler.dumps(message))
+        self._writes.put(_STOP)
+
+    def discard(self) -> None:
+        """Drop unsent items and stop without reporting further failures; the thread closes ``conn``."""
+        self._broken = self._discarded = True
+        self._items = []
+        self._writes.put(_STOP)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _dumps(self, batch: List[Any]) -> Optional[Any]:
+        try:
+            return ForkingPickler.dumps(batch)
+        except Exception:  # noqa: BLE001 - find the offending items and send the rest
+            sendable = []
+            for item in batch:
+                try:
+                    ForkingPickler.dumps(item)
+                except Exception as exc:  # noqa: BLE001 - reported per item
+                    self._on_unsendable(item, exc)
+                else:
+                    sendable.append(item)
+            return ForkingPickler.dumps(sendable) if sendable else None
+
+    def _write_loop(self) -> None:
+        failed = False
+        while True:
+            data = self._writes.get()
+            if data is _STOP:
+                break
+            if failed:
+                continue  # the pipe is gone; wait for close() or discard()
+            try:
+                self._conn.send_bytes(data)
+            except (OSError, TypeError):  # TypeError: the connection was closed under us
+                failed = True
+            try:
+                self._loop.call_soon_threadsafe(self._written, failed)
+            except RuntimeError:  # the loop has closed; nobody is waiting for the rest
+                failed = True
+        if self._discarded:
+            self._conn.close()
+
+    def _written(self, broken: bool) -> None:
+        self._outstanding -= 1
+        if broken:
+            if not self._broken:
+                self._broken = True
+                self._on_broken()
+        elif self._items:
+            self.flush()
+
+
+@dataclass
+class _Pending:
+    host: str
+    payload: Any
+    deadline: Optional[float]
+    priority: int
+    future: asyncio.Future
+    shard: int
+
+
+@dataclass
+class _Shard:
+    process: multiprocessing.process.BaseProcess
+    conn: Connection
+    sender: _BatchSender
+    restarts: int = 0
+
+
+class ShardedRequestQueue:
+    """Run requests across ``shards`` worker processes keyed by host.
+
+    ``handler`` must be a picklable (module-level) coroutine function
+    ``handler(host, payload) -> RequestOutcome``; it runs inside the shard that
+    owns ``host``. ``queue_options`` are passed to each shard's
+    RateLimitedRequestQueue. A shard that dies is restarted up to
+    ``max_restarts`` times; after that its hosts move to the other shards.
+    """
+
+    def __init__(
+        self,
+        handler: ShardHandler,
+        *,
+        shards: Optional[int] = None,
+        queue_options: Optional[Dict[str, Any]] = None,
+        start_method: str = "spawn",
+        replicas: int = 64,
+        max_restarts: int = 3,
+    ) -> None:
+        shards = shards if shards is not None else (os.cpu_count() or 1)
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+        if max_restarts < 0:
+            raise ValueError("max_restarts must not be negative")
+        self._max_restarts = max_restarts
+        self._handler = handler
+        self._shard_count = shards
+        self._queue_options = dict(queue_options or {})
+        self._context = multiprocessing.get_context(start_method)
+        self._ring = ConsistentHashRing(replicas=replicas)
+        self._shards: Dict[int, _Shard] = {}
+        self._pending: Dict[int, _Pending] = {}
+        self._ids = itertools.count()
+        self._metrics = ShardedQueueMetrics()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closed = False
+
+    @property
+    def metrics(self) -> ShardedQueueMetrics:
+        return self._metrics
+
+    @property
+    def live_shards(self) -> List[int]:
+        return sorted(self._shards)
+
+    def shard_for(self, host: str) -> int:
+        return self._ring.node_for(host)
+
+    async def start(self) -> None:
+        if self._shards:
+            return
+        self._loop = asyncio.get_running_loop()
+        for index in range(self._shard_count):
+            self._spawn(index)
+
+    def _spawn(self, index: int, restarts: int = 0) -> None:
+        assert self._loop is not None
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_shard_main,
+            args=(child_conn, self._handler, self._queue_options),
+            name=f"request-queue-shard-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        sender = _BatchSender(
+            parent_conn,
+            on_unsendable=lambda request, exc: self._resolve(index, request[0], False, exc),
+            on_broken=lambda: self._on_shard_exit(index),
+            name=f"request-queue-shard-{index}-sender",
+        )
+        self._shards[index] = _Shard(process=process, conn=parent_conn, sender=sender, restarts=restarts)
+        self._metrics.in_flight_by_shard[index] = 0
+        self._ring.add(index)
+        self._loop.add_reader(parent_conn.fileno(), self._on_results, index)
+        self._loop.add_reader(process.sentinel, self._on_shard_exit, index)
+
+    async def enqueue(
+        self,
+        host: str,
+        payload: Any = None,
+        *,
+        deadline: Optional[float] = None,
+        priority: int = 0,
+    ) -> RequestOutcome:
+        """Run ``handler(host, payload)`` on the shard owning ``host``.
+
+        ``deadline`` is an absolute ``time.monotonic()`` value in this process; it is
+        sent to the shard as a remaining budget.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot enqueue after queue is closed")
+        if not self._shards:
+            raise RuntimeError("ShardedRequestQueue.start() has not been awaited")
+        future = asyncio.get_running_loop().create_future()
+        request_id = next(self._ids)
+        pending = _Pending(host, payload, deadline, priority, future, shard=-1)
+        self._pending[request_id] = pending
+        self._metrics.total_enqueued += 1
+        self._dispatch(request_id, pending)
+        try:
+            return await future
+        finally:
+            # Still present only if the caller gave up before a result arrived.
+            abandoned = self._pending.pop(request_id, None)
+            if abandoned is not None and abandoned.shard in self._metrics.in_flight_by_shard:
+                self._metrics.in_flight_by_shard[abandoned.shard] -= 1
+
+    async def close(self) -> None:
+        """Let every shard drain its queue, collect the remaining results and stop the processes."""
+        if self._closed:
+            return
+        self._closed = True
+        for shard in self._shards.values():
+            shard.sender.close(None)  # everything still queued, then the stop message
+        loop = asyncio.get_running_loop()
+        for index, shard in list(self._shards.items()):
+            # Joining off-loop keeps the result readers running while the shard drains.
+            await loop.run_in_executor(None, shard.process.join, 10)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            await loop.run_in_executor(None, shard.sender.join, 1)
+            self._on_results(index)
+            self._detach(index)
+            shard.conn.close()
+        self._shards.clear()
+        for pending in list(self._pending.values()):
+            if not pending.future.done():
+                pending.future.set_exception(ShardUnavailable("Queue closed before the request completed"))
+
+    def _dispatch(self, request_id: int, pending: _Pending) -> None:
+        try:
+            index = self._ring.node_for(pending.host)
+        except ShardUnavailable as exc:
+            self._metrics.failed += 1
+            if not pending.future.done():
+                pending.future.set_exception(exc)
+            return
+        pending.shard = index
+        self._metrics.in_flight_by_shard[index] += 1
+        budget = None if pending.deadline is None else pending.deadline - time.monotonic()
+        # Everything enqueued during this loop iteration goes out as one batch per shard.
+        self._shards[index].sender.add((request_id, pending.host, pending.payload, budget, pending.priority))
+
+    def _on_results(self, index: int) -> None:
+        shard = self._shards.get(index)
+        if shard is None:
+            return
+        try:
+            self._drain(index, shard)
+        except (EOFError, OSError):
+            self._on_shard_exit(index)
+
+    def _drain(self, index: int, shard: _Shard) -> None:
+        while shard.conn.poll():
+            results: List[_Result] = shard.conn.recv()
+            for request_id, succeeded, value in results:
+                self._resolve(index, request_id, succeeded, value)
+
+    def _resolve(self, index: int, request_id: int, succeeded: bool, value: Any) -> None:
+        pending = self._pending.get(request_id)
+        if pending is None or pending.shard != index:
+            return
+        del self._pending[request_id]
+        self._metrics.in_flight_by_shard[index] -= 1
+        if pending.future.done():
+            return
+        if succeeded:
+            self._metrics.completed += 1
+            pending.future.set_result(value)
+        else:
+            self._metrics.failed += 1
+            pending.future.set_exception(value)
+
+    def _detach(self, index: int) -> None:
+        shard = self._shards.get(index)
+        if shard is None or self._loop is None:
+            return
+        self._loop.remove_reader(shard.conn.fileno())
+        self._loop.remove_reader(shard.process.sentinel)
+
+    def _on_shard_exit(self, index: int) -> None:
+        shard = self._shards.get(index)
+        if shard is None or self._loop is None:
+            return
+        if self._closed:
+            # close() collects the final results; just stop watching the exited process.
+            self._loop.remove_reader(shard.process.sentinel)
+            return
+        # Results the shard sent before exiting are still buffered in the pipe.
+        try:
+            self._drain(index, shard)
+        except (EOFError, OSError):
+            pass
+        self._detach(index)
+        del self._shards[index]
+        # The sender thread may still be writing to the dead shard; it closes the pipe itself.
+        shard.sender.discard()
+        self._ring.remove(index)
+        self._metrics.shard_deaths += 1
+        self._metrics.in_flight_by_shard.pop(index, None)
+        if shard.restarts < self._max_restarts:
+            # Same index, same ring points: the replacement takes over exactly the dead shard's hosts.
+            self._metrics.shard_restarts += 1
+            self._spawn(index, shard.restarts + 1)
+        orphaned = [(request_id, pending) for request_id, pending in self._pending.items() if pending.shard == index]
+        for request_id, pending in orphaned:
+            if pending.future.done():
+                continue
+            self._metrics.redispatched += 1
+            self._dispatch(request_id, pending)
+
+
+def _shard_main(conn: Connection, handler: ShardHandler, queue_options: Dict[str, Any]) -> None:
+    asyncio.run(_serve_shard(conn, handler, queue_options))
+
+
+async def _serve_shard(conn: Connection, handler: ShardHandler, queue_options: Dict[str, Any]) -> None:
+    loop = asyncio.get_running_loop()
+    queue = RateLimitedRequestQueue(**queue_options)
+    await queue.start()
+    stopped = loop.create_future()
+    tasks: set[asyncio.Task[None]] = set()
+
+    def stop() -> None:
+        if not stopped.done():
+            stopped.set_result(None)
+
+    def unsendable(result: _Result, exc: Exception) -> None:
+        sender.add((result[0], False, RuntimeError(f"Result could not be sent back: {type(exc).__name__}: {exc}")))
+
+    sender = _BatchSender(conn, on_unsendable=unsendable, on_broken=stop, name="request-queue-shard-results")
+
+    async def run(request: _Request) -> None:
+        request_id, host, payload, budget, priority = request
+        deadline = None if budget is None else time.monotonic() + budget
+        try:
+            outcome = await queue.enqueue(host, lambda: handler(host, payload), deadline=deadline, priority=priority)
+            result: _Result = (request_id, True, outcome)
+        except Exception as exc:  # noqa: BLE001 - shipped back to the caller
+            result = (request_id, False, _portable(exc))
+        sender.add(result)
+
+    def on_readable() -> None:
+        try:
+            while conn.poll():
+                batch = conn.recv()
+                if batch is None:
+                    stop()
+                    return
+                for request in batch:
+                    task = loop.create_task(run(request))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except (EOFError, OSError):
+            stop()
+
+    loop.add_reader(conn.fileno(), on_readable)
+    await stopped
+    loop.remove_reader(conn.fileno())
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    sender.close()
+    await loop.run_in_executor(None, sender.join)
+    await queue.close()
+    conn.close()
+
+
+def _portable(exc: Exception) -> Exception:
+    try:
+        pickle.dumps(exc)
+    except Exception:  # noqa: BLE001 - any pickling failure means it cannot cross the pipe
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+    return exc
@@ -0,0 +1,206 @@
+"""Node-local backoff and rate-limit budget shared between processes.
+
+Replicas on the same node map one file into memory. Each host occupies a fixed
+slot in an open-addressing table; readers check "is this host eligible now"
+without taking a lock (a per-slot sequence counter detects torn reads), and
+writers serialize with an exclusive ``flock`` so concurrent backoffs merge to
+the latest deadline. Deadlines are wall-clock (``time.time()``) values because
+monotonic clocks are not guaranteed to agree between processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+try:  # POSIX advisory locking; without it writes are only serialized in-process.
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+_MAGIC = b"EMUBKOF1"
+_HEADER = struct.Struct("<8sI52x")
+# version (even = stable), host key, eligible-at deadline, last rate-limit remaining
+_SLOT = struct.Struct("<QQdd")
+_MAX_PROBE = 16
+_MAX_READ_RETRIES = 100
+
+
+def _open_store(path: str, remaining_threshold: float) -> "SharedBackoffStore":
+    return SharedBackoffStore(path, remaining_threshold=remaining_threshold)
+
+
+def _host_key(host: str) -> int:
+    key = int.from_bytes(hashlib.blake2b(host.encode(), digest_size=8).digest(), "little")
+    return key or 1  # zero marks an empty slot
+
+
+class SharedBackoffStore:
+    """Shared table of per-host backoff deadlines and remaining budget.
+
+    Budgets above ``remaining_threshold`` are only written when they replace a
+    value at or below it or the host is backing off; otherwise the stored value
+    already says "plenty left" and the write (and its locks) is skipped.
+
+    A slot whose backoff has not expired is never taken over by another host. If
+    every slot a host can probe is backing off, that host's write is dropped
+    (counted in ``dropped_writes``), and its backoff stays local to the process
+    that hit it.
+    """
+
+    def __init__(self, path: str, *, slots: int = 4096, remaining_threshold: float = 100.0) -> None:
+        if slots <= 0:
+            raise ValueError("slots must be positive")
+        self.path = os.fspath(path)
+        self.remaining_threshold = remaining_threshold
+        self.dropped_writes = 0
+        self._lock = threading.Lock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._file_lock():
+            size = os.fstat(self._fd).st_size
+            if size == 0:
+                os.ftruncate(self._fd, _HEADER.size + slots * _SLOT.size)
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, slots), 0)
+            magic, stored_slots = _HEADER.unpack(os.pread(self._fd, _HEADER.size, 0))
+        if magic != _MAGIC:
+            os.close(self._fd)
+            raise ValueError(f"{self.path} is not a shared backoff store")
+        self.slots = stored_slots
+        self._map = mmap.mmap(self._fd, _HEADER.size + self.slots * _SLOT.size)
+
+    def __reduce__(self):
+        # Each process maps the file itself, which lets queue options carrying a store
+        # be shipped to spawned shard processes.
+        return (_open_store, (self.path, self.remaining_threshold), None)
+
+    def eligible_at(self, host: str) -> float:
+        """Wall-clock time at which ``host`` may be called again (0.0 when not backing off)."""
+        found = self._find(_host_key(host))
+        return found[1] if found else 0.0
+
+    def remaining(self, host: str) -> Optional[float]:
+        found = self._find(_host_key(host))
+        if not found or math.isnan(found[2]):
+            return None
+        return found[2]
+
+    def is_eligible(self, host: str, now: Optional[float] = None) -> bool:
+        return self.eligible_at(host) <= (time.time() if now is None else now)
+
+    def delay_for(self, host: str) -> float:
+        """Seconds until ``host`` is eligible again."""
+        return max(0.0, self.eligible_at(host) - time.time())
+
+    def extend(self, host: str, eligible_at: float) -> float:
+        """Merge ``eligible_at`` into the host's deadline, keeping the later one; returns the result."""
+        key = _host_key(host)
+        with self._write_lock():
+            claimed = self._claim(key)
+            if claimed is None:
+                return eligible_at
+            index, current = claimed
+            merged = max(eligible_at, current[1]) if current[0] == key else eligible_at
+            remaining = current[2] if current[0] == key else math.nan
+            self._write(index, key, merged, remaining)
+        return merged
+
+    def record_remaining(self, host: str, remaining: float) -> None:
+        key = _host_key(host)
+        if remaining > self.remaining_threshold:
+            # Lock-free read: nothing to record while the host has budget and no backoff.
+            found = self._find(key)
+            if found is None or (found[1] <= time.time() and not found[2] <= self.remaining_threshold):
+                return
+        with self._write_lock():
+            claimed = self._claim(key)
+            if claimed is None:
+                return
+            index, current = claimed
+            deadline = current[1] if current[0] == key else 0.0
+            self._write(index, key, deadline, remaining)
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        self._map.close()
+        os.close(self._fd)
+
+    def __enter__(self) -> "SharedBackoffStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _offset(self, index: int) -> int:
+        return _HEADER.size + index * _SLOT.size
+
+    def _read(self, index: int) -> Tuple[int, float, float]:
+        offset = self._offset(index)
+        for _ in range(_MAX_READ_RETRIES):
+            version, key, deadline, remaining = _SLOT.unpack_from(self._map, offset)
+            if version % 2 == 0 and _SLOT.unpack_from(self._map, offset)[0] == version:
+                break
+        # A writer that died mid-update leaves an odd version; fall back to the last read.
+        return key, deadline, remaining
+
+    def _write(self, index: int, key: int, deadline: float, remaining: float) -> None:
+        offset = self._offset(index)
+        version = _SLOT.unpack_from(self._map, offset)[0]
+        struct.pack_into("<Q", self._map, offset, version + 1)
+        struct.pack_into("<Qdd", self._map, offset + 8, key, deadline, remaining)
+        struct.pack_into("<Q", self._map, offset, version + 2)
+
+    def _find(self, key: int) -> Optional[Tuple[int, float, float]]:
+        start = key % self.slots
+        for probe in range(min(_MAX_PROBE, self.slots)):
+            slot = self._read((start + probe) % self.slots)
+            if slot[0] == key:
+                return slot
+            if slot[0] == 0:
+                return None
+        return None
+
+    def _claim(self, key: int) -> Optional[Tuple[int, Tuple[int, float, float]]]:
+        """Slot for ``key``: its own, else the first empty or expired one, else None.
+
+        Slots still backing off are skipped, so a new host never evicts a pause
+        another process is honouring.
+        """
+        start = key % self.slots
+        now = time.time()
+        candidate: Optional[Tuple[int, Tuple[int, float, float]]] = None
+        for probe in range(min(_MAX_PROBE, self.slots)):
+            index = (start + probe) % self.slots
+            slot = self._read(index)
+            if slot[0] == key:
+                return index, slot
+            if candidate is None and (slot[0] == 0 or slot[1] <= now):
+                candidate = (index, slot)
+            if slot[0] == 0:
+                break
+        if candidate is None:
+            self.dropped_writes += 1
+        return candidate
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with self._lock, self._file_lock():
+            yield
@@ -0,0 +1,13 @@
+"""Runbook dependency graph and executor."""
+
+from .executor import RunbookExecutor, RunbookResult, StepResult
+from .graph import RunbookValidationError, build_dependencies, find_cycle
+
+__all__ = [
+    "RunbookExecutor",
+    "RunbookResult",
+    "RunbookValidationError",
+    "StepResult",
+    "build_dependencies",
+    "find_cycle",
+]
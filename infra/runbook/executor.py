@@ -0,0 +1,181 @@
+"""Concurrent runbook executor that schedules steps as a dependency graph."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional
+
+from .graph import RunbookValidationError, build_dependencies
+
+Step = Mapping[str, Any]
+
+# Policies this executor supports. The schema leaves both fields open, so run() rejects
+# anything else; transient/persistent follow docs/hardening/failure-taxonomy.md.
+FAILURE_POLICIES = ("stop", "persistent", "transient", "continue")
+ROLLBACK_POLICIES = ("none", "reverse")
+
+
+@dataclass
+class StepResult:
+    step_id: str
+    status: str = "Pending"
+    attempts: int = 0
+    result: Any = None
+    error: Optional[BaseException] = None
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
+
+
+@dataclass
+class RunbookResult:
+    runbook_id: str
+    status: str
+    steps: Dict[str, StepResult]
+    rolled_back: List[str] = field(default_factory=list)
+    rollback_errors: Dict[str, BaseException] = field(default_factory=dict)
+
+
+class RunbookExecutor:
+    """Run runbook steps concurrently as soon as their dependencies complete.
+
+    ``run_step`` is awaited once per attempt with the step definition. Steps hold
+    one slot of ``max_concurrency`` plus one slot per scope listed in
+    ``scope_limits`` (a step without ``scopes`` uses the runbook's scopes).
+
+    ``failurePolicy``: ``stop``/``persistent`` (default) stop scheduling after the
+    first failure; ``transient`` retries a failed step with exponential backoff
+    before stopping; ``continue`` skips only the failed step's dependents.
+    ``rollbackPolicy``: ``reverse`` awaits ``rollback_step`` for completed steps in
+    reverse completion order when the run fails; ``none`` (default) does nothing.
+    """
+
+    def __init__(
+        self,
+        run_step: Callable[[Step], Awaitable[Any]],
+        *,
+        rollback_step: Optional[Callable[[Step], Awaitable[Any]]] = None,
+        max_concurrency: int = 16,
+        scope_limits: Optional[Mapping[str, int]] = None,
+        retry_attempts: int = 3,
+        retry_backoff_seconds: float = 0.5,
+    ) -> None:
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if any(limit <= 0 for limit in (scope_limits or {}).values()):
+            raise ValueError("scope limits must be positive")
+        self._run_step = run_step
+        self._rollback_step = rollback_step
+        self._max_concurrency = max_concurrency
+        self._scope_limits = dict(scope_limits or {})
+        self._retry_attempts = max(1, retry_attempts)
+        self._retry_backoff = retry_backoff_seconds
+
+    async def run(self, runbook: Mapping[str, Any]) -> RunbookResult:
+        failure_policy = runbook.get("failurePolicy") or "stop"
+        rollback_policy = runbook.get("rollbackPolicy") or "none"
+        if failure_policy not in FAILURE_POLICIES:
+            raise RunbookValidationError(f"Unsupported failurePolicy '{failure_policy}'")
+        if rollback_policy not in ROLLBACK_POLICIES:
+            raise RunbookValidationError(f"Unsupported rollbackPolicy '{rollback_policy}'")
+
+        dependencies = build_dependencies(runbook)
+        steps: Dict[str, Step] = {step["id"]: step for step in runbook["steps"]}
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in steps}
+        for step_id, deps in dependencies.items():
+            for dep in deps:
+                dependents[dep].append(step_id)
+        waiting_on = {step_id: len(deps) for step_id, deps in dependencies.items()}
+        results = {step_id: StepResult(step_id) for step_id in steps}
+
+        slots = asyncio.Semaphore(self._max_concurrency)
+        scopes = {scope: asyncio.Semaphore(limit) for scope, limit in self._scope_limits.items()}
+        default_scopes = list(runbook.get("scopes", []))
+        attempts = self._retry_attempts if failure_policy == "transient" else 1
+
+        ready = [step_id for step_id, count in waiting_on.items() if count == 0]
+        running: Dict[asyncio.Task[None], str] = {}
+        completed_order: List[str] = []
+        stopping = False
+
+        while ready or running:
+            if not stopping:
+                for step_id in ready:
+                    step = steps[step_id]
+                    step_scopes = step.get("scopes", default_scopes)
+                    task = asyncio.create_task(
+                        self._execute(step, results[step_id], slots, scopes, step_scopes, attempts)
+                    )
+                    running[task] = step_id
+            ready = []
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                step_id = running.pop(task)
+                if results[step_id].status == "Completed":
+                    completed_order.append(step_id)
+                    for dependent in dependents[step_id]:
+                        waiting_on[dependent] -= 1
+                        if waiting_on[dependent] == 0:
+                            ready.append(dependent)
+                elif failure_policy != "continue":
+                    stopping = True
+
+        for result in results.values():
+            if result.status == "Pending":
+                result.status = "Cancelled"
+        failed = any(result.status == "Failed" for result in results.values())
+        outcome = RunbookResult(
+            runbook_id=runbook.get("runbookId", ""),
+            status="Failed" if failed else "Completed",
+            steps=results,
+        )
+        if failed and rollback_policy == "reverse" and self._rollback_step is not None:
+            await self._rollback(steps, reversed(completed_order), outcome)
+        return outcome
+
+    async def _execute(
+        self,
+        step: Step,
+        result: StepResult,
+        slots: asyncio.Semaphore,
+        scopes: Mapping[str, asyncio.Semaphore],
+        step_scopes: List[str],
+        attempts: int,
+    ) -> None:
+        async with AsyncExitStack() as stack:
+            await stack.enter_async_context(slots)
+            # Acquire scope slots in a fixed order so overlapping steps cannot deadlock.
+            for scope in sorted(set(step_scopes) & scopes.keys()):
+                await stack.enter_async_context(scopes[scope])
+            result.status = "InProgress"
+            result.started_at = time.monotonic()
+            for attempt in range(1, attempts + 1):
+                result.attempts = attempt
+                try:
+                    result.result = await self._run_step(step)
+                except Exception as exc:  # noqa: BLE001 - recorded on the step result
+                    result.error = exc
+                    if attempt < attempts:
+                        await asyncio.sleep(self._retry_backoff * (2 ** (attempt - 1)))
+                        continue
+                    result.status = "Failed"
+                else:
+                    result.error = None
+                    result.status = "Completed"
+                break
+            result.completed_at = time.monotonic()
+
+    async def _rollback(self, steps: Mapping[str, Step], order: Iterable[str], outcome: RunbookResult) -> None:
+        assert self._rollback_step is not None
+        for step_id in order:
+            try:
+                await self._rollback_step(steps[step_id])
+            except Exception as exc:  # noqa: BLE001 - keep compensating the remaining steps
+                outcome.rollback_errors[step_id] = exc
+                continue
+            outcome.rolled_back.append(step_id)
+
@@ -0,0 +1,88 @@
+"""Step dependency graph for runbooks defined by schemas/emu-runbook.schema.json."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+# First schemaVersion that understands per-step ``dependsOn``.
+DEPENDS_ON_VERSION: Tuple[int, int] = (1, 1)
+
+
+class RunbookValidationError(ValueError):
+    """Raised when a runbook's steps do not form a valid dependency graph."""
+
+
+def parse_version(version: str) -> Tuple[int, int]:
+    parts = str(version).split(".")
+    try:
+        major = int(parts[0])
+        minor = int(parts[1]) if len(parts) > 1 else 0
+    except ValueError:
+        raise RunbookValidationError(f"schemaVersion '{version}' is not a semantic version") from None
+    return major, minor
+
+
+def build_dependencies(runbook: Mapping[str, Any]) -> Dict[str, List[str]]:
+    """Return ``step id -> ids it waits for`` and validate references and cycles.
+
+    Steps without ``dependsOn`` wait for the step listed before them, so runbooks
+    written against the ordered-list schema keep running serially; ``"dependsOn": []``
+    marks a step that can start immediately.
+    """
+    steps: Sequence[Mapping[str, Any]] = runbook["steps"]
+    version = parse_version(runbook.get("schemaVersion", "1.0"))
+    ids = [step["id"] for step in steps]
+    duplicates = sorted(step_id for step_id, count in Counter(ids).items() if count > 1)
+    if duplicates:
+        raise RunbookValidationError(f"Duplicate step ids: {', '.join(duplicates)}")
+
+    known = set(ids)
+    dependencies: Dict[str, List[str]] = {}
+    for index, step in enumerate(steps):
+        step_id = step["id"]
+        if "dependsOn" in step:
+            if version < DEPENDS_ON_VERSION:
+                raise RunbookValidationError(
+                    f"Step '{step_id}' uses dependsOn, which requires schemaVersion "
+                    f"{DEPENDS_ON_VERSION[0]}.{DEPENDS_ON_VERSION[1]} or later"
+                )
+            depends_on = list(step["dependsOn"])
+            unknown = [dep for dep in depends_on if dep not in known]
+            if unknown:
+                raise RunbookValidationError(f"Step '{step_id}' depends on unknown steps: {', '.join(unknown)}")
+            if step_id in depends_on:
+                raise RunbookValidationError(f"Step '{step_id}' depends on itself")
+        else:
+            depends_on = [ids[index - 1]] if index else []
+        dependencies[step_id] = depends_on
+
+    cycle = find_cycle(dependencies)
+    if cycle:
+        raise RunbookValidationError(f"Dependency cycle: {' -> '.join(cycle)}")
+    return dependencies
+
+
+def find_cycle(dependencies: Mapping[str, Sequence[str]]) -> List[str]:
+    """Return one cycle as a list of step ids (first id repeated at the end), or []."""
+    visiting, done = 1, 2
+    state: Dict[str, int] = {}
+    for root in dependencies:
+        if state.get(root):
+            continue
+        path: List[str] = [root]
+        stack = [iter(dependencies[root])]
+        state[root] = visiting
+        while stack:
+            dep = next(stack[-1], None)
+            if dep is None:
+                state[path.pop()] = done
+                stack.pop()
+                continue
+            if state.get(dep) == visiting:
+                return path[path.index(dep):] + [dep]
+            if not state.get(dep):
+                state[dep] = visiting
+                path.append(dep)
+                stack.append(iter(dependencies[dep]))
+    return []
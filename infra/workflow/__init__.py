@@ -0,0 +1,21 @@
+"""Workflow instance record storage."""
+
+from .store import (
+    ACTIVE_STATUSES,
+    FINISHED_STATUSES,
+    RUN_STEP,
+    WORKFLOW_STATUSES,
+    InstanceState,
+    WorkflowInstanceStore,
+    WorkflowRecord,
+)
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "FINISHED_STATUSES",
+    "RUN_STEP",
+    "WORKFLOW_STATUSES",
+    "InstanceState",
+    "WorkflowInstanceStore",
+    "WorkflowRecord",
+]
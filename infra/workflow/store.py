@@ -0,0 +1,278 @@
+"""Indexed store for workflow instance records (docs/workflow_instance_schema.md).
+
+Records are appended to an SQLite table and never rewritten. Each ingest batch
+also upserts a second table holding each workflow instance's run status, latest
+step and last-updated time (at most two writes per instance per batch, not one per
+record), so "not progressed within T" queries are a range read on the
+``(status, updated_at)`` index instead of a scan over every step record.
+
+A run stays active until a record with ``step_id == RUN_STEP`` reports it finished;
+step records only move the run's step and clock forward. A run whose last step
+completed but that never reported its own completion is therefore still found by
+``stuck_instances``.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, fields
+from itertools import islice
+from operator import attrgetter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+WORKFLOW_STATUSES = ("Pending", "InProgress", "Completed", "Failed", "Cancelled")
+ACTIVE_STATUSES = ("Pending", "InProgress")
+FINISHED_STATUSES = ("Completed", "Failed", "Cancelled")
+# step_id of records describing the workflow run itself rather than one of its steps.
+RUN_STEP = "run"
+
+
+@dataclass(frozen=True)
+class WorkflowRecord:
+    """One workflow log entry; timestamps are Unix epoch seconds."""
+
+    workflow_instance_id: str
+    step_id: str
+    status: str
+    agent_id: Optional[str] = None
+    correlation_id: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    timestamp_started: Optional[float] = None
+    timestamp_completed: Optional[float] = None
+    parent_instance_id: Optional[str] = None
+    payload_reference: Optional[str] = None
+    policy_outcome: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class InstanceState:
+    """Latest known position of a workflow instance.
+
+    ``status`` is the run's status: ``Pending`` until a step is logged, then
+    ``InProgress`` until a ``RUN_STEP`` record finishes the run. ``step_id`` and
+    ``step_status`` describe the latest step logged, if any.
+    """
+
+    workflow_instance_id: str
+    step_id: Optional[str]
+    status: str
+    updated_at: float
+    correlation_id: Optional[str] = None
+    step_status: Optional[str] = None
+
+
+_COLUMNS = tuple(field.name for field in fields(WorkflowRecord))
+_RECORD_SELECT = ", ".join(_COLUMNS)
+_record_values = attrgetter(*_COLUMNS)
+_IDEMPOTENCY_KEY = _COLUMNS.index("idempotency_key")
+# Bound on ``?`` parameters per statement; old SQLite builds allow at most 999.
+_MAX_PARAMS = 900
+_INSTANCE_SELECT = "workflow_instance_id, step_id, status, updated_at, correlation_id, step_status"
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS workflow_records (
+    {", ".join(f"{column} {'REAL' if column.startswith('timestamp') else 'TEXT'}" for column in _COLUMNS)},
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS workflow_records_correlation ON workflow_records (correlation_id)
+    WHERE correlation_id IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS workflow_records_idempotency ON workflow_records (idempotency_key)
+    WHERE idempotency_key IS NOT NULL;
+CREATE TABLE IF NOT EXISTS workflow_instances (
+    workflow_instance_id TEXT PRIMARY KEY,
+    step_id TEXT,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    correlation_id TEXT,
+    step_status TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS workflow_instances_progress ON workflow_instances (status, updated_at);
+"""
+
+_FINISHED_SQL = ", ".join(f"'{status}'" for status in FINISHED_STATUSES)
+
+# Run records carry a NULL step. A finished run stays finished whatever arrives later;
+# otherwise the newer update wins, so late arrivals of older records change nothing.
+_UPSERT_INSTANCE = f"""
+INSERT INTO workflow_instances ({_INSTANCE_SELECT})
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (workflow_instance_id) DO UPDATE SET
+    step_id = CASE WHEN excluded.step_id IS NOT NULL AND excluded.updated_at >= workflow_instances.updated_at
+        THEN excluded.step_id ELSE coalesce(workflow_instances.step_id, excluded.step_id) END,
+    step_status = CASE WHEN excluded.step_id IS NOT NULL AND excluded.updated_at >= workflow_instances.updated_at
+        THEN excluded.step_status ELSE coalesce(workflow_instances.step_status, excluded.step_status) END,
+    status = CASE
+        WHEN workflow_instances.status IN ({_FINISHED_SQL}) THEN workflow_instances.status
+        WHEN excluded.status IN ({_FINISHED_SQL}) OR excluded.updated_at >= workflow_instances.updated_at
+            THEN excluded.status
+        ELSE workflow_instances.status END,
+    updated_at = max(excluded.updated_at, workflow_instances.updated_at),
+    correlation_id = coalesce(excluded.correlation_id, workflow_instances.correlation_id)
+"""
+
+_INSERT = (
+    f"INSERT OR IGNORE INTO workflow_records ({_RECORD_SELECT}, updated_at) "
+    f"VALUES ({', '.join('?' for _ in _COLUMNS)}, ?)"
+)
+
+
+class WorkflowInstanceStore:
+    """Append-only workflow record log with correlation, idempotency and progress indexes.
+
+    ``path`` is an SQLite database file (``":memory:"`` for a throwaway store).
+    Records repeating an ``idempotency_key`` that is already stored are dropped on
+    ingest, so retried messages do not add duplicate rows.
+    """
+
+    def __init__(self, path: str = ":memory:", *, batch_size: int = 10_000) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.path = path
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def ingest(self, records: Iterable[WorkflowRecord], *, now: Optional[float] = None) -> int:
+        """Append ``records`` in transactions of ``batch_size`` rows; returns how many were stored.
+
+        A record's last-updated time is ``timestamp_completed``, else
+        ``timestamp_started``, else ``now`` (defaults to the current time).
+        """
+        received = time.time() if now is None else now
+        stored = 0
+        iterator = iter(records)
+        while True:
+            batch = [self._row(record, received) for record in islice(iterator, self._batch_size)]
+            if not batch:
+                return stored
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    # Only rows that are actually stored move their instance: a replayed
+                    # duplicate must not refresh updated_at and hide a stalled run.
+                    batch = self._unstored(batch)
+                    stored += self._conn.executemany(_INSERT, batch).rowcount
+                    self._conn.executemany(_UPSERT_INSTANCE, _latest_by_instance(batch))
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                self._conn.execute("COMMIT")
+
+    def append(self, record: WorkflowRecord, *, now: Optional[float] = None) -> bool:
+        """Store one record; returns False if its idempotency key was already stored."""
+        return self.ingest((record,), now=now) == 1
+
+    def by_idempotency_key(self, key: str) -> Optional[WorkflowRecord]:
+        rows = self._query(
+            f"SELECT {_RECORD_SELECT} FROM workflow_records WHERE idempotency_key = ?", (key,)
+        )
+        return WorkflowRecord(*rows[0]) if rows else None
+
+    def by_correlation_id(self, correlation_id: str) -> List[WorkflowRecord]:
+        """Records sharing ``correlation_id`` in ingestion order."""
+        rows = self._query(
+            f"SELECT {_RECORD_SELECT} FROM workflow_records WHERE correlation_id = ? ORDER BY rowid",
+            (correlation_id,),
+        )
+        return [WorkflowRecord(*row) for row in rows]
+
+    def instance(self, workflow_instance_id: str) -> Optional[InstanceState]:
+        rows = self._query(
+            f"SELECT {_INSTANCE_SELECT} FROM workflow_instances WHERE workflow_instance_id = ?",
+            (workflow_instance_id,),
+        )
+        return InstanceState(*rows[0]) if rows else None
+
+    def stuck_instances(
+        self,
+        older_than_seconds: float,
+        *,
+        now: Optional[float] = None,
+        statuses: Sequence[str] = ACTIVE_STATUSES,
+        limit: Optional[int] = None,
+    ) -> List[InstanceState]:
+        """Instances in ``statuses`` whose last update is more than ``older_than_seconds`` old.
+
+        Oldest first. Each status is a separate range read on the progress index.
+        """
+        cutoff = (time.time() if now is None else now) - older_than_seconds
+        sql, params = self._stuck_query(cutoff, statuses, limit)
+        return [InstanceState(*row) for row in self._query(sql, params)]
+
+    def count(self) -> int:
+        return self._query("SELECT count(*) FROM workflow_records", ())[0][0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "WorkflowInstanceStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _stuck_query(
+        self, cutoff: float, statuses: Sequence[str], limit: Optional[int]
+    ) -> Tuple[str, Tuple[object, ...]]:
+        # UNION ALL of per-status ranges keeps every branch on the (status, updated_at) index.
+        branch = f"SELECT {_INSTANCE_SELECT} FROM workflow_instances WHERE status = ? AND updated_at < ?"
+        sql = " UNION ALL ".join(branch for _ in statuses) + " ORDER BY updated_at"
+        params: Tuple[object, ...] = tuple(value for status in statuses for value in (status, cutoff))
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return sql, params
+
+    def _unstored(self, batch: List[Tuple]) -> List[Tuple]:
+        """``batch`` without rows whose idempotency key is already stored or repeated earlier in it."""
+        keys = list({row[_IDEMPOTENCY_KEY] for row in batch if row[_IDEMPOTENCY_KEY] is not None})
+        if not keys:
+            return batch
+        seen = set()
+        for start in range(0, len(keys), _MAX_PARAMS):
+            chunk = keys[start : start + _MAX_PARAMS]
+            placeholders = ", ".join("?" for _ in chunk)
+            sql = f"SELECT idempotency_key FROM workflow_records WHERE idempotency_key IN ({placeholders})"
+            seen.update(key for (key,) in self._conn.execute(sql, chunk))
+        fresh = []
+        for row in batch:
+            key = row[_IDEMPOTENCY_KEY]
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            fresh.append(row)
+        return fresh
+
+    def _query(self, sql: str, params: Tuple[object, ...]) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _row(record: WorkflowRecord, received: float) -> Tuple:
+        if record.status not in WORKFLOW_STATUSES:
+            raise ValueError(f"Unknown workflow status '{record.status}'")
+        updated_at = record.timestamp_completed or record.timestamp_started or received
+        return _record_values(record) + (updated_at,)
+
+
+def _latest_by_instance(rows: List[Tuple]) -> Iterable[Tuple]:
+    # The latest run record and the latest step record of each instance: folding them
+    # together would let a newer step hide an older record that finished the run.
+    latest = {}
+    for row in rows:
+        key = (row[0], row[1] == RUN_STEP)
+        current = latest.get(key)
+        if current is None or row[-1] >= current[-1]:
+            latest[key] = row
+    for (_, is_run), row in latest.items():
+        if is_run:
+            yield (row[0], None, row[2], row[-1], row[4], None)
+        else:
+            yield (row[0], row[1], "InProgress", row[-1], row[4], row[2])
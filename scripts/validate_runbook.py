@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import json
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from infra.runbook.graph import RunbookValidationError, build_dependencies  # noqa: E402
+
 
 def validate_runbook(path: str) -> int:
     """Validate a runbook JSON file against minimal schema requirements."""
@@ -22,6 +27,15 @@ def validate_runbook(path: str) -> int:
         print("The 'steps' field must be a non-empty array.")
         return 1
 
+    try:
+        build_dependencies(data)
+    except (KeyError, TypeError) as e:
+        print(f"Malformed step definition: {e}")
+        return 1
+    except RunbookValidationError as e:
+        print(f"Invalid step dependencies: {e}")
+        return 1
+
     print(f"Runbook '{data.get('runbookId')}' is valid.")
     return 0
 
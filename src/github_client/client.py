@@ -1,16 +1,102 @@
+import contextlib
 import json
+import threading
 import time
-from typing import Any, Dict, Iterable, List, Optional, TypeVar
+import urllib.parse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, ContextManager, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple, TypeVar
 
 from .errors import ApiError
-from .http import ConnectionError, Response, Session, Timeout
-from .types import ErrorResponse, Headers, HttpMethod, JSONValue, Payload, Repository
+from .http import ConnectionError, Response, Session, Timeout, get_header
+from .metrics import ClientMetrics
+from .types import MUTATING_METHODS, ErrorResponse, Headers, HttpMethod, JSONValue, Payload, Repository
 
 T = TypeVar("T")
+R = TypeVar("R")
+
+READ_LANE = "read"
+WRITE_LANE = "write"
+
+Lane = Tuple[str, str]
+
+
+class _BackoffGate:
+    """Per-host pause shared by every thread using one client.
+
+    Pauses are kept per ``(host, lane)``. A rate-limit response pauses its lane
+    until its Retry-After has passed, and every request in that lane waits out the
+    pause before it is sent, so concurrent callers back off together instead of
+    each hitting the limit.
+    """
+
+    def __init__(self) -> None:
+        self._resume_at: Dict[Lane, float] = {}
+        self._lock = threading.Lock()
+
+    def pause(self, lane: Lane, seconds: float) -> None:
+        resume_at = time.monotonic() + seconds
+        with self._lock:
+            if resume_at > self._resume_at.get(lane, 0.0):
+                self._resume_at[lane] = resume_at
+
+    def remaining(self, lane: Lane) -> float:
+        with self._lock:
+            resume_at = self._resume_at.get(lane)
+            if resume_at is None:
+                return 0.0
+            delay = resume_at - time.monotonic()
+            if delay <= 0:
+                del self._resume_at[lane]  # expired: keep the table to paused lanes only
+                return 0.0
+        return delay
+
+    def wait(self, lane: Lane) -> None:
+        # Re-check after sleeping: another thread may have extended the pause meanwhile.
+        while True:
+            delay = self.remaining(lane)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+
+class _WriteLane:
+    """Runs one mutating request to a host at a time, ``spacing`` seconds after the previous one finished."""
+
+    def __init__(self, spacing: float) -> None:
+        self._spacing = spacing
+        self._lock = threading.Lock()
+        self._last_finished: Optional[float] = None
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+        if self._last_finished is not None:
+            delay = self._last_finished + self._spacing - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._last_finished = time.monotonic()
+        self._lock.release()
 
 
 class GitHubApiClient:
-    """Lightweight GitHub API wrapper with retry, pagination, and typed responses."""
+    """Lightweight GitHub API wrapper with retry, pagination, and typed responses.
+
+    A client is safe to share between threads: they reuse the session's pooled
+    connections and honour one rate-limit backoff per host (see :meth:`map`).
+
+    Mutating requests (POST/PATCH/PUT/DELETE), which GitHub's secondary rate
+    limits punish hardest, go through a separate lane per host. That lane sends
+    them one at a time, at least ``write_spacing_seconds`` apart, while reads keep
+    full concurrency. Each lane has its own backoff, so a secondary limit hit by
+    writes does not pause reads. An exhausted primary quota
+    (``X-RateLimit-Remaining: 0``) pauses both.
+
+    A call sleeps through a rate-limit pause of at most ``max_rate_limit_wait``
+    seconds (``None`` for no limit). If the reset is further off, the call raises
+    :class:`ApiError` instead of blocking until then.
+    """
 
     def __init__(
         self,
@@ -20,12 +106,27 @@ class GitHubApiClient:
         max_retries: int = 3,
         backoff_factor: float = 0.5,
         session: Optional[Session] = None,
+        request_compression_min_bytes: Optional[int] = None,
+        write_spacing_seconds: float = 1.0,
+        max_rate_limit_wait: Optional[float] = 300.0,
     ) -> None:
+        if write_spacing_seconds < 0:
+            raise ValueError("write_spacing_seconds must not be negative")
+        if max_rate_limit_wait is not None and max_rate_limit_wait < 0:
+            raise ValueError("max_rate_limit_wait must not be negative")
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
         self.max_retries = max_retries
         self.backoff_factor = backoff_factor
-        self.session = session or Session()
+        # Only applies to the default session; a provided session keeps its own setting.
+        self.session = session or Session(compress_request_min_bytes=request_compression_min_bytes)
+        self.metrics = ClientMetrics()
+        self._backoff = _BackoffGate()
+        self.write_spacing_seconds = write_spacing_seconds
+        # Longest rate-limit pause a call sleeps through; a later reset raises ApiError instead.
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self._write_lanes: Dict[str, _WriteLane] = {}
+        self._write_lanes_lock = threading.Lock()
         self.default_headers: Headers = {
             "Authorization": f"Bearer {token}",
             "Accept": "application/vnd.github+json",
@@ -36,6 +137,72 @@ class GitHubApiClient:
         path = f"/repos/{owner}/{repo}"
         return self._request("GET", path, operation="get_repository")
 
+    def get_repositories(self, repositories: Iterable[Tuple[str, str]], **options: Any) -> Iterator[Repository]:
+        """Fetch ``(owner, repo)`` pairs concurrently; ``options`` are passed to :meth:`map`."""
+        return self.map(lambda pair: self.get_repository(*pair), repositories, **options)
+
+    def map(
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        max_workers: int = 8,
+        ordered: bool = True,
+        return_exceptions: bool = False,
+    ) -> Iterator[R]:
+        """Apply ``fn`` (typically a call on this client) to ``items`` on ``max_workers`` threads.
+
+        Results are yielded in the order of ``items``, or as they complete when
+        ``ordered`` is False. At most ``2 * max_workers`` items are in flight, so
+        ``items`` may be a long or lazy iterable. The first exception is raised
+        from the iterator unless ``return_exceptions`` is set, in which case it is
+        yielded in place of that item's result. Closing the iterator early cancels
+        the items that have not started.
+        """
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        return self._map(fn, items, max_workers, ordered, return_exceptions)
+
+    def _map(
+        self, fn: Callable[[T], R], items: Iterable[T], max_workers: int, ordered: bool, return_exceptions: bool
+    ) -> Iterator[R]:
+        window = 2 * max_workers
+        source = iter(items)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="github-client")
+
+        def submit(limit: int) -> List["Future[R]"]:
+            submitted = []
+            for item in source:
+                submitted.append(executor.submit(fn, item))
+                if len(submitted) >= limit:
+                    break
+            return submitted
+
+        def outcome(future: "Future[R]") -> Any:
+            error = future.exception()
+            if error is None:
+                return future.result()
+            if return_exceptions:
+                return error
+            raise error
+
+        try:
+            if ordered:
+                queue: Deque["Future[R]"] = deque(submit(window))
+                while queue:
+                    result = outcome(queue.popleft())
+                    queue.extend(submit(1))
+                    yield result
+            else:
+                pending: Set["Future[R]"] = set(submit(window))
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    pending.update(submit(len(done)))
+                    for future in done:
+                        yield outcome(future)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def paginate(self, path: str, params: Optional[Dict[str, Any]] = None) -> Iterable[JSONValue]:
         """Iterate through paginated GitHub resources using `page` and `per_page` parameters."""
 
@@ -67,21 +234,44 @@ class GitHubApiClient:
         json_body: Optional[Payload] = None,
     ) -> T:
         url = f"{self.base_url}{path}"
+        host = urllib.parse.urlsplit(url).netloc
+        lane = (host, WRITE_LANE if method.upper() in MUTATING_METHODS else READ_LANE)
         headers = self.default_headers
         last_error: Optional[ApiError] = None
 
         for attempt in range(1, self.max_retries + 2):
+            rate_limit_delay: Optional[float] = None
+            paused_for = self._backoff.remaining(lane)
+            if self._waits_too_long(paused_for):
+                last_error = ApiError(
+                    status_code=429,
+                    message=f"Rate limited for another {paused_for:.0f}s, longer than max_rate_limit_wait",
+                    operation=operation,
+                )
+                break
             try:
                 request_params = params.copy() if params else None
-                response = self.session.request(
-                    method=method,
-                    url=url,
-                    params=request_params,
-                    json=json_body,
-                    headers=headers,
-                    timeout=self.timeout,
+                with self._lane_slot(lane):
+                    self._backoff.wait(lane)
+                    started = time.monotonic()
+                    response = self.session.request(
+                        method=method,
+                        url=url,
+                        params=request_params,
+                        json=json_body,
+                        headers=headers,
+                        timeout=self.timeout,
+                    )
+                self.metrics.record_response(operation, time.monotonic() - started, response.headers)
+                self.metrics.record_transfer(
+                    operation,
+                    received_wire=response.received_bytes,
+                    received_decoded=len(response.content),
+                    sent_wire=response.request_bytes,
+                    sent_raw=response.request_raw_bytes,
                 )
-                if self._is_retryable_status(response.status_code):
+                rate_limit_delay = self._rate_limit_delay(response.status_code, response.headers)
+                if rate_limit_delay is not None or self._is_retryable_status(response.status_code):
                     raise self._build_error(response, operation)
                 return self._decode_response(response, operation)
             except (Timeout, ConnectionError) as exc:
@@ -91,12 +281,40 @@ class GitHubApiClient:
 
             if attempt > self.max_retries:
                 break
-            self._sleep_with_backoff(attempt)
+            if rate_limit_delay is not None:
+                # Pause the lane for every thread; the next attempt waits at the gate.
+                delay = rate_limit_delay or self._backoff_delay(attempt)
+                if get_header(response.headers, "x-ratelimit-remaining") == "0":
+                    paused = [(host, READ_LANE), (host, WRITE_LANE)]
+                else:
+                    paused = [lane]
+                for each in paused:
+                    self._backoff.pause(each, delay)
+                if self._waits_too_long(delay):
+                    break  # the reset is too far off: fail now rather than block the caller
+                self.metrics.record_retry(operation)
+            else:
+                self.metrics.record_retry(operation)
+                self._sleep_with_backoff(attempt)
 
         if last_error is None:
             last_error = ApiError(status_code=0, message="Unknown error", operation=operation)
+        self.metrics.record_error(operation)
         raise last_error
 
+    def _waits_too_long(self, delay: float) -> bool:
+        return self.max_rate_limit_wait is not None and delay > self.max_rate_limit_wait
+
+    def _lane_slot(self, lane: Lane) -> ContextManager[None]:
+        host, kind = lane
+        if kind == READ_LANE:
+            return contextlib.nullcontext()
+        with self._write_lanes_lock:
+            write_lane = self._write_lanes.get(host)
+            if write_lane is None:
+                write_lane = self._write_lanes[host] = _WriteLane(self.write_spacing_seconds)
+        return write_lane
+
     def _decode_response(self, response: Response, operation: str) -> Any:
         if 200 <= response.status_code < 300:
             if response.content:
@@ -121,10 +339,40 @@ class GitHubApiClient:
 
         return ApiError(status_code=response.status_code, message=message, operation=operation, details=details)
 
+    def _backoff_delay(self, attempt: int) -> float:
+        return self.backoff_factor * (2 ** (attempt - 1))
+
     def _sleep_with_backoff(self, attempt: int) -> None:
-        delay = self.backoff_factor * (2 ** (attempt - 1))
-        time.sleep(delay)
+        time.sleep(self._backoff_delay(attempt))
+
+    @staticmethod
+    def _rate_limit_delay(status: int, headers: Mapping[str, str]) -> Optional[float]:
+        """Seconds to pause the host for a rate-limit response, 0.0 if unspecified, else None.
+
+        GitHub signals limits with 429, or with 403 plus ``Retry-After`` (secondary
+        limits) or ``X-RateLimit-Remaining: 0`` (primary limit, reset at
+        ``X-RateLimit-Reset``).
+        """
+        if status not in (403, 429):
+            return None
+        retry_after = get_header(headers, "retry-after")
+        remaining = get_header(headers, "x-ratelimit-remaining")
+        if status == 403 and retry_after is None and remaining != "0":
+            return None
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        reset = get_header(headers, "x-ratelimit-reset")
+        if remaining == "0" and reset is not None:
+            try:
+                return max(0.0, float(reset) - time.time())
+            except ValueError:
+                pass
+        return 0.0
 
     @staticmethod
     def _is_retryable_status(status: int) -> bool:
         return status >= 500 or status == 429
+
@@ -1,10 +1,35 @@
+import base64
+import gzip
+import http.client
 import json
 import socket
-import urllib.error
+import ssl
+import threading
 import urllib.parse
 import urllib.request
-from dataclasses import dataclass
-from typing import Dict, Optional
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+ACCEPT_ENCODING = "gzip, deflate"
+_CHUNK_SIZE = 64 * 1024
+_MAX_REDIRECTS = 10
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+# Errors meaning a kept-alive connection was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+# Only these are resent on a fresh connection after a reused one drops: the server may
+# already have acted on the request, and repeating it must not change the outcome.
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+Origin = Tuple[str, str]
+
+
+def get_header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    """Case-insensitive header lookup; ``name`` is given in lower case."""
+    value = headers.get(name)
+    if value is None:
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    return value
 
 
 class Timeout(Exception):
@@ -21,6 +46,17 @@ class Response:
     reason: str
     content: bytes
     headers: Dict[str, str]
+    # Body bytes as received, before Content-Encoding was decoded (None: same as content).
+    wire_bytes: Optional[int] = None
+    # Request body bytes as sent, and before request compression.
+    request_bytes: int = 0
+    request_raw_bytes: int = 0
+    # Body exactly as received; only kept when the session sets ``keep_wire_body``.
+    wire_body: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def received_bytes(self) -> int:
+        return len(self.content) if self.wire_bytes is None else self.wire_bytes
 
     def json(self) -> object:
         return json.loads(self.content.decode() or "{}")
@@ -30,7 +66,146 @@ class Response:
         return self.content.decode()
 
 
+class _Decoder:
+    """Incremental gzip/deflate decoder; ``deflate`` accepts zlib-wrapped and raw streams.
+
+    Corrupt or truncated streams raise ``zlib.error``.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self._decompressor: Optional[Any] = None
+        self._head = b""  # deflate bytes held back until the header can be sniffed
+        self._received = False
+        if encoding in ("gzip", "x-gzip"):
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    def decompress(self, chunk: bytes) -> bytes:
+        self._received = self._received or bool(chunk)
+        if self._decompressor is None:
+            self._head += chunk
+            if len(self._head) < 2:
+                return b""
+            chunk, self._head = self._head, b""
+            self._decompressor = self._deflate_decompressor(chunk)
+        return self._decompressor.decompress(chunk)
+
+    def flush(self) -> bytes:
+        if not self._received:
+            return b""
+        if self._decompressor is None:
+            self._decompressor = self._deflate_decompressor(self._head)
+            tail = self._decompressor.decompress(self._head)
+        else:
+            tail = b""
+        tail += self._decompressor.flush()
+        if not self._decompressor.eof:
+            raise zlib.error("compressed body ended before the end of the stream")
+        return tail
+
+    @staticmethod
+    def _deflate_decompressor(head: bytes) -> Any:
+        # Servers disagree on "deflate"; a zlib header has CM=8 and a valid check sum.
+        zlib_wrapped = len(head) >= 2 and head[0] & 0x0F == 8 and (head[0] << 8 | head[1]) % 31 == 0
+        return zlib.decompressobj(zlib.MAX_WBITS if zlib_wrapped else -zlib.MAX_WBITS)
+
+
+class _ConnectionPool:
+    """Idle keep-alive connections per origin; a connection is used by one thread at a time."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._idle: Dict[Origin, List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def acquire(
+        self, origin: Origin, timeout: Optional[float], proxy: Optional[urllib.parse.SplitResult] = None
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """Return an idle connection for ``origin`` (and True) or a new one (and False).
+
+        New connections go through ``proxy`` when one is given: https origins are
+        tunnelled with CONNECT, http requests are sent to the proxy itself.
+        """
+        with self._lock:
+            idle = self._idle.get(origin)
+            connection = idle.pop() if idle else None
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        scheme, netloc = origin
+        address = proxy.netloc.rpartition("@")[2] if proxy is not None else netloc
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            connection = http.client.HTTPSConnection(address, timeout=timeout, context=self._ssl_context)
+            if proxy is not None:
+                connection.set_tunnel(netloc, headers=_proxy_headers(proxy))
+            return connection, False
+        if scheme == "http":
+            return http.client.HTTPConnection(address, timeout=timeout), False
+        raise ConnectionError(f"Unsupported URL scheme '{scheme}'")
+
+    def release(self, origin: Origin, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self._maxsize:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
 class Session:
+    """Minimal thread-safe HTTP session with keep-alive connection pooling.
+
+    Up to ``pool_maxsize`` idle connections per origin are kept for reuse, so
+    concurrent callers sharing a session skip repeated TCP and TLS handshakes.
+    Like urllib, requests go through the proxies in ``HTTP_PROXY``/``HTTPS_PROXY``
+    unless ``NO_PROXY`` excludes the host (``proxies`` overrides the environment,
+    in the ``urllib.request.getproxies()`` format), and redirects are followed. Requests advertise
+    ``accept_encoding`` (gzip and deflate by default) and compressed responses are
+    decoded while they are read. JSON request bodies of at least
+    ``compress_request_min_bytes`` are sent gzip-encoded; this is off by default
+    because not every endpoint accepts compressed request bodies. With
+    ``keep_wire_body`` each response also carries its body as received, before
+    decoding (used to record exchanges).
+    """
+
+    def __init__(
+        self,
+        *,
+        accept_encoding: Optional[str] = ACCEPT_ENCODING,
+        compress_request_min_bytes: Optional[int] = None,
+        pool_maxsize: int = 10,
+        proxies: Optional[Dict[str, str]] = None,
+        keep_wire_body: bool = False,
+    ) -> None:
+        self.accept_encoding = accept_encoding
+        self.keep_wire_body = keep_wire_body
+        self.compress_request_min_bytes = compress_request_min_bytes
+        self._pool = _ConnectionPool(pool_maxsize)
+        self._environment_proxies = proxies is None
+        self.proxies = urllib.request.getproxies() if proxies is None else dict(proxies)
+        self._proxy_by_origin: Dict[Origin, Optional[urllib.parse.SplitResult]] = {}
+
+    def close(self) -> None:
+        """Close idle pooled connections."""
+        self._pool.clear()
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
     def request(
         self,
         *,
@@ -41,29 +216,131 @@ class Session:
         headers: Optional[Dict[str, str]] = None,
         timeout: Optional[float] = None,
     ) -> Response:
-        headers = headers or {}
+        headers = dict(headers or {})
+        if self.accept_encoding:
+            headers.setdefault("Accept-Encoding", self.accept_encoding)
         full_url = self._prepare_url(url, params)
         data = self._prepare_body(json, headers)
-        request = urllib.request.Request(full_url, data=data, headers=headers, method=method)
-        try:
-            with urllib.request.urlopen(request, timeout=timeout) as resp:
-                return Response(
-                    status_code=resp.status,
-                    reason=resp.reason or "",
-                    content=resp.read(),
-                    headers=dict(resp.headers),
-                )
-        except urllib.error.HTTPError as exc:
-            return Response(
-                status_code=exc.code,
-                reason=exc.reason or "",
-                content=exc.read(),
-                headers=dict(exc.headers or {}),
-            )
-        except socket.timeout as exc:
-            raise Timeout(str(exc))
-        except urllib.error.URLError as exc:
-            raise ConnectionError(str(exc))
+        raw_size = len(data) if data is not None else 0
+        if data is not None and self.compress_request_min_bytes is not None and raw_size >= self.compress_request_min_bytes:
+            data = self._compress_body(data, headers)
+        sent = (len(data) if data is not None else 0, raw_size)
+        method = method.upper()
+        for _ in range(_MAX_REDIRECTS):
+            response = self._send(method, full_url, data, headers, timeout, sent)
+            location = get_header(response.headers, "location")
+            if response.status_code not in _REDIRECT_STATUSES or not location:
+                return response
+            # Same rules as urllib: GET/HEAD follow every redirect; other methods only
+            # 301/302/303, re-issued as a GET without a body.
+            if method not in ("GET", "HEAD"):
+                if response.status_code in (307, 308):
+                    return response
+                method, data = "GET", None
+                for name in ("Content-Type", "Content-Encoding", "Content-Length"):
+                    headers.pop(name, None)
+            full_url = urllib.parse.urljoin(full_url, location)
+        raise ConnectionError(f"Too many redirects for {url}")
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        data: Optional[bytes],
+        headers: Dict[str, str],
+        timeout: Optional[float],
+        sent: Tuple[int, int],
+    ) -> Response:
+        parts = urllib.parse.urlsplit(url)
+        origin = (parts.scheme, parts.netloc)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        proxy = self._proxy_for(origin)
+        if proxy is not None and parts.scheme == "http":
+            # A plain-http proxy takes the absolute URI as the request target.
+            target = f"http://{parts.netloc}{target}"
+            headers = {**headers, **_proxy_headers(proxy)}
+        while True:
+            connection, reused = self._pool.acquire(origin, timeout, proxy)
+            try:
+                connection.request(method, target, body=data, headers=headers)
+                resp = connection.getresponse()
+                response = self._build_response(resp.status, resp.reason, resp, resp.headers, sent, self.keep_wire_body)
+            except socket.timeout as exc:
+                connection.close()
+                raise Timeout(str(exc))
+            except _STALE_CONNECTION_ERRORS as exc:
+                connection.close()
+                if reused and method in _IDEMPOTENT_METHODS:
+                    continue  # the server dropped an idle connection; retry on a fresh one
+                raise ConnectionError(str(exc))
+            except (OSError, http.client.HTTPException) as exc:
+                connection.close()
+                raise ConnectionError(str(exc))
+            except zlib.error as exc:
+                # The rest of the body is unread, so the connection cannot be reused.
+                connection.close()
+                raise ConnectionError(f"Undecodable {resp.headers.get('Content-Encoding')} response body: {exc}")
+            if resp.will_close:
+                connection.close()
+            else:
+                self._pool.release(origin, connection)
+            return response
+
+    def _proxy_for(self, origin: Origin) -> Optional[urllib.parse.SplitResult]:
+        if origin in self._proxy_by_origin:
+            return self._proxy_by_origin[origin]
+        scheme, netloc = origin
+        proxy_url = self.proxies.get(scheme)
+        proxy = None
+        if proxy_url:
+            host = urllib.parse.urlsplit(f"//{netloc}").hostname or netloc
+            if self._environment_proxies:
+                bypass = urllib.request.proxy_bypass(host)
+            else:
+                bypass = urllib.request.proxy_bypass_environment(host, self.proxies)
+            if not bypass:
+                proxy = urllib.parse.urlsplit(proxy_url if "//" in proxy_url else f"http://{proxy_url}")
+        self._proxy_by_origin[origin] = proxy
+        return proxy
+
+    @staticmethod
+    def _build_response(
+        status: int, reason: Optional[str], body: Any, headers: Any, sent: Tuple[int, int], keep_wire: bool = False
+    ) -> Response:
+        wire: Optional[List[bytes]] = [] if keep_wire else None
+        content, wire_bytes = Session._read_body(body, headers.get("Content-Encoding"), wire)
+        return Response(
+            status_code=status,
+            reason=reason or "",
+            content=content,
+            headers=dict(headers),
+            wire_bytes=wire_bytes,
+            request_bytes=sent[0],
+            request_raw_bytes=sent[1],
+            wire_body=None if wire is None else b"".join(wire),
+        )
+
+    @staticmethod
+    def _read_body(body: Any, content_encoding: Optional[str], wire: Optional[List[bytes]] = None) -> Tuple[bytes, int]:
+        """Read ``body`` in chunks, decoding gzip/deflate as it arrives; returns (content, wire bytes).
+
+        Undecoded chunks are also appended to ``wire`` when it is given.
+        """
+        encoding = (content_encoding or "").strip().lower()
+        decoder = _Decoder(encoding) if encoding in ("gzip", "x-gzip", "deflate") else None
+        chunks = []
+        wire_bytes = 0
+        while True:
+            chunk = body.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            wire_bytes += len(chunk)
+            if wire is not None:
+                wire.append(chunk)
+            chunks.append(decoder.decompress(chunk) if decoder is not None else chunk)
+        if decoder is not None:
+            chunks.append(decoder.flush())
+        return b"".join(chunks), wire_bytes
 
     @staticmethod
     def _prepare_url(url: str, params: Optional[Dict[str, object]]) -> str:
@@ -77,3 +354,15 @@ class Session:
             return None
         headers.setdefault("Content-Type", "application/json")
         return json.dumps(json_body).encode()
+
+    @staticmethod
+    def _compress_body(data: bytes, headers: Dict[str, str]) -> bytes:
+        headers["Content-Encoding"] = "gzip"
+        return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _proxy_headers(proxy: urllib.parse.SplitResult) -> Dict[str, str]:
+    if proxy.username is None:
+        return {}
+    credentials = f"{urllib.parse.unquote(proxy.username)}:{urllib.parse.unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode()).decode()}
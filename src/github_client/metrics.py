@@ -0,0 +1,188 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .http import get_header
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; ``counts`` has a trailing overflow slot.
+
+    Same ``buckets``/``counts``/``sum``/``count`` shape as the OpenMetrics exporter's
+    histogram, so collectors render it directly without the client importing them.
+    """
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_COUNTERS = (
+    "requests",
+    "retries",
+    "errors",
+    # Body bytes per operation: on the wire (compressed) and decoded.
+    "response_wire_bytes",
+    "response_decoded_bytes",
+    "request_wire_bytes",
+    "request_raw_bytes",
+)
+
+
+class _Shard:
+    """One thread's counters; only its owner thread writes to it."""
+
+    __slots__ = ("owner", "latency") + _COUNTERS
+
+    def __init__(self, owner: Optional[threading.Thread]) -> None:
+        self.owner = owner
+        self.latency: Dict[str, LatencyHistogram] = {}
+        for name in _COUNTERS:
+            setattr(self, name, {})
+
+    def absorb(self, other: "_Shard") -> None:
+        for name in _COUNTERS:
+            _add_counts(getattr(self, name), getattr(other, name))
+        _add_histograms(self.latency, other.latency)
+
+
+class ClientMetrics:
+    """Per-operation counters for GitHubApiClient, safe to update from many threads.
+
+    Each thread records into its own shard without locking; the counter attributes
+    (``requests``, ``latency``, ...) merge the shards into fresh dicts when read. Shards
+    of threads that have exited are folded together when a new thread registers.
+    """
+
+    def __init__(self) -> None:
+        self.rate_limit_limit: Optional[int] = None
+        self.rate_limit_remaining: Optional[int] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: List[_Shard] = []
+        self._retired = _Shard(None)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(threading.current_thread())
+            with self._lock:
+                live = []
+                for each in self._shards:
+                    if each.owner is not None and each.owner.is_alive():
+                        live.append(each)
+                    else:
+                        self._retired.absorb(each)
+                live.append(shard)
+                self._shards = live
+        return shard
+
+    def _merged(self) -> _Shard:
+        merged = _Shard(None)
+        with self._lock:
+            for shard in [self._retired, *self._shards]:
+                merged.absorb(shard)
+        return merged
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        return self._merged().requests
+
+    @property
+    def retries(self) -> Dict[str, int]:
+        return self._merged().retries
+
+    @property
+    def errors(self) -> Dict[str, int]:
+        return self._merged().errors
+
+    @property
+    def latency(self) -> Dict[str, LatencyHistogram]:
+        return self._merged().latency
+
+    @property
+    def response_wire_bytes(self) -> Dict[str, int]:
+        return self._merged().response_wire_bytes
+
+    @property
+    def response_decoded_bytes(self) -> Dict[str, int]:
+        return self._merged().response_decoded_bytes
+
+    @property
+    def request_wire_bytes(self) -> Dict[str, int]:
+        return self._merged().request_wire_bytes
+
+    @property
+    def request_raw_bytes(self) -> Dict[str, int]:
+        return self._merged().request_raw_bytes
+
+    def record_response(self, operation: str, duration: float, headers: Mapping[str, str]) -> None:
+        shard = self._shard()
+        shard.requests[operation] = shard.requests.get(operation, 0) + 1
+        histogram = shard.latency.get(operation)
+        if histogram is None:
+            histogram = shard.latency[operation] = LatencyHistogram()
+        histogram.observe(duration)
+        limit = _header_int(headers, "x-ratelimit-limit")
+        remaining = _header_int(headers, "x-ratelimit-remaining")
+        if limit is not None:
+            self.rate_limit_limit = limit
+        if remaining is not None:
+            self.rate_limit_remaining = remaining
+
+    def record_transfer(
+        self, operation: str, *, received_wire: int, received_decoded: int, sent_wire: int, sent_raw: int
+    ) -> None:
+        shard = self._shard()
+        for counters, value in (
+            (shard.response_wire_bytes, received_wire),
+            (shard.response_decoded_bytes, received_decoded),
+            (shard.request_wire_bytes, sent_wire),
+            (shard.request_raw_bytes, sent_raw),
+        ):
+            counters[operation] = counters.get(operation, 0) + value
+
+    def record_retry(self, operation: str) -> None:
+        shard = self._shard()
+        shard.retries[operation] = shard.retries.get(operation, 0) + 1
+
+    def record_error(self, operation: str) -> None:
+        shard = self._shard()
+        shard.errors[operation] = shard.errors.get(operation, 0) + 1
+
+
+def _add_counts(into: Dict[str, int], counts: Dict[str, int]) -> None:
+    for operation, value in dict(counts).items():
+        into[operation] = into.get(operation, 0) + value
+
+
+def _add_histograms(into: Dict[str, LatencyHistogram], histograms: Dict[str, LatencyHistogram]) -> None:
+    for operation, histogram in dict(histograms).items():
+        target = into.get(operation)
+        if target is None:
+            target = into[operation] = LatencyHistogram(histogram.buckets)
+        for index, count in enumerate(list(histogram.counts)):
+            target.counts[index] += count
+        target.sum += histogram.sum
+        target.count += histogram.count
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = get_header(headers, name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,231 @@
+"""Record real ``Session.request`` exchanges and replay them offline.
+
+A recording is a gzip stream that starts with :data:`MAGIC`. Each exchange
+follows as two big-endian ``uint32`` lengths, a JSON header (request, status,
+headers, elapsed time) and the response body. A body is stored exactly as
+it arrived, with its ``Content-Encoding`` in ``body_encoding``, so replay
+serves the same wire bytes and pays the same decoding cost as the live
+request did.
+"""
+
+import gzip
+import io
+import json
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+from .http import Response, Session, get_header
+
+MAGIC = b"GHREC1\n"
+_LENGTHS = struct.Struct(">II")
+_ENCODINGS = {"gzip": "gzip", "x-gzip": "gzip", "deflate": "deflate"}
+
+RequestKey = Tuple[str, str, str, str]
+
+
+class ReplayMiss(LookupError):
+    """Raised when a replayed request has no recorded exchange left to serve."""
+
+
+@dataclass
+class RecordedExchange:
+    method: str
+    url: str
+    status_code: int
+    reason: str
+    headers: Dict[str, str]
+    elapsed_seconds: float
+    params: Dict[str, Any] = field(default_factory=dict)
+    json_body: Any = None
+    body_encoding: str = "identity"
+    body: bytes = field(default=b"", repr=False)
+
+    @property
+    def key(self) -> RequestKey:
+        return request_key(self.method, self.url, self.params, self.json_body)
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]], json_body: Any) -> RequestKey:
+    return (
+        method.upper(),
+        url,
+        json.dumps(params or {}, sort_keys=True, default=str),
+        json.dumps(json_body, sort_keys=True, default=str),
+    )
+
+
+def write_exchanges(stream: Any, exchanges: Iterable[RecordedExchange]) -> int:
+    """Append framed exchanges to a binary stream; returns how many were written."""
+    written = 0
+    for exchange in exchanges:
+        header = asdict(exchange)
+        body = header.pop("body")
+        encoded = json.dumps(header, separators=(",", ":"), default=str).encode()
+        stream.write(_LENGTHS.pack(len(encoded), len(body)))
+        stream.write(encoded)
+        stream.write(body)
+        written += 1
+    return written
+
+
+def read_exchanges(path: str) -> Iterator[RecordedExchange]:
+    with gzip.open(path, "rb") as stream:
+        if stream.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an HTTP recording")
+        while True:
+            lengths = stream.read(_LENGTHS.size)
+            if not lengths:
+                return
+            header_length, body_length = _LENGTHS.unpack(lengths)
+            header = json.loads(stream.read(header_length))
+            yield RecordedExchange(body=stream.read(body_length), **header)
+
+
+class RecordingSession:
+    """Session wrapper that writes every exchange to ``path`` as it completes.
+
+    Use as a context manager, or call :meth:`close`, to finish the file. The
+    wrapped session is switched to ``keep_wire_body`` so bodies can be stored as
+    they arrived.
+    """
+
+    def __init__(self, path: str, session: Optional[Session] = None) -> None:
+        self.path = path
+        self._session = session or Session()
+        self._session.keep_wire_body = True
+        self._stream = gzip.open(path, "wb")
+        self._stream.write(MAGIC)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def request(
+        self,
+        *,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        started = time.perf_counter()
+        response = self._session.request(
+            method=method, url=url, params=params, json=json, headers=headers, timeout=timeout
+        )
+        elapsed = time.perf_counter() - started
+        content_encoding = get_header(response.headers, "content-encoding") or ""
+        encoding = _ENCODINGS.get(content_encoding.strip().lower(), "identity")
+        exchange = RecordedExchange(
+            method=method.upper(),
+            url=url,
+            status_code=response.status_code,
+            reason=response.reason,
+            headers=dict(response.headers),
+            elapsed_seconds=elapsed,
+            params=dict(params or {}),
+            json_body=json,
+            body_encoding=encoding,
+            body=_wire_body(response, encoding),
+        )
+        with self._lock:
+            write_exchanges(self._stream, (exchange,))
+            self.recorded += 1
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            self._stream.close()
+
+    def __enter__(self) -> "RecordingSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+class ReplaySession:
+    """Serve recorded exchanges in place of the network.
+
+    Requests are matched on method, URL, params and JSON body. Repeats of the
+    same request are served in recorded order; once they run out, the last
+    exchange is served again (``cycle=True``) or :class:`ReplayMiss` is raised.
+    Each response waits ``elapsed_seconds * latency_scale`` before it returns.
+    Its body goes through the same decoder as a live response.
+    """
+
+    def __init__(
+        self,
+        exchanges: Iterable[RecordedExchange],
+        *,
+        latency_scale: float = 1.0,
+        cycle: bool = True,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if latency_scale < 0:
+            raise ValueError("latency_scale must not be negative")
+        self.latency_scale = latency_scale
+        self._cycle = cycle
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._exchanges: Dict[RequestKey, Deque[RecordedExchange]] = defaultdict(deque)
+        for exchange in exchanges:
+            self._exchanges[exchange.key].append(exchange)
+
+    @classmethod
+    def from_file(cls, path: str, **options: Any) -> "ReplaySession":
+        return cls(read_exchanges(path), **options)
+
+    def next_exchange(
+        self, method: str, url: str, params: Optional[Dict[str, Any]] = None, json_body: Any = None
+    ) -> RecordedExchange:
+        key = request_key(method, url, params, json_body)
+        with self._lock:
+            pending = self._exchanges.get(key)
+            if not pending:
+                raise ReplayMiss(f"No recorded exchange for {method.upper()} {url} params={key[2]}")
+            if len(pending) > 1 or not self._cycle:
+                return pending.popleft()
+            return pending[0]
+
+    def request(
+        self,
+        *,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Response:
+        exchange = self.next_exchange(method, url, params, json)
+        delay = exchange.elapsed_seconds * self.latency_scale
+        if delay > 0:
+            self._sleep(delay)
+        return replay_response(exchange)
+
+
+def _wire_body(response: Response, encoding: str) -> bytes:
+    if response.wire_body is not None or encoding == "identity":
+        return response.content if response.wire_body is None else response.wire_body
+    # The wrapped session did not keep the received bytes; re-encode the same way.
+    if encoding == "gzip":
+        return gzip.compress(response.content, mtime=0)
+    return zlib.compress(response.content)
+
+
+def replay_response(exchange: RecordedExchange) -> Response:
+    """Build the Response a live request would have returned, decoding the stored body."""
+    encoding = None if exchange.body_encoding == "identity" else exchange.body_encoding
+    content, wire_bytes = Session._read_body(io.BytesIO(exchange.body), encoding)
+    return Response(
+        status_code=exchange.status_code,
+        reason=exchange.reason,
+        content=content,
+        headers=dict(exchange.headers),
+        wire_bytes=wire_bytes,
+    )
@@ -25,6 +25,10 @@ class ErrorResponse(TypedDict, total=False):
 
 HttpMethod = Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
 
+# Methods GitHub's secondary rate limits treat as content-creating; they are paced in a
+# separate write lane per host.
+MUTATING_METHODS = frozenset({"POST", "PATCH", "PUT", "DELETE"})
+
 Payload = Dict[str, Any]
 Headers = Dict[str, str]
 JSONValue = Any
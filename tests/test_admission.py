@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from infra.observability import MetricsRegistry, RateLimitedQueueCollector
+from infra.queue import AdmissionController, LoadShed, RateLimitedRequestQueue, RateLimitExceeded, RequestOutcome
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_expected_wait_uses_drain_rate_under_backlog_and_service_time_otherwise():
+    clock = FakeClock()
+    controller = AdmissionController(2.0, window_seconds=30.0, clock=clock)
+    assert controller.expected_wait("api", queued=50, backoff_seconds=1.5) == 1.5
+
+    controller.record_completion("api", 0.1, backlog=0)
+    assert controller.service_rate("api", concurrency=2) == pytest.approx(20.0)
+
+    for _ in range(5):
+        clock.now += 0.5
+        controller.record_completion("api", 0.1, backlog=10)
+    assert controller.service_rate("api", concurrency=2) == pytest.approx(2.0)
+    assert controller.expected_wait("api", queued=10, backoff_seconds=1.0) == pytest.approx(6.0)
+
+    clock.now += 31.0
+    assert controller.service_rate("api", concurrency=2) == pytest.approx(20.0)
+
+
+def test_decide_sheds_low_priority_over_slo_and_infeasible_deadlines():
+    clock = FakeClock()
+    controller = AdmissionController(2.0, shed_priority=1, clock=clock)
+
+    assert controller.decide("api", priority=5, deadline=None, queued=0, backoff_seconds=3.0).reason == "slo"
+    assert controller.decide("api", priority=0, deadline=None, queued=0, backoff_seconds=3.0).admitted
+    deadline = controller.decide("api", priority=0, deadline=clock.now + 1.0, queued=0, backoff_seconds=3.0)
+    assert (deadline.admitted, deadline.reason, deadline.expected_wait_seconds) == (False, "deadline", 3.0)
+
+
+def test_rate_limited_queue_sheds_low_priority_work_when_backlog_breaks_slo():
+    async def scenario():
+        queue = RateLimitedRequestQueue(max_workers=1, admission=AdmissionController(0.2))
+        await queue.start()
+
+        async def slow_call():
+            await asyncio.sleep(0.02)
+            return RequestOutcome(200)
+
+        backlog = [asyncio.create_task(queue.enqueue("api", slow_call, priority=0)) for _ in range(40)]
+        await asyncio.sleep(0.1)
+        with pytest.raises(LoadShed) as shed:
+            await queue.enqueue("api", slow_call, priority=1)
+        urgent = await queue.enqueue("api", slow_call, priority=0)
+        await asyncio.gather(*backlog)
+        await queue.close()
+        return queue, shed.value, urgent
+
+    queue, shed, urgent = asyncio.run(scenario())
+    assert shed.reason == "slo" and shed.expected_wait_seconds > 0.2
+    assert urgent.status_code == 200
+    assert queue.metrics.shed_by_host == {"api": 1}
+    assert queue.metrics.completed == 41
+
+    registry = MetricsRegistry()
+    registry.register(RateLimitedQueueCollector(queue))
+    assert 'rate_limited_queue_shed_total{host="api"} 1' in registry.render()
+
+
+def test_request_queue_routes_shed_work_to_degraded_path_during_backoff():
+    calls = []
+
+    async def degraded(host, operation):
+        calls.append(host)
+        return FakeResponse(203, payload="cached")
+
+    async def scenario():
+        queue = RequestQueue(
+            admission=AdmissionController(0.5, degraded=degraded), randomizer=lambda low, high: 0.0
+        )
+
+        async def throttled():
+            return FakeResponse(429, headers={"Retry-After": "2"})
+
+        first = asyncio.create_task(queue.enqueue("api", throttled, max_attempts=1))
+        await asyncio.sleep(0.01)
+        fallback = await queue.enqueue("api", throttled, priority=1)
+        with pytest.raises(RateLimitExceeded):
+            await first
+        await queue.close()
+        return queue, fallback
+
+    queue, fallback = asyncio.run(scenario())
+    assert (fallback.status, fallback.payload) == (203, "cached")
+    assert calls == ["api"]
+    assert queue.metrics.shed["api"] == queue.metrics.degraded["api"] == 1
+    assert queue.metrics.expected_wait["api"] > 1.5
@@ -0,0 +1,189 @@
+import asyncio
+
+from infra.alerting import AlertDeduplicator, AlertPipeline
+from infra.queue import RateLimitedRequestQueue, RequestOutcome
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _envelope(correlation_id, severity="Sev1", category="reliability", channels=("teams",), audience="oncall"):
+    return {
+        "alertId": f"alert-{correlation_id}-{severity}",
+        "severity": severity,
+        "category": category,
+        "correlationId": correlation_id,
+        "summary": f"{correlation_id} failed",
+        "routing": {"channels": list(channels), "audience": audience},
+    }
+
+
+def test_same_key_within_window_updates_the_existing_alert():
+    clock = FakeClock()
+    dedup = AlertDeduplicator(600, clock=clock)
+
+    first, created = dedup.observe(_envelope("run-1"))
+    clock.now = 300
+    again, created_again = dedup.observe(_envelope("run-1"))
+    other, created_other = dedup.observe(_envelope("run-1", severity="Sev2"))
+    clock.now = 901
+    reopened, created_reopened = dedup.observe(_envelope("run-1"))
+
+    assert created and not created_again and created_other and created_reopened
+    assert again is first and first.occurrences == 2
+    assert reopened is not first
+    assert len(dedup) == 1  # run-1/Sev2 expired with the first alert
+
+
+def test_tracked_alerts_are_bounded():
+    dedup = AlertDeduplicator(600, max_tracked=100, clock=FakeClock())
+    for index in range(1000):
+        dedup.observe(_envelope(f"run-{index}"))
+    assert len(dedup) == 100
+    assert dedup.evicted == 900
+
+
+def test_bursts_coalesce_into_one_summary_per_route():
+    sent = []
+
+    async def send(summary):
+        sent.append(summary)
+        return RequestOutcome(status_code=200)
+
+    async def scenario():
+        queue = RateLimitedRequestQueue(max_workers=2)
+        await queue.start()
+        pipeline = AlertPipeline(queue, send, max_summary_items=3, channels=["teams", "email"])
+        for index in range(50):
+            pipeline.submit(_envelope(f"run-{index % 5}"))
+        pipeline.submit(_envelope("run-x", severity="Sev0", channels=("teams", "email", "webhook")))
+        pipeline.submit(_envelope("run-y", channels=("webhook",)))
+        await pipeline.flush()
+        await pipeline.flush()
+        await queue.close()
+        return pipeline, queue
+
+    pipeline, queue = asyncio.run(scenario())
+
+    by_channel = {summary.channel: summary for summary in sent}
+    assert sorted(by_channel) == ["email", "teams"]
+    teams = by_channel["teams"]
+    assert teams.new_alerts == 6 and teams.occurrences == 51
+    assert teams.highest_severity == "Sev0"
+    assert len(teams.alerts) == 3 and teams.omitted == 3
+    assert pipeline.metrics.deduplicated == 45
+    assert pipeline.metrics.dropped == 1
+    assert pipeline.metrics.summaries_sent == 2
+    assert queue.metrics.completed_by_host == {"alerts:teams": 1, "alerts:email": 1}
+
+
+def test_periodic_flush_reports_updates_to_open_alerts():
+    sent = []
+
+    async def send(summary):
+        sent.append(summary)
+        return RequestOutcome(status_code=200)
+
+    async def scenario():
+        queue = RateLimitedRequestQueue()
+        await queue.start()
+        pipeline = AlertPipeline(queue, send, flush_interval_seconds=0.01)
+        await pipeline.start()
+        pipeline.submit(_envelope("run-1"))
+        await asyncio.sleep(0.05)
+        pipeline.submit(_envelope("run-1"))
+        await pipeline.close()
+        await queue.close()
+
+    asyncio.run(scenario())
+
+    assert [(summary.new_alerts, summary.updated_alerts) for summary in sent] == [(1, 0), (0, 1)]
+
+
+def test_throttled_channel_does_not_delay_other_routes():
+    sent = []
+    teams_throttled = True
+
+    async def send(summary):
+        if summary.channel == "teams" and teams_throttled:
+            return RequestOutcome(status_code=429, headers={"Retry-After": "0.1"})
+        sent.append((summary.channel, summary.occurrences))
+        return RequestOutcome(status_code=200)
+
+    async def scenario():
+        nonlocal teams_throttled
+        queue = RateLimitedRequestQueue(max_workers=2, jitter_ratio=0.0)
+        await queue.start()
+        pipeline = AlertPipeline(queue, send, flush_interval_seconds=0.05)
+        await pipeline.start()
+        for _ in range(8):
+            pipeline.submit(_envelope("run-1", channels=("teams", "email")))
+            await asyncio.sleep(0.05)
+        email_sends = sum(1 for channel, _ in sent if channel == "email")
+        teams_throttled = False
+        await pipeline.close()
+        await queue.close()
+        return email_sends
+
+    email_sends = asyncio.run(scenario())
+
+    assert email_sends >= 5  # email kept its flush schedule while teams backed off
+    teams = [occurrences for channel, occurrences in sent if channel == "teams"]
+    # One summary was held in flight; the rest of the burst coalesced behind it.
+    assert len(teams) == 2 and sum(teams) == 8
+
+
+def test_security_alerts_skip_dedup_and_coalescing():
+    sent = []
+
+    async def send(summary):
+        sent.append(summary)
+        return RequestOutcome(status_code=200)
+
+    async def scenario():
+        queue = RateLimitedRequestQueue()
+        await queue.start()
+        pipeline = AlertPipeline(queue, send)
+        for _ in range(3):
+            pipeline.submit(_envelope("breach-1", category="security"))
+            pipeline.submit(_envelope("run-1"))
+        await pipeline.flush()
+        await queue.close()
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+
+    security = [summary for summary in sent if summary.alerts[0].key[1] == "security"]
+    assert len(security) == 3
+    assert all(summary.occurrences == 1 and summary.new_alerts == 1 for summary in security)
+    assert len(sent) == 4  # plus one coalesced reliability summary
+    assert pipeline.metrics.deduplicated == 2
+    assert pipeline.tracked_alerts == 1
+
+
+def test_pending_unsuppressed_alerts_are_bounded():
+    sent = []
+
+    async def send(summary):
+        sent.append(summary)
+        return RequestOutcome(status_code=200)
+
+    async def scenario():
+        queue = RateLimitedRequestQueue()
+        await queue.start()
+        pipeline = AlertPipeline(queue, send, max_pending_unsuppressed=5)
+        for index in range(12):
+            pipeline.submit(_envelope(f"breach-{index}", category="security"))
+        await pipeline.flush()
+        await queue.close()
+        return pipeline
+
+    pipeline = asyncio.run(scenario())
+
+    assert {summary.alerts[0].key[0] for summary in sent} == {f"breach-{index}" for index in range(7, 12)}
+    assert pipeline.metrics.unsuppressed_evicted == 7
@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from infra.observability import DeadLetterCollector, MetricsRegistry
+from infra.queue import DeadLetterSink, RateLimitedRequestQueue, RateLimitExceeded, RequestOutcome
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+
+def test_rate_limited_queue_dead_letters_after_max_attempts_and_replays():
+    async def scenario():
+        sink = DeadLetterSink()
+        queue = RateLimitedRequestQueue(
+            base_backoff_seconds=0.01, max_backoff_seconds=0.02, jitter_ratio=0.0, max_attempts=2, dead_letters=sink
+        )
+        await queue.start()
+        healthy = False
+
+        async def call():
+            if healthy:
+                return RequestOutcome(status_code=200)
+            return RequestOutcome(status_code=429, headers={"retry-after": "0.01", "x-request-id": "abc"})
+
+        with pytest.raises(RateLimitExceeded):
+            await queue.enqueue("api.github.com", call, priority=3)
+        letter = sink.letters()[0]
+        description = letter.describe()
+
+        healthy = True
+        report = await sink.replay(queue, rate_per_second=100)
+        await queue.close()
+        return sink, queue, letter, description, report
+
+    sink, queue, letter, description, report = asyncio.run(scenario())
+
+    assert letter.reason == "Rate limited after 2 attempts"
+    assert [attempt.status for attempt in letter.attempts] == [429, 429]
+    assert letter.attempts[0].retry_after_seconds == pytest.approx(0.01)
+    assert description["last_headers"]["x-request-id"] == "abc"
+    assert description["priority"] == 3
+    assert queue.metrics.dead_lettered_by_host == {"api.github.com": 1}
+    assert (report.requested, report.succeeded, report.failed) == (1, 1, 0)
+    assert len(sink) == 0
+    assert sink.metrics.replay_succeeded == 1 and sink.metrics.by_reason == {"max_attempts": 1}
+
+
+def test_request_queue_dead_letters_errors_and_replay_waits_for_backoff():
+    async def scenario():
+        sink = DeadLetterSink()
+        queue = RequestQueue(base_backoff=0.01, randomizer=lambda a, b: 0, dead_letters=sink)
+        failing = True
+
+        async def call():
+            if failing:
+                raise ConnectionError("reset by peer")
+            return FakeResponse(status=200)
+
+        async def throttled():
+            return FakeResponse(status=429, headers={"Retry-After": "0.3"})
+
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await queue.enqueue("graph.microsoft.com", call)
+        with pytest.raises(RateLimitExceeded):
+            await queue.enqueue("graph.microsoft.com", throttled, max_attempts=1)
+        throttled_letter = sink.letters()[-1]
+        sink.take(limit=3)  # discard the first three connection errors
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await queue.enqueue("other.example.com", call)
+
+        failing = False
+        backoff = queue.backoff_remaining("graph.microsoft.com")
+        started = time.monotonic()
+        report = await sink.replay(queue, host="other.example.com", rate_per_second=20)
+        paced = time.monotonic() - started
+        started = time.monotonic()
+        await sink.replay(queue, host="graph.microsoft.com")
+        waited = time.monotonic() - started
+        await queue.close()
+        return sink, queue, throttled_letter, report, backoff, paced, waited
+
+    sink, queue, throttled_letter, report, backoff, paced, waited = asyncio.run(scenario())
+
+    assert throttled_letter.reason == "Rate limited after 1 attempts"
+    assert throttled_letter.attempts[0].status == 429
+    assert report.succeeded == 3 and paced >= 2 / 20
+    assert backoff > 0.1 and waited >= backoff - 0.05  # replay held until the host left backoff
+    assert sink.metrics.replay_failed == 1  # still rate limited, so dead-lettered again
+    assert sink.metrics.by_reason == {"error": 6, "max_attempts": 2}
+    assert len(sink) == 1
+    assert queue.metrics.dead_lettered["graph.microsoft.com"] == 5
+
+
+def test_sink_is_bounded_and_exported():
+    sink = DeadLetterSink(max_letters=2)
+
+    async def call():
+        return RequestOutcome(status_code=200)
+
+    for host in ("a", "b", "b"):
+        sink.add(host, call, "boom", kind="error")
+    registry = MetricsRegistry()
+    registry.register(DeadLetterCollector(sink))
+    text = registry.render()
+
+    assert len(sink) == 2 and sink.metrics.dropped == 1
+    assert 'dead_letter_pending{host="b"} 2' in text
+    assert 'dead_letter_added_total{reason="error"} 3' in text
@@ -1,4 +1,8 @@
 import json
+import subprocess
+import sys
+import time
+from pathlib import Path
 from typing import List
 from unittest.mock import MagicMock, call, patch
 
@@ -113,3 +117,40 @@ def test_paginate_accumulates_items():
             timeout=client.timeout,
         ),
     ]
+
+
+def test_distant_rate_limit_reset_raises_instead_of_sleeping():
+    session = MagicMock()
+    session.request.return_value = Response(
+        status_code=403,
+        reason="Forbidden",
+        content=json.dumps({"message": "API rate limit exceeded"}).encode(),
+        headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 3600)},
+    )
+    client = GitHubApiClient(token="token", session=session, max_rate_limit_wait=60)
+
+    with patch("time.sleep") as mocked_sleep:
+        with pytest.raises(ApiError) as first:
+            client.get_repository("octocat", "demo")
+        with pytest.raises(ApiError) as second:
+            client._request("POST", "/repos/octocat/demo/issues", operation="create_issue")
+
+    assert first.value.status_code == 403 and "rate limit" in first.value.message
+    assert second.value.status_code == 429 and "max_rate_limit_wait" in second.value.message
+    assert session.request.call_count == 1  # the paused write lane was not tried either
+    mocked_sleep.assert_not_called()
+    assert client.metrics.errors == {"get_repository": 1, "create_issue": 1}
+    assert client.metrics.retries == {}
+
+
+def test_client_imports_with_only_src_on_the_path():
+    src = Path(__file__).resolve().parents[1] / "src"
+    probe = (
+        "import sys; sys.path[:] = [p for p in sys.path if p not in ('', '.')]; "
+        "import github_client; "
+        "print(sorted(m for m in sys.modules if m.split('.')[0] in ('infra', 'asyncio', 'multiprocessing', 'mmap')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], env={"PYTHONPATH": str(src)}, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,120 @@
+import asyncio
+import gc
+import os
+import tracemalloc
+
+from infra.queue import HostStateRegistry, RateLimitedRequestQueue, RequestOutcome
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+# Set QUEUE_SOAK_HOSTS=1000000 for the full soak run; the default keeps the suite fast.
+SOAK_HOSTS = int(os.environ.get("QUEUE_SOAK_HOSTS", "10000"))
+SOAK_BATCH = 500
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_registry_evicts_least_recently_used_over_capacity():
+    evicted = []
+    registry = HostStateRegistry(lambda host: {}, max_hosts=2, on_evict=lambda host, value: evicted.append(host))
+
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+
+    assert evicted == ["b"]
+    assert "a" in registry and "c" in registry
+    assert len(registry) == 2
+
+
+def test_registry_evicts_idle_entries_after_ttl_but_keeps_busy_hosts():
+    clock = FakeClock()
+    busy = {"backing-off"}
+    registry = HostStateRegistry(
+        lambda host: {},
+        idle_ttl_seconds=10,
+        is_busy=lambda host, value: host in busy,
+        clock=clock,
+    )
+    registry.get("idle")
+    registry.get("backing-off")
+
+    clock.now = 11
+    assert registry.evict_idle() == 1
+    assert "idle" not in registry
+    assert "backing-off" in registry
+
+    busy.clear()
+    clock.now = 30
+    assert registry.evict_idle() == 1
+    assert len(registry) == 0
+
+
+async def _drive_distinct_hosts(queue, request_fn) -> list[int]:
+    samples = []
+    checkpoint = max(SOAK_HOSTS // 4, SOAK_BATCH)
+    for start in range(0, SOAK_HOSTS, SOAK_BATCH):
+        hosts = (f"tenant-{index}.example.com" for index in range(start, start + SOAK_BATCH))
+        await asyncio.gather(*(queue.enqueue(host, request_fn) for host in hosts))
+        if start % checkpoint == 0:
+            gc.collect()
+            samples.append(tracemalloc.get_traced_memory()[0])
+    gc.collect()
+    samples.append(tracemalloc.get_traced_memory()[0])
+    return samples
+
+
+def _assert_flat(samples: list[int]) -> None:
+    warm = samples[1] if len(samples) > 2 else samples[0]
+    assert samples[-1] <= warm * 1.1 + 256 * 1024, f"memory grew across distinct hosts: {samples}"
+
+
+def test_rate_limited_queue_memory_stays_flat_across_distinct_hosts():
+    async def scenario():
+        queue = RateLimitedRequestQueue(max_workers=8, max_hosts=256)
+        await queue.start()
+
+        async def request():
+            return RequestOutcome(status_code=200, headers={})
+
+        samples = await _drive_distinct_hosts(queue, request)
+        await queue.close()
+        return queue, samples
+
+    tracemalloc.start()
+    try:
+        queue, samples = asyncio.run(scenario())
+    finally:
+        tracemalloc.stop()
+
+    assert queue.metrics.completed == SOAK_HOSTS
+    assert queue.tracked_hosts <= 256 + SOAK_BATCH
+    _assert_flat(samples)
+
+
+def test_request_queue_memory_stays_flat_across_distinct_hosts():
+    async def scenario():
+        queue = RequestQueue(max_hosts=256)
+
+        async def operation():
+            return FakeResponse(status=200)
+
+        samples = await _drive_distinct_hosts(queue, operation)
+        await queue.close()
+        return queue, samples
+
+    tracemalloc.start()
+    try:
+        queue, samples = asyncio.run(scenario())
+    finally:
+        tracemalloc.stop()
+
+    assert queue.tracked_hosts <= 256 + SOAK_BATCH
+    assert len(queue.metrics.wait_times) <= 256 + SOAK_BATCH
+    _assert_flat(samples)
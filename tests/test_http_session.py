@@ -0,0 +1,146 @@
+import gzip
+import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from github_client import ApiError, GitHubApiClient
+from github_client.http import ConnectionError, Session, _Decoder
+
+ITEMS = [{"id": index, "name": f"repo-{index}", "description": "x" * 40} for index in range(500)]
+PAYLOAD = json.dumps(ITEMS).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    received = []
+
+    def do_GET(self):
+        encoding = self.path.rsplit("/", 1)[-1]
+        if encoding == "gzip":
+            body = gzip.compress(PAYLOAD)
+        elif encoding == "deflate":
+            body = zlib.compress(PAYLOAD)
+        elif encoding == "corrupt":
+            body, encoding = b"\x1f\x8b\x08\x00" + b"not gzip at all" * 8, "gzip"
+        elif encoding == "truncated":
+            body, encoding = gzip.compress(PAYLOAD)[:200], "gzip"
+        elif encoding == "raw-deflate":
+            compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+            body, encoding = compressor.compress(PAYLOAD) + compressor.flush(), "deflate"
+        else:
+            body = PAYLOAD
+        self._reply(200, body, encoding)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).received.append((dict(self.headers), body))
+        if self.path == "/drop":
+            self.close_connection = True  # acted on the request, then hung up without replying
+            return
+        self._reply(201, b"{}", "identity")
+
+    def _reply(self, status, body, encoding):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("X-Seen-Accept-Encoding", self.headers.get("Accept-Encoding", ""))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    _Handler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "deflate", "raw-deflate"])
+def test_compressed_responses_are_decoded(server_url, encoding):
+    response = Session().request(method="GET", url=f"{server_url}/items/{encoding}")
+
+    assert response.headers["X-Seen-Accept-Encoding"] == "gzip, deflate"
+    assert response.json() == ITEMS
+    assert len(response.content) == len(PAYLOAD)
+    assert response.wire_bytes < len(PAYLOAD) // 4
+
+
+def test_identity_response_and_caller_headers_untouched(server_url):
+    headers = {"Accept": "application/json"}
+    response = Session(accept_encoding=None).request(method="GET", url=f"{server_url}/items/identity", headers=headers)
+
+    assert "gzip" not in response.headers["X-Seen-Accept-Encoding"]
+    assert response.wire_bytes == len(response.content) == len(PAYLOAD)
+    assert headers == {"Accept": "application/json"}
+
+
+def test_large_request_bodies_are_gzipped(server_url):
+    session = Session(compress_request_min_bytes=1024)
+    small = session.request(method="POST", url=f"{server_url}/items", json={"name": "demo"})
+    large = session.request(method="POST", url=f"{server_url}/items", json={"items": ITEMS})
+
+    (small_headers, small_body), (large_headers, large_body) = _Handler.received
+    assert "Content-Encoding" not in small_headers
+    assert json.loads(small_body) == {"name": "demo"}
+    assert small.request_bytes == small.request_raw_bytes == len(small_body)
+    assert large_headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(large_body)) == {"items": ITEMS}
+    assert large.request_bytes == len(large_body) < large.request_raw_bytes
+
+
+def test_client_reports_bytes_per_operation(server_url):
+    client = GitHubApiClient(token="token", base_url=server_url, request_compression_min_bytes=1024)
+    items = client._request("GET", "/items/gzip", operation="list_items")
+    client._request("POST", "/items", json_body={"items": ITEMS}, operation="create_items")
+
+    metrics = client.metrics
+    assert len(items) == len(ITEMS)
+    assert metrics.response_decoded_bytes["list_items"] == len(PAYLOAD)
+    assert metrics.response_wire_bytes["list_items"] < len(PAYLOAD) // 4
+    assert metrics.request_raw_bytes["create_items"] > metrics.request_wire_bytes["create_items"] > 0
+    assert client.default_headers.get("Accept-Encoding") is None
+
+
+@pytest.mark.parametrize("body", ["corrupt", "truncated"])
+def test_undecodable_bodies_raise_connection_error(server_url, body):
+    session = Session()
+    with pytest.raises(ConnectionError, match="Undecodable gzip"):
+        session.request(method="GET", url=f"{server_url}/items/{body}")
+    assert session._pool._idle == {}  # the half-read connection was closed, not pooled
+    session.request(method="GET", url=f"{server_url}/items/gzip")
+    assert len(session._pool._idle[("http", server_url[len("http://"):])]) == 1
+
+    client = GitHubApiClient(token="token", base_url=server_url, max_retries=1, backoff_factor=0.0)
+    with pytest.raises(ApiError) as raised:
+        client._request("GET", f"/items/{body}", operation="list_items")
+    assert raised.value.status_code == 0
+    assert client.metrics.retries["list_items"] == 1
+
+
+@pytest.mark.parametrize("compressed", [zlib.compress(PAYLOAD), zlib.compress(PAYLOAD)[2:-4]])
+def test_deflate_header_is_sniffed_across_one_byte_chunks(compressed):
+    decoder = _Decoder("deflate")
+    content = b"".join(decoder.decompress(compressed[index:index + 1]) for index in range(len(compressed)))
+    assert content + decoder.flush() == PAYLOAD
+
+
+def test_dropped_post_on_a_reused_connection_is_not_resent(server_url):
+    session = Session()
+    session.request(method="POST", url=f"{server_url}/items", json={"n": 1})
+
+    with pytest.raises(ConnectionError):
+        session.request(method="POST", url=f"{server_url}/drop", json={"n": 2})
+
+    assert [body for _, body in _Handler.received] == [b'{"n": 1}', b'{"n": 2}']
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import urllib.request
+from unittest.mock import MagicMock
+
+from github_client import GitHubApiClient
+from github_client.http import Response
+from infra.observability import (
+    CONTENT_TYPE,
+    GitHubClientCollector,
+    Histogram,
+    MetricFamily,
+    MetricsRegistry,
+    MetricsServer,
+    RateLimitedQueueCollector,
+    RequestQueueCollector,
+    render,
+)
+from infra.queue import RateLimitedRequestQueue, RequestOutcome
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+
+def test_render_counter_gauge_and_cumulative_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value)
+    counter = MetricFamily("jobs", "counter", "Jobs run.")
+    counter.add(3, {"host": 'a"b'})
+    latency = MetricFamily("latency_seconds", "histogram", "")
+    latency.add_histogram(histogram, {"host": "a"})
+
+    lines = render([counter, latency]).splitlines()
+
+    assert lines[:3] == ["# TYPE jobs counter", "# HELP jobs Jobs run.", 'jobs_total{host="a\\"b"} 3']
+    assert 'latency_seconds_bucket{host="a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{host="a",le="1.0"} 3' in lines
+    assert 'latency_seconds_bucket{host="a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{host="a"} 4' in lines
+    assert lines[-1] == "# EOF"
+
+
+def test_queue_collectors_publish_per_host_series():
+    async def scenario():
+        limited = RateLimitedRequestQueue(base_backoff_seconds=0.01, jitter_ratio=0.0)
+        await limited.start()
+        alternative = RequestQueue(base_backoff=0.01, randomizer=lambda a, b: 0)
+        attempts = 0
+
+        async def flaky():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                return RequestOutcome(status_code=429, headers={"retry-after": "0.01"})
+            return RequestOutcome(status_code=200, headers={"x-ratelimit-remaining": "41"})
+
+        async def operation():
+            return FakeResponse(status=200, headers={"X-RateLimit-Remaining": "7"})
+
+        await limited.enqueue("api.github.com", flaky)
+        await alternative.enqueue("graph.microsoft.com", operation)
+        await limited.close()
+        await alternative.close()
+        return limited, alternative
+
+    limited, alternative = asyncio.run(scenario())
+    registry = MetricsRegistry()
+    registry.register(RateLimitedQueueCollector(limited))
+    registry.register(RequestQueueCollector(alternative))
+    text = registry.render()
+
+    assert 'rate_limited_queue_backoff_events_total{host="api.github.com"} 1' in text
+    assert 'rate_limited_queue_retries_total{host="api.github.com"} 1' in text
+    assert 'rate_limited_queue_completed_total{host="api.github.com"} 1' in text
+    assert 'rate_limited_queue_rate_limit_remaining{host="api.github.com"} 41.0' in text
+    assert 'rate_limited_queue_service_seconds_count{host="api.github.com"} 2' in text
+    assert 'rate_limited_queue_depth{host="api.github.com"} 0' in text
+    assert 'request_queue_completed_total{host="graph.microsoft.com"} 1' in text
+    assert 'request_queue_rate_limit_remaining{host="graph.microsoft.com"} 7.0' in text
+
+
+def test_metrics_server_exposes_github_client_metrics():
+    session = MagicMock()
+    session.request.return_value = Response(
+        status_code=200,
+        reason="OK",
+        content=json.dumps({"id": 1}).encode(),
+        headers={"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "4999"},
+    )
+    client = GitHubApiClient(token="token", session=session)
+    client.get_repository("octocat", "demo")
+
+    registry = MetricsRegistry()
+    registry.register(GitHubClientCollector(client))
+    with MetricsServer(registry, port=0) as server:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as resp:
+            content_type = resp.headers["Content-Type"]
+            body = resp.read().decode()
+
+    assert content_type == CONTENT_TYPE
+    assert 'github_client_requests_total{host="api.github.com",operation="get_repository"} 1' in body
+    assert 'github_client_rate_limit_remaining{host="api.github.com"} 4999' in body
+    assert 'github_client_response_bytes_total{host="api.github.com",operation="get_repository",kind="wire"} 9' in body
+    assert body.endswith("# EOF\n")
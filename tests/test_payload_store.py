@@ -0,0 +1,127 @@
+import asyncio
+import gc
+import json
+import random
+import threading
+
+import pytest
+
+from infra.payloads import PayloadReference, PayloadStore
+from infra.payloads.store import _json_size_exceeds
+from infra.queue import RateLimitedRequestQueue, RequestOutcome
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+
+def test_offload_keeps_small_payloads_and_dedups_large_ones(tmp_path):
+    store = PayloadStore(tmp_path, threshold_bytes=16)
+    body = b"x" * 1024
+
+    assert store.offload(b"small") == b"small"
+    assert store.offload({"ok": True}) == {"ok": True}
+    first, second = store.offload(body), store.offload(bytearray(body))
+
+    assert isinstance(first, PayloadReference)
+    assert first.uri == second.uri and first.uri.startswith("sha256:")
+    assert store.references(first.digest) == 2
+    assert (store.metrics.offloaded, store.metrics.deduplicated, store.metrics.bytes_written) == (2, 1, 1024)
+    assert len(list(tmp_path.glob("??/*"))) == 1
+
+
+def test_references_load_lazily_with_original_type(tmp_path):
+    store = PayloadStore(tmp_path, threshold_bytes=8)
+    document = {"items": list(range(100))}
+    reference = store.offload(document)
+    text = store.offload("é" * 20)
+
+    with reference.view() as view:
+        assert bytes(view[:9]) == b'{"items":'
+    assert reference.load() == document
+    assert text.kind == "text" and text.load() == "é" * 20
+    assert store.open(reference.uri, kind="json").load() == document
+
+
+def test_collect_removes_blobs_once_every_reference_is_released(tmp_path):
+    store = PayloadStore(tmp_path, threshold_bytes=0)
+    kept = store.put(b"kept")
+    released = store.put(b"released")
+    dropped = store.put(b"dropped")
+    recorded_uri = released.uri
+
+    released.release()
+    released.release()  # idempotent
+    del dropped
+    gc.collect()
+
+    assert store.collect(keep=[recorded_uri]) == 1
+    assert store.collect() == 1
+    assert kept.load() == b"kept"
+    with pytest.raises(FileNotFoundError):
+        store.open(recorded_uri)
+    with pytest.raises(RuntimeError):
+        released.view()
+
+
+def test_queues_swap_large_payloads_for_references(tmp_path):
+    store = PayloadStore(tmp_path, threshold_bytes=64)
+    big = {"rows": ["r" * 10] * 20}
+
+    async def scenario():
+        limited = RateLimitedRequestQueue(payload_store=store)
+        await limited.start()
+        alternative = RequestQueue(payload_store=store)
+
+        async def limited_call():
+            return RequestOutcome(200, payload=big)
+
+        async def alternative_call():
+            return FakeResponse(200, payload=b"small")
+
+        results = await limited.enqueue("api", limited_call), await alternative.enqueue("api", alternative_call)
+        await limited.close()
+        await alternative.close()
+        return results
+
+    outcome, response = asyncio.run(scenario())
+    assert isinstance(outcome.payload, PayloadReference)
+    assert outcome.payload.load() == big
+    assert response.payload == b"small"
+
+
+def test_size_bound_never_misses_a_large_payload():
+    rng = random.Random(3)
+    atoms = [None, True, -(10**30), 7, 2.5e-308, "plain", "quote\"\n\x01", "é✓", "\U0001F600" * 3]
+
+    def build(depth):
+        if depth == 0 or rng.random() < 0.3:
+            return rng.choice(atoms)
+        if rng.random() < 0.5:
+            return [build(depth - 1) for _ in range(rng.randrange(5))]
+        return {str(rng.random()): build(depth - 1) for _ in range(rng.randrange(5))}
+
+    for _ in range(500):
+        payload = build(4)
+        size = len(json.dumps(payload, separators=(",", ":")).encode())
+        limit = rng.randrange(1, 400)
+        if size > limit:
+            assert _json_size_exceeds(payload, limit)
+
+
+def test_small_json_is_not_serialized_and_large_is_written_off_the_loop(tmp_path, monkeypatch):
+    store = PayloadStore(tmp_path, threshold_bytes=4096)
+    small = {"id": 1, "name": "demo", "topics": ["a", "b"], "private": False}
+    large = {"rows": ["r" * 100] * 100}
+    writers = []
+    write = store._write
+    monkeypatch.setattr(store, "_write", lambda path, data: (writers.append(threading.get_ident()), write(path, data)))
+
+    async def scenario():
+        return await store.offload_async(small), await store.offload_async(large)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(json, "dumps", lambda *args, **kwargs: pytest.fail("small payload was serialized"))
+        assert store.offload(small) is small
+    kept, reference = asyncio.run(scenario())
+
+    assert kept is small
+    assert isinstance(reference, PayloadReference) and reference.load() == large
+    assert writers and threading.get_ident() not in writers
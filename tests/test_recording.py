@@ -0,0 +1,101 @@
+import gzip
+import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from github_client import GitHubApiClient
+from github_client.recording import RecordingSession, ReplayMiss, ReplaySession, read_exchanges
+
+REPOS = [{"id": index, "name": f"repo-{index}"} for index in range(150)]
+
+
+def _raw_deflate(data):
+    compressor = zlib.compressobj(1, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _GitHub(BaseHTTPRequestHandler):
+    def do_GET(self):
+        page = int(parse_qs(urlsplit(self.path).query).get("page", ["1"])[0])
+        body = json.dumps(REPOS[(page - 1) * 100:page * 100]).encode()
+        encoding = "deflate" if "deflate" in self.path else "gzip"
+        body = _raw_deflate(body) if encoding == "deflate" else gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("content-encoding" if "lower" in self.path else "Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GitHub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_recorded_pagination_replays_offline(tmp_path, base_url):
+    path = str(tmp_path / "listing.ghrec")
+    with RecordingSession(path) as session:
+        live = list(GitHubApiClient(token="t", base_url=base_url, session=session).paginate("/orgs/o/repos"))
+
+    exchanges = list(read_exchanges(path))
+    assert [exchange.params["page"] for exchange in exchanges] == [1, 2, 3]
+    assert exchanges[0].body_encoding == "gzip" and exchanges[0].elapsed_seconds > 0
+
+    delays = []
+    replay = ReplaySession(exchanges, latency_scale=0.5, sleep=delays.append)
+    client = GitHubApiClient(token="t", base_url=base_url, session=replay)
+    assert list(client.paginate("/orgs/o/repos")) == live == REPOS
+    assert delays == [exchange.elapsed_seconds * 0.5 for exchange in exchanges]
+    assert client.metrics.response_wire_bytes["paginate"] < client.metrics.response_decoded_bytes["paginate"]
+
+
+def test_replay_serves_repeats_in_order_and_reports_misses(tmp_path, base_url):
+    path = str(tmp_path / "repeat.ghrec")
+    with RecordingSession(path) as session:
+        for _ in range(2):
+            session.request(method="GET", url=f"{base_url}/orgs/o/repos", params={"page": 2})
+
+    strict = ReplaySession.from_file(path, latency_scale=0, cycle=False)
+    for _ in range(2):
+        assert len(strict.request(method="GET", url=f"{base_url}/orgs/o/repos", params={"page": 2}).json()) == 50
+    with pytest.raises(ReplayMiss):
+        strict.request(method="GET", url=f"{base_url}/orgs/o/repos", params={"page": 2})
+    with pytest.raises(ReplayMiss):
+        strict.request(method="GET", url=f"{base_url}/orgs/o/repos", params={"page": 9})
+
+
+def test_lowercase_content_encoding_is_recorded_compressed(tmp_path, base_url):
+    path = str(tmp_path / "lower.ghrec")
+    with RecordingSession(path) as session:
+        live = session.request(method="GET", url=f"{base_url}/lower/repos")
+
+    (exchange,) = read_exchanges(path)
+    replayed = ReplaySession([exchange], latency_scale=0).request(method="GET", url=f"{base_url}/lower/repos")
+    assert exchange.body_encoding == "gzip"
+    assert replayed.content == live.content
+    assert replayed.wire_bytes == live.wire_bytes < len(live.content)
+
+
+def test_deflate_body_is_recorded_and_replayed_as_received(tmp_path, base_url):
+    path = str(tmp_path / "deflate.ghrec")
+    with RecordingSession(path) as session:
+        live = session.request(method="GET", url=f"{base_url}/deflate/repos")
+
+    (exchange,) = read_exchanges(path)
+    replayed = ReplaySession([exchange], latency_scale=0).request(method="GET", url=f"{base_url}/deflate/repos")
+    assert exchange.body_encoding == "deflate"
+    assert exchange.body == _raw_deflate(json.dumps(REPOS[:100]).encode())
+    assert replayed.content == live.content
+    assert replayed.wire_bytes == live.wire_bytes == len(exchange.body)
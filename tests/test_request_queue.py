@@ -9,7 +9,7 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from infra.queue import RateLimitedRequestQueue, RequestOutcome
+from infra.queue import DeadlineExceeded, RateLimitedRequestQueue, RequestOutcome
 
 
 def test_serializes_requests_by_host():
@@ -92,11 +92,65 @@ def test_metrics_capture_queue_depth_and_wait_times():
     assert metrics.total_enqueued == 2
     assert metrics.queue_depth == 0
     assert metrics.average_wait_time > 0
+
+
+def test_expired_request_is_not_dispatched_after_backoff():
+    async def scenario():
+        queue = RateLimitedRequestQueue(max_workers=1, base_backoff_seconds=0.1, jitter_ratio=0.0)
+        await queue.start()
+
+        calls = []
+
+        async def limited():
+            calls.append("limited")
+            return RequestOutcome(status_code=429, headers={"retry-after": "0.5"})
+
+        async def late():
+            calls.append("late")
+            return RequestOutcome(status_code=200, headers={})
+
+        first = asyncio.create_task(queue.enqueue("api.github.com", limited, deadline=time.monotonic() + 0.2))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(queue.enqueue("api.github.com", late, deadline=time.monotonic() + 0.2))
+        results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), timeout=1)
+        await queue.close()
+        return calls, results, queue.metrics
+
+    calls, results, metrics = asyncio.run(scenario())
+
+    assert calls == ["limited"]
+    assert all(isinstance(result, DeadlineExceeded) for result in results)
+    assert metrics.expired_by_host == {"api.github.com": 2}
+
+
+def test_lower_priority_value_is_dispatched_first():
+    async def scenario():
+        queue = RateLimitedRequestQueue(max_workers=1)
+        order = []
+
+        def make(name: str):
+            async def request():
+                order.append(name)
+                return RequestOutcome(status_code=200, headers={})
+
+            return request
+
+        tasks = [
+            asyncio.create_task(queue.enqueue("alpha", make("bulk"), priority=5)),
+            asyncio.create_task(queue.enqueue("alpha", make("urgent"), priority=0)),
+        ]
+        await asyncio.sleep(0)
+        await queue.start()
+        await asyncio.gather(*tasks)
+        await queue.close()
+        return order
+
+    assert asyncio.run(scenario()) == ["urgent", "bulk"]
 import time
 
 import pytest
 
-from infra.queue.request_queue import FakeResponse, QueueMetrics, RateLimitExceeded, RequestQueue
+from infra.queue.request_queue import DeadlineExceeded, FakeResponse, QueueMetrics, RateLimitExceeded, RequestQueue
 
 
 def test_serializes_requests_per_host():
@@ -207,3 +261,28 @@ async def _test_metrics_capture_wait_time_and_depth():
     assert depths == 0
     assert len(waits) == 3
     assert any(wait > 0 for wait in waits)
+
+
+def test_request_queue_rejects_work_that_cannot_start_before_deadline():
+    asyncio.run(_test_request_queue_rejects_work_that_cannot_start_before_deadline())
+
+
+async def _test_request_queue_rejects_work_that_cannot_start_before_deadline():
+    metrics = QueueMetrics()
+    queue = RequestQueue(metrics=metrics, base_backoff=0.01, jitter=0, randomizer=lambda a, b: 0)
+    calls = 0
+
+    async def rate_limited():
+        nonlocal calls
+        calls += 1
+        return FakeResponse(status=429, headers={"Retry-After": "0.5"})
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        await queue.enqueue("api.github.com", rate_limited, deadline=start + 0.1)
+    elapsed = time.monotonic() - start
+    await queue.close()
+
+    assert calls == 1
+    assert elapsed < 0.1
+    assert metrics.expired["api.github.com"] == 1
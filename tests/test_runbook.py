@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from infra.runbook import RunbookExecutor, RunbookValidationError, build_dependencies
+from scripts.validate_runbook import validate_runbook
+
+
+def _runbook(steps, **fields):
+    runbook = {"schemaVersion": "1.1", "runbookId": "rb-test", "scopes": ["Mail.Send"], "steps": steps}
+    runbook.update(fields)
+    return runbook
+
+
+def _step(step_id, depends_on=None, **fields):
+    step = {"id": step_id, "name": step_id, "action": "noop"}
+    if depends_on is not None:
+        step["dependsOn"] = depends_on
+    step.update(fields)
+    return step
+
+
+def test_steps_without_depends_on_keep_list_order():
+    runbook = _runbook([_step("a"), _step("b"), _step("c", [])], schemaVersion="1.1")
+    assert build_dependencies(runbook) == {"a": [], "b": ["a"], "c": []}
+
+
+@pytest.mark.parametrize(
+    "steps, version, message",
+    [
+        ([_step("a", ["c"]), _step("b", ["a"]), _step("c", ["b"])], "1.1", "cycle"),
+        ([_step("a", ["missing"])], "1.1", "unknown"),
+        ([_step("a", ["a"])], "1.1", "itself"),
+        ([_step("a"), _step("a")], "1.1", "Duplicate"),
+        ([_step("a", [])], "1.0", "schemaVersion 1.1"),
+    ],
+)
+def test_invalid_graphs_are_rejected(steps, version, message):
+    with pytest.raises(RunbookValidationError, match=message):
+        build_dependencies(_runbook(steps, schemaVersion=version))
+
+
+def test_validator_script_reports_cycles(tmp_path, capsys):
+    path = tmp_path / "runbook.json"
+    path.write_text(
+        '{"schemaVersion": "1.1", "runbookId": "rb", "scopes": [], "steps": ['
+        '{"id": "a", "name": "a", "action": "x", "dependsOn": ["b"]},'
+        '{"id": "b", "name": "b", "action": "x", "dependsOn": ["a"]}]}'
+    )
+    assert validate_runbook(str(path)) == 1
+    assert "cycle" in capsys.readouterr().out
+
+
+def test_independent_steps_run_concurrently_within_scope_limits():
+    running = {"all": 0, "Mail.Send": 0}
+    peaks = {"all": 0, "Mail.Send": 0}
+
+    async def run_step(step):
+        scoped = "Mail.Send" in step.get("scopes", ["Mail.Send"])
+        for key in ("all", "Mail.Send") if scoped else ("all",):
+            running[key] += 1
+            peaks[key] = max(peaks[key], running[key])
+        await asyncio.sleep(0.01)
+        for key in ("all", "Mail.Send") if scoped else ("all",):
+            running[key] -= 1
+
+    fan_out = [_step(f"s{index}", ["root"]) for index in range(6)]
+    unscoped = [_step(f"u{index}", ["root"], scopes=[]) for index in range(4)]
+    runbook = _runbook([_step("root", [])] + fan_out + unscoped + [_step("sink", [s["id"] for s in fan_out])])
+    executor = RunbookExecutor(run_step, scope_limits={"Mail.Send": 2})
+
+    result = asyncio.run(executor.run(runbook))
+
+    assert result.status == "Completed"
+    assert peaks["Mail.Send"] == 2
+    assert peaks["all"] > 2
+    assert result.steps["sink"].started_at >= max(result.steps[s["id"]].completed_at for s in fan_out)
+
+
+def test_failure_stops_scheduling_and_rolls_back_in_reverse():
+    rolled_back = []
+
+    async def run_step(step):
+        if step["id"] == "c":
+            raise RuntimeError("boom")
+
+    async def rollback_step(step):
+        rolled_back.append(step["id"])
+
+    runbook = _runbook([_step("a"), _step("b"), _step("c"), _step("d")], rollbackPolicy="reverse")
+    result = asyncio.run(RunbookExecutor(run_step, rollback_step=rollback_step).run(runbook))
+
+    assert result.status == "Failed"
+    assert [result.steps[s].status for s in "abcd"] == ["Completed", "Completed", "Failed", "Cancelled"]
+    assert rolled_back == ["b", "a"] == result.rolled_back
+
+
+def test_transient_policy_retries_failed_steps():
+    calls = {"flaky": 0}
+
+    async def run_step(step):
+        calls[step["id"]] = calls.get(step["id"], 0) + 1
+        if step["id"] == "flaky" and calls["flaky"] < 3:
+            raise ConnectionError("reset")
+
+    runbook = _runbook([_step("flaky", []), _step("after", ["flaky"])], failurePolicy="transient")
+    executor = RunbookExecutor(run_step, retry_attempts=3, retry_backoff_seconds=0.001)
+    result = asyncio.run(executor.run(runbook))
+
+    assert result.status == "Completed"
+    assert result.steps["flaky"].attempts == 3
+    assert calls["after"] == 1
+
+
+@pytest.mark.parametrize("fields", [{"failurePolicy": "escalate"}, {"rollbackPolicy": "snapshot"}])
+def test_unknown_policies_are_rejected_at_run_time(fields):
+    async def run_step(step):
+        return None
+
+    with pytest.raises(RunbookValidationError, match="Unsupported"):
+        asyncio.run(RunbookExecutor(run_step).run(_runbook([_step("a")], **fields)))
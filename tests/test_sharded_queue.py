@@ -0,0 +1,116 @@
+import asyncio
+import os
+import signal
+import threading
+
+from infra.queue import RequestOutcome
+from infra.queue.sharded import ConsistentHashRing, ShardedRequestQueue
+
+
+async def report_pid(host: str, payload):
+    if payload == "slow":
+        await asyncio.sleep(0.5)
+    return RequestOutcome(status_code=200, headers={}, payload={"pid": os.getpid(), "host": host})
+
+
+def test_ring_only_moves_keys_owned_by_removed_node():
+    ring = ConsistentHashRing(range(4))
+    keys = [f"tenant-{index}.example.com" for index in range(2000)]
+    before = {key: ring.node_for(key) for key in keys}
+
+    ring.remove(2)
+    after = {key: ring.node_for(key) for key in keys}
+
+    moved = [key for key in keys if before[key] != after[key]]
+    assert moved and all(before[key] == 2 for key in moved)
+    assert set(before.values()) == {0, 1, 2, 3}
+    assert 2 not in set(after.values())
+
+
+def test_hosts_are_pinned_to_one_shard_process():
+    async def scenario():
+        queue = ShardedRequestQueue(report_pid, shards=2)
+        await queue.start()
+        hosts = [f"host-{index}" for index in range(8)] * 3
+        outcomes = await asyncio.gather(*(queue.enqueue(host) for host in hosts))
+        await queue.close()
+        return queue, outcomes
+
+    queue, outcomes = asyncio.run(scenario())
+
+    pids_by_host = {}
+    for outcome in outcomes:
+        pids_by_host.setdefault(outcome.payload["host"], set()).add(outcome.payload["pid"])
+    assert all(len(pids) == 1 for pids in pids_by_host.values())
+    assert len({pid for pids in pids_by_host.values() for pid in pids}) == 2
+    assert queue.metrics.completed == len(outcomes)
+
+
+def _kill_shard_mid_request(max_restarts):
+    async def scenario():
+        queue = ShardedRequestQueue(report_pid, shards=2, max_restarts=max_restarts)
+        await queue.start()
+        host = "victim.example.com"
+        doomed = queue.shard_for(host)
+        doomed_pid = queue._shards[doomed].process.pid
+        pending = asyncio.create_task(queue.enqueue(host, "slow"))
+        await asyncio.sleep(0.2)
+        os.kill(doomed_pid, signal.SIGKILL)
+        outcome = await asyncio.wait_for(pending, timeout=10)
+        owner = queue.shard_for(host)
+        live = queue.live_shards
+        await queue.close()
+        return queue, doomed, doomed_pid, owner, live, outcome
+
+    return asyncio.run(scenario())
+
+
+def test_dead_shard_is_restarted_and_its_requests_redispatched():
+    queue, doomed, doomed_pid, owner, live, outcome = _kill_shard_mid_request(max_restarts=3)
+
+    assert outcome.status_code == 200
+    assert outcome.payload["pid"] != doomed_pid
+    assert owner == doomed and live == [0, 1]
+    assert queue.metrics.shard_deaths == 1
+    assert queue.metrics.shard_restarts == 1
+    assert queue.metrics.redispatched == 1
+
+
+def test_shard_out_of_restarts_hands_its_hosts_to_survivors():
+    queue, doomed, doomed_pid, owner, live, outcome = _kill_shard_mid_request(max_restarts=0)
+
+    assert outcome.status_code == 200
+    assert outcome.payload["pid"] != doomed_pid
+    assert owner != doomed and live == [owner]
+    assert queue.metrics.shard_deaths == 1
+    assert queue.metrics.shard_restarts == 0
+    assert queue.metrics.redispatched == 1
+
+
+async def echo(host: str, payload):
+    return RequestOutcome(status_code=200, headers={}, payload=payload)
+
+
+def test_large_batches_both_ways_do_not_deadlock_the_pipes():
+    # Requests and results are each far larger than a pipe buffer, so a blocking send on
+    # either side would stall until the other side reads, which it never would.
+    blob = b"x" * 64 * 1024
+    results = []
+
+    async def scenario():
+        queue = ShardedRequestQueue(echo, shards=1)
+        await queue.start()
+        calls = []
+        for _ in range(100):
+            calls.extend(asyncio.ensure_future(queue.enqueue("bulk.example.com", blob)) for _ in range(20))
+            await asyncio.sleep(0)
+        outcomes = await asyncio.gather(*calls)
+        await queue.close()
+        results.extend(outcomes)
+
+    runner = threading.Thread(target=asyncio.run, args=(scenario(),), daemon=True)
+    runner.start()
+    runner.join(30)
+
+    assert not runner.is_alive(), "parent and shard deadlocked on their pipes"
+    assert len(results) == 2000 and all(outcome.payload == blob for outcome in results)
@@ -0,0 +1,111 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from infra.queue import RateLimitedRequestQueue, RequestOutcome, SharedBackoffStore
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+
+def _record_backoff(path: str, host: str, seconds: float) -> None:
+    with SharedBackoffStore(path) as store:
+        store.extend(host, time.time() + seconds)
+        store.record_remaining(host, 0)
+
+
+def test_backoff_written_by_another_process_is_visible(tmp_path):
+    path = str(tmp_path / "backoff.bin")
+    with SharedBackoffStore(path, slots=64) as store:
+        assert store.is_eligible("api.github.com")
+
+        process = multiprocessing.get_context("spawn").Process(target=_record_backoff, args=(path, "api.github.com", 30))
+        process.start()
+        process.join(10)
+
+        assert process.exitcode == 0
+        assert not store.is_eligible("api.github.com")
+        assert store.delay_for("api.github.com") == pytest.approx(30, abs=5)
+        assert store.remaining("api.github.com") == 0
+        assert store.is_eligible("graph.microsoft.com")
+
+
+def test_extend_merges_to_latest_deadline(tmp_path):
+    with SharedBackoffStore(str(tmp_path / "backoff.bin"), slots=8) as store:
+        now = time.time()
+        store.extend("api.github.com", now + 10)
+        assert store.extend("api.github.com", now + 2) == now + 10
+        assert store.extend("api.github.com", now + 20) == now + 20
+        for index in range(32):
+            store.extend(f"tenant-{index}", now - 1)
+        assert store.eligible_at("api.github.com") == now + 20
+
+
+
+def test_full_table_never_evicts_an_active_backoff(tmp_path):
+    with SharedBackoffStore(str(tmp_path / "backoff.bin"), slots=4) as store:
+        now = time.time()
+        for index in range(4):
+            store.extend(f"paused-{index}", now + 60)
+        store.extend("late-comer", now + 60)
+        store.record_remaining("late-comer", 0)
+
+        assert all(store.delay_for(f"paused-{index}") > 50 for index in range(4))
+        assert store.is_eligible("late-comer") and store.remaining("late-comer") is None
+        assert store.dropped_writes == 2
+
+
+    with SharedBackoffStore(str(tmp_path / "expired.bin"), slots=4) as store:
+        now = time.time()
+        for index in range(4):
+            store.extend(f"paused-{index}", now - 1)
+        store.extend("late-comer", now + 60)
+
+        assert store.delay_for("late-comer") > 50
+        assert store.dropped_writes == 0
+
+
+def test_record_remaining_skips_writes_while_budget_is_plentiful(tmp_path, monkeypatch):
+    with SharedBackoffStore(str(tmp_path / "backoff.bin"), slots=8, remaining_threshold=100) as store:
+        writes = []
+        write = store._write
+        monkeypatch.setattr(store, "_write", lambda *args: writes.append(args) or write(*args))
+
+        store.record_remaining("api.github.com", 4000)
+        assert writes == [] and store.remaining("api.github.com") is None
+
+        store.record_remaining("api.github.com", 20)
+        store.record_remaining("api.github.com", 4000)  # replaces a low budget
+        store.record_remaining("api.github.com", 3999)
+        assert len(writes) == 2 and store.remaining("api.github.com") == 4000
+
+        store.extend("api.github.com", time.time() + 30)
+        store.record_remaining("api.github.com", 3998)  # backing off: always recorded
+        assert store.remaining("api.github.com") == 3998
+
+
+def test_replica_queues_share_a_rate_limit_backoff(tmp_path):
+    path = str(tmp_path / "backoff.bin")
+
+    async def scenario():
+        first = RateLimitedRequestQueue(shared_backoff=SharedBackoffStore(path), jitter_ratio=0.0)
+        second = RequestQueue(shared_backoff=SharedBackoffStore(path), randomizer=lambda a, b: 0)
+        await first.start()
+
+        async def limited():
+            return RequestOutcome(status_code=429, headers={"retry-after": "0.3"})
+
+        async def ok():
+            return FakeResponse(status=200)
+
+        limited_task = asyncio.create_task(first.enqueue("api.github.com", limited, deadline=time.monotonic() + 0.1))
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        await second.enqueue("api.github.com", ok)
+        waited = time.monotonic() - start
+        await asyncio.gather(limited_task, return_exceptions=True)
+        await first.close()
+        await second.close()
+        return waited
+
+    assert asyncio.run(scenario()) >= 0.2
@@ -0,0 +1,93 @@
+import pytest
+
+from infra.workflow import RUN_STEP, WorkflowInstanceStore, WorkflowRecord
+
+
+def _record(instance, step, status, started, **fields):
+    return WorkflowRecord(instance, step, status, correlation_id=f"corr-{instance}", timestamp_started=started, **fields)
+
+
+def test_duplicate_idempotency_keys_are_stored_once():
+    with WorkflowInstanceStore(batch_size=2) as store:
+        stored = store.ingest(
+            [
+                _record("wf-1", "A01", "Completed", 10.0, idempotency_key="wf-1:A01"),
+                _record("wf-1", "A01", "Completed", 10.0, idempotency_key="wf-1:A01"),
+                _record("wf-1", "A02", "InProgress", 20.0, idempotency_key="wf-1:A02"),
+            ]
+        )
+        assert stored == 2
+        assert not store.append(_record("wf-1", "A02", "InProgress", 20.0, idempotency_key="wf-1:A02"))
+        assert store.by_idempotency_key("wf-1:A02").step_id == "A02"
+        assert store.by_idempotency_key("missing") is None
+        assert [record.step_id for record in store.by_correlation_id("corr-wf-1")] == ["A01", "A02"]
+
+
+def test_instance_state_tracks_latest_update_across_batches():
+    with WorkflowInstanceStore(batch_size=1) as store:
+        store.ingest(
+            [
+                _record("wf-1", "A02", "InProgress", 20.0),
+                _record("wf-1", "A01", "Completed", 10.0),  # late arrival of an older step
+                _record("wf-2", "A01", "Pending", 5.0),
+            ]
+        )
+        assert store.instance("wf-1").step_id == "A02"
+        assert store.instance("wf-1").status == "InProgress"
+        assert store.count() == 3
+
+
+def test_stuck_instances_reads_the_progress_index():
+    with WorkflowInstanceStore() as store:
+        store.ingest(
+            [
+                _record("old-pending", "A01", "Pending", 100.0),
+                _record("old-running", "A02", "InProgress", 200.0),
+                _record("recent", "A02", "InProgress", 950.0),
+                _record("old-done", "A03", "Completed", 50.0, timestamp_completed=60.0),
+                _record("old-done", RUN_STEP, "Completed", 10.0, timestamp_completed=61.0),
+                _record("stalled", "A03", "Completed", 150.0, timestamp_completed=160.0),
+            ]
+        )
+        stuck = store.stuck_instances(300, now=1000.0)
+        assert [state.workflow_instance_id for state in stuck] == ["old-pending", "stalled", "old-running"]
+        assert store.instance("stalled").step_status == "Completed"
+        assert store.instance("old-done").status == "Completed"
+        assert len(store.stuck_instances(300, now=1000.0, limit=1)) == 1
+
+        sql, params = store._stuck_query(700.0, ("Pending", "InProgress"), None)
+        plan = " ".join(row[-1] for row in store._conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+        assert "USING INDEX workflow_instances_progress" in plan
+        assert "SCAN" not in plan.replace("SCAN CONSTANT", "")
+
+
+def test_unknown_status_rejects_the_batch():
+    with WorkflowInstanceStore() as store:
+        with pytest.raises(ValueError):
+            store.ingest([_record("wf-1", "A01", "Pending", 1.0), _record("wf-1", "A02", "Stuck", 2.0)])
+        assert store.count() == 0
+
+
+def test_replayed_duplicates_do_not_refresh_instance_progress():
+    with WorkflowInstanceStore() as store:
+        store.append(_record("wf-1", "A01", "InProgress", 100.0, idempotency_key="wf-1:A01"), now=100.0)
+        # A retried message without timestamps would otherwise count as progress at receipt time.
+        retry = WorkflowRecord("wf-1", "A01", "InProgress", idempotency_key="wf-1:A01")
+        assert store.ingest([retry, retry], now=900.0) == 0
+
+        assert store.instance("wf-1").updated_at == 100.0
+        assert [state.workflow_instance_id for state in store.stuck_instances(300, now=1000.0)] == ["wf-1"]
+
+
+def test_finished_run_ignores_late_step_records():
+    with WorkflowInstanceStore(batch_size=1) as store:
+        store.ingest(
+            [
+                _record("wf-1", "A01", "InProgress", 10.0),
+                _record("wf-1", RUN_STEP, "Failed", 20.0),
+                _record("wf-1", "A02", "InProgress", 30.0),  # a straggler after the run was failed
+            ]
+        )
+        state = store.instance("wf-1")
+        assert (state.status, state.step_id, state.step_status, state.updated_at) == ("Failed", "A02", "InProgress", 30.0)
+        assert store.stuck_instances(0, now=1000.0) == []
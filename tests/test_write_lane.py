@@ -0,0 +1,295 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from github_client import GitHubApiClient
+from infra.queue import RateLimitedRequestQueue, RequestOutcome, lane_key
+from infra.queue.request_queue import FakeResponse, RequestQueue
+
+MIN_WRITE_GAP = 0.1
+PENALTY = 0.4
+
+
+class SecondaryLimiter:
+    """GitHub-style secondary limit: a write that overlaps another, or starts within
+    ``MIN_WRITE_GAP`` of the previous one, trips a ``PENALTY`` during which every
+    write is refused. Reads are never limited."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.writes_in_flight = 0
+        self.last_write = None
+        self.blocked_until = 0.0
+        self.log = []  # (started, kind, status)
+
+    def begin_write(self):
+        """Returns the Retry-After to refuse the write with, else None."""
+        now = time.monotonic()
+        with self.lock:
+            too_soon = self.last_write is not None and now - self.last_write < MIN_WRITE_GAP
+            if now < self.blocked_until or self.writes_in_flight or too_soon:
+                self.blocked_until = max(self.blocked_until, now + PENALTY)
+                self.log.append((now, "write", 403))
+                return PENALTY
+            self.writes_in_flight += 1
+            self.last_write = now
+            self.log.append((now, "write", 201))
+            return None
+
+    def end_write(self):
+        with self.lock:
+            self.writes_in_flight -= 1
+
+    def record_read(self):
+        with self.lock:
+            self.log.append((time.monotonic(), "read", 200))
+
+    def entries(self, kind, status=None):
+        return [at for at, logged, code in self.log if logged == kind and (status is None or code == status)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    limiter = SecondaryLimiter()
+
+    def do_GET(self):
+        self.limiter.record_read()
+        time.sleep(0.02)
+        self._reply(200, {"full_name": "acme/app"})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        retry_after = self.limiter.begin_write()
+        if retry_after is not None:
+            message = "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."
+            self._reply(403, {"message": message}, {"Retry-After": str(retry_after)})
+            return
+        try:
+            time.sleep(0.02)
+            self._reply(201, {"id": 1})
+        finally:
+            self.limiter.end_write()
+
+    def _reply(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_github():
+    _Handler.limiter = SecondaryLimiter()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", _Handler.limiter
+    server.shutdown()
+    server.server_close()
+
+
+def _comment(client, index):
+    return client._request(
+        "POST", "/repos/acme/app/issues/1/comments", json_body={"body": f"comment {index}"}, operation="create_comment"
+    )
+
+
+def _read(client, index):
+    return client.get_repository("acme", "app")
+
+
+def test_paced_write_lane_stays_under_secondary_limit(fake_github):
+    url, limiter = fake_github
+    client = GitHubApiClient(token="token", base_url=url, write_spacing_seconds=MIN_WRITE_GAP * 1.5)
+    calls = [(_comment, index) for index in range(5)] + [(_read, index) for index in range(20)]
+
+    results = list(client.map(lambda call: call[0](client, call[1]), calls, max_workers=8, ordered=False))
+
+    assert len(results) == 25
+    writes = limiter.entries("write")
+    assert limiter.entries("write", 403) == []
+    assert all(later - earlier >= MIN_WRITE_GAP for earlier, later in zip(writes, writes[1:]))
+    # Reads ran alongside the paced writes instead of waiting behind them.
+    assert limiter.entries("read")[-1] < writes[-1]
+
+
+def test_secondary_limit_on_writes_does_not_pause_reads(fake_github):
+    url, limiter = fake_github
+    client = GitHubApiClient(token="token", base_url=url, write_spacing_seconds=0.0, backoff_factor=0.05)
+
+    writer = threading.Thread(target=lambda: [_comment(client, index) for index in range(3)])
+    writer.start()
+    time.sleep(0.1)
+    read_started = time.monotonic()
+    for index in range(5):
+        _read(client, index)
+    read_elapsed = time.monotonic() - read_started
+    writer.join()
+
+    refused = limiter.entries("write", 403)
+    assert refused, "unpaced writes should trip the secondary limit"
+    assert client.metrics.requests["create_comment"] == 3 + len(refused)
+    assert len(limiter.entries("write", 201)) == 3
+    assert read_elapsed < PENALTY
+    assert any(refused[0] < at < refused[0] + PENALTY for at in limiter.entries("read"))
+
+
+def test_queue_write_lane_is_serialized_spaced_and_backs_off_alone():
+    async def scenario():
+        queue = RateLimitedRequestQueue(
+            max_workers=4, per_host_limit=4, base_backoff_seconds=0.05, jitter_ratio=0.0, write_spacing_seconds=0.05
+        )
+        await queue.start()
+        writes = []
+        write_backoff_seen = []
+        reads_in_flight = 0
+        max_reads = 0
+
+        async def write():
+            writes.append(time.monotonic())
+            await asyncio.sleep(0.01)
+            if len(writes) == 1:
+                return RequestOutcome(status_code=403, headers={"Retry-After": "0.2"})
+            return RequestOutcome(status_code=201)
+
+        async def read():
+            nonlocal reads_in_flight, max_reads
+            reads_in_flight += 1
+            max_reads = max(max_reads, reads_in_flight)
+            write_backoff_seen.append(queue.backoff_remaining(lane_key("api.github.com", "POST")))
+            await asyncio.sleep(0.02)
+            reads_in_flight -= 1
+            return RequestOutcome(status_code=200)
+
+        outcomes = await asyncio.gather(
+            *(queue.enqueue("api.github.com", write, method="POST") for _ in range(3)),
+            *(queue.enqueue("api.github.com", read) for _ in range(8)),
+        )
+        read_backoff = queue.backoff_remaining("api.github.com")
+        await queue.close()
+        return outcomes, writes, write_backoff_seen, max_reads, read_backoff
+
+    outcomes, writes, write_backoff_seen, max_reads, read_backoff = asyncio.run(scenario())
+
+    assert [outcome.status_code for outcome in outcomes] == [201] * 3 + [200] * 8
+    assert len(writes) == 4  # one refused attempt, retried after its Retry-After
+    assert writes[1] - writes[0] >= 0.2
+    assert all(later - earlier >= 0.05 for earlier, later in zip(writes, writes[1:]))
+    assert max(write_backoff_seen) > 0  # reads ran while the write lane was backing off
+    assert max_reads > 1
+    assert read_backoff == 0.0
+
+
+def test_request_queue_runs_writes_in_a_paced_lane():
+    async def scenario():
+        async with RequestQueue(default_concurrency=4, write_spacing_seconds=0.05) as queue:
+            writes = []
+            reads = []
+
+            async def write():
+                writes.append(time.monotonic())
+                await asyncio.sleep(0.01)
+                return FakeResponse(status=201)
+
+            async def read():
+                reads.append(time.monotonic())
+                await asyncio.sleep(0.05)
+                return FakeResponse(status=200)
+
+            await asyncio.gather(
+                *(queue.enqueue("api.github.com", write, method="PATCH") for _ in range(3)),
+                *(queue.enqueue("api.github.com", read) for _ in range(4)),
+            )
+            lanes = set(queue.host_activity())
+        return writes, reads, lanes
+
+    writes, reads, lanes = asyncio.run(scenario())
+
+    assert lanes == {"api.github.com", lane_key("api.github.com", "PATCH")}
+    assert all(later - earlier >= 0.06 for earlier, later in zip(writes, writes[1:]))
+    assert max(reads) - min(reads) < 0.04  # reads kept their full concurrency
+
+
+def test_spaced_writes_do_not_starve_other_hosts():
+    async def scenario():
+        queue = RateLimitedRequestQueue(max_workers=4, per_host_limit=4, write_spacing_seconds=0.2)
+        await queue.start()
+        finished = {}
+
+        async def call(name):
+            await asyncio.sleep(0.01)
+            finished[name] = time.monotonic()
+            return RequestOutcome(status_code=200)
+
+        writes = [queue.enqueue("api.github.com", lambda i=i: call(f"write-{i}"), method="POST") for i in range(8)]
+        write_batch = asyncio.gather(*writes)
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        await queue.enqueue("uploads.github.com", lambda: call("read"))
+        read_elapsed = time.monotonic() - started
+        await write_batch
+        await queue.close()
+        return finished, read_elapsed
+
+    finished, read_elapsed = asyncio.run(scenario())
+
+    assert read_elapsed < 0.1
+    assert finished["read"] < max(at for name, at in finished.items() if name.startswith("write-"))
+
+
+def test_exhausted_primary_quota_on_a_write_pauses_reads_in_both_queues():
+    reset_headers = {"X-RateLimit-Remaining": "0", "Retry-After": "0.3"}
+
+    async def rate_limited():
+        queue = RateLimitedRequestQueue(base_backoff_seconds=0.05, jitter_ratio=0.0, write_spacing_seconds=0.0)
+        await queue.start()
+        attempts = []
+
+        async def write():
+            attempts.append("write")
+            if len(attempts) == 1:
+                return RequestOutcome(status_code=403, headers=reset_headers)
+            return RequestOutcome(status_code=201)
+
+        pending = asyncio.ensure_future(queue.enqueue("api.github.com", write, method="POST"))
+        await asyncio.sleep(0.05)
+        read_backoff = queue.backoff_remaining("api.github.com")
+        await pending
+        await queue.close()
+        return read_backoff
+
+    async def request_queue():
+        async with RequestQueue(default_concurrency=2, base_backoff=0.05, jitter=0.0, write_spacing_seconds=0.0) as queue:
+            attempts = []
+
+            async def write():
+                attempts.append("write")
+                if len(attempts) == 1:
+                    return FakeResponse(status=403, headers=reset_headers)
+                return FakeResponse(status=201)
+
+            pending = asyncio.ensure_future(queue.enqueue("api.github.com", write, method="POST"))
+            await asyncio.sleep(0.05)
+            read_backoff = queue.backoff_remaining("api.github.com")
+            await pending
+        return read_backoff
+
+    assert asyncio.run(rate_limited()) > 0.1
+    assert asyncio.run(request_queue()) > 0.1